@@ -0,0 +1,325 @@
+"""
+Drives the API at fixed concurrency levels and reports throughput and latency percentiles.
+
+Scenarios:
+    token      POST /v1/rooms/{room_name}/token against a pre-created room
+    webhook    POST /v1/livekit/webhook with validly signed participant events
+    lifecycle  POST /v1/rooms/ followed by DELETE /v1/rooms/{room_name}
+
+By default the app is driven in-process through httpx's ASGI transport, using the
+database in DATABASE_URL (or --database-url), so runs against SQLite and Postgres are
+the same command. LiveKit room calls are answered by an in-process stand-in with a fixed
+latency, or with --livekit emulator by the localhost emulator in
+`benchmarks/livekit_emulator.py`, which also exercises the HTTP client. With --url the
+benchmark targets a running server instead, and the server's own LiveKit configuration is used.
+
+Usage:
+    python -m benchmarks.bench_load [--scenarios token,webhook,lifecycle]
+        [--concurrency 1,8,32] [--requests 2000] [--database-url URL | --url URL]
+        [--livekit stub|emulator] [--livekit-latency lognormal:8,0.5] [--livekit-error-rate 0.01]
+        [--output results.json] [--baseline previous.json]
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from google.protobuf.json_format import MessageToJson
+from livekit import api
+
+from benchmarks.livekit_emulator import FaultProfile, LatencyModel, LiveKitEmulator, serve_in_background, sign_webhook
+
+SCENARIOS = ("token", "webhook", "lifecycle")
+
+
+class StubRoomService:
+    """Answers the LiveKit room calls made by the API in-process, without HTTP."""
+
+    def __init__(self, latency: LatencyModel):
+        self.latency = latency
+        self._rng = random.Random()
+
+    async def create_room(self, request: api.CreateRoomRequest) -> api.Room:
+        await asyncio.sleep(self.latency.sample(self._rng))
+        return api.Room(name=request.name, sid=f"RM_{uuid.uuid4().hex[:12]}")
+
+    async def delete_room(self, request: api.DeleteRoomRequest) -> api.DeleteRoomResponse:
+        await asyncio.sleep(self.latency.sample(self._rng))
+        return api.DeleteRoomResponse()
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(name: str, operation: str, concurrency: int, latencies: List[float], errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    total = len(latencies) + errors
+    return {
+        "scenario": name,
+        "operation": operation,
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "seconds": elapsed,
+        "requests_per_second": total / elapsed if elapsed else 0.0,
+        "mean_ms": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+class LoadRunner:
+    """Runs request callables from `concurrency` workers and records per-operation latencies."""
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+
+    async def run(
+        self,
+        name: str,
+        concurrency: int,
+        total: int,
+        step: Callable[[int, Dict[str, List[float]], Dict[str, int]], Awaitable[None]],
+    ) -> List[dict]:
+        latencies: Dict[str, List[float]] = {}
+        errors: Dict[str, int] = {}
+        counter = iter(range(total))
+
+        async def worker():
+            for i in counter:
+                await step(i, latencies, errors)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        operations = sorted(set(latencies) | set(errors))
+        return [
+            summarize(name, operation, concurrency, latencies.get(operation, []), errors.get(operation, 0), elapsed)
+            for operation in operations
+        ]
+
+    async def timed(
+        self,
+        operation: str,
+        latencies: Dict[str, List[float]],
+        errors: Dict[str, int],
+        method: str,
+        url: str,
+        expected_status: int,
+        **kwargs,
+    ) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            errors[operation] = errors.get(operation, 0) + 1
+            return None
+        if response.status_code != expected_status:
+            errors[operation] = errors.get(operation, 0) + 1
+            return response
+        latencies.setdefault(operation, []).append(time.perf_counter() - start)
+        return response
+
+
+def build_webhook(i: int, room_names: List[str], api_key: str, api_secret: str) -> tuple:
+    room_name = room_names[i % len(room_names)]
+    event = api.WebhookEvent(
+        event="participant_joined" if i % 2 == 0 else "participant_left",
+        id=f"EV_{uuid.uuid4().hex}",
+        created_at=int(time.time()),
+        room=api.Room(name=room_name, sid=f"RM_{room_name}"),
+        participant=api.ParticipantInfo(identity=f"user-{i // 2}", name="Bench User", joined_at=int(time.time())),
+    )
+    body = MessageToJson(event)
+    return body, sign_webhook(body, api_key, api_secret)
+
+
+async def run_scenarios(client: httpx.AsyncClient, args, api_key: str, api_secret: str) -> List[dict]:
+    runner = LoadRunner(client)
+    run_id = uuid.uuid4().hex[:8]
+    results: List[dict] = []
+
+    if "token" in args.scenarios:
+        room_name = f"bench-token-{run_id}"
+        response = await client.post("/v1/rooms/", json={"name": room_name, "access_type": "public"})
+        response.raise_for_status()
+        token_body = {"identity": "bench-user", "name": "Bench User"}
+
+        async def token_step(i, latencies, errors):
+            await runner.timed(
+                "create_join_token", latencies, errors, "POST", f"/v1/rooms/{room_name}/token", 200, json=token_body
+            )
+
+        for concurrency in args.concurrency:
+            results += await runner.run("token", concurrency, args.requests, token_step)
+        await client.delete(f"/v1/rooms/{room_name}")
+
+    if "webhook" in args.scenarios:
+        room_names = [f"bench-webhook-{run_id}-{n}" for n in range(16)]
+
+        async def webhook_step(i, latencies, errors):
+            body, authorization = build_webhook(i, room_names, api_key, api_secret)
+            await runner.timed(
+                "handle_webhook", latencies, errors, "POST", "/v1/livekit/webhook", 200,
+                content=body, headers={"Authorization": authorization, "Content-Type": "application/webhook+json"},
+            )
+
+        for concurrency in args.concurrency:
+            results += await runner.run("webhook", concurrency, args.requests, webhook_step)
+
+    if "lifecycle" in args.scenarios:
+        for concurrency in args.concurrency:
+            prefix = f"bench-room-{run_id}-{concurrency}"
+
+            async def lifecycle_step(i, latencies, errors, prefix=prefix):
+                room_name = f"{prefix}-{i}"
+                created = await runner.timed(
+                    "create_room", latencies, errors, "POST", "/v1/rooms/", 201,
+                    json={"name": room_name, "access_type": "public"},
+                )
+                if created is not None and created.status_code == 201:
+                    await runner.timed("delete_room", latencies, errors, "DELETE", f"/v1/rooms/{room_name}", 204)
+
+            results += await runner.run("lifecycle", concurrency, args.requests, lifecycle_step)
+
+    return results
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[dict], baseline_path: str):
+    """Prints the p95 and throughput change of every result present in a previous run."""
+    with open(baseline_path) as f:
+        baseline = {
+            (r["scenario"], r["operation"], r["concurrency"]): r for r in json.load(f)["results"]
+        }
+    print(f"\ncompared with {baseline_path}:")
+    for result in results:
+        previous = baseline.get((result["scenario"], result["operation"], result["concurrency"]))
+        if previous is None or not previous["p95_ms"] or not previous["requests_per_second"]:
+            continue
+        p95_change = (result["p95_ms"] / previous["p95_ms"] - 1) * 100
+        rps_change = (result["requests_per_second"] / previous["requests_per_second"] - 1) * 100
+        print(
+            f"{result['operation']:<18} c={result['concurrency']:<4} "
+            f"p95 {p95_change:+7.1f}%  throughput {rps_change:+7.1f}%"
+        )
+
+
+async def main_async(args) -> dict:
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    async with contextlib.AsyncExitStack() as stack:
+        if args.url:
+            api_key = os.environ.get("LIVEKIT_API_KEY", "")
+            api_secret = os.environ.get("LIVEKIT_API_SECRET", "")
+            transport = None
+            base_url = args.url
+            database = None
+        else:
+            if args.database_url:
+                os.environ["DATABASE_URL"] = args.database_url
+            # A fresh benchmark database has no tables; create them unless told otherwise.
+            os.environ.setdefault("DATABASE_CREATE_SCHEMA", "true")
+            if args.livekit == "emulator":
+                emulator = LiveKitEmulator(
+                    os.environ["LIVEKIT_API_KEY"],
+                    os.environ["LIVEKIT_API_SECRET"],
+                    faults=FaultProfile(latency=args.livekit_latency, error_rate=args.livekit_error_rate),
+                )
+                os.environ["LIVEKIT_URL"] = stack.enter_context(serve_in_background(emulator, port=args.emulator_port))
+            # Imported here so that the overrides above apply before the engine and client are created.
+            from src.config import settings
+            from src.features.rooms import service as room_service
+            from src.main import app
+
+            if args.livekit == "stub":
+                stub = StubRoomService(args.livekit_latency)
+                room_service.get_livekit_rooms().room_service = lambda: stub
+            api_key = settings.LIVEKIT_API_KEY
+            api_secret = settings.LIVEKIT_API_SECRET
+            transport = httpx.ASGITransport(app=app)
+            base_url = "http://bench"
+            database = settings.DATABASE_URL.split(":", 1)[0]
+
+            # Run the app's startup and shutdown so background writers and queues are active.
+            await stack.enter_async_context(app.router.lifespan_context(app))
+        client = await stack.enter_async_context(
+            httpx.AsyncClient(transport=transport, base_url=base_url, limits=limits, timeout=30)
+        )
+        results = await run_scenarios(client, args, api_key, api_secret)
+
+    return {
+        "benchmark": "load",
+        "revision": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "target": args.url or "in-process",
+        "database": database,
+        "livekit": None if args.url else args.livekit,
+        "livekit_latency": None if args.url else f"{args.livekit_latency.kind}:{','.join(map(str, args.livekit_latency.params))}",
+        "requests_per_level": args.requests,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", type=lambda s: s.split(","), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=lambda s: [int(c) for c in s.split(",")], default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=2000, help="Requests (or room lifecycles) per level.")
+    parser.add_argument("--database-url", help="Database for the in-process app; defaults to DATABASE_URL.")
+    parser.add_argument("--url", help="Benchmark a running server instead of the in-process app.")
+    parser.add_argument("--livekit", choices=("stub", "emulator"), default="stub", help="LiveKit stand-in for in-process runs.")
+    parser.add_argument("--livekit-latency", type=LatencyModel.parse, default=LatencyModel.parse("fixed:2"), help="LiveKit latency spec.")
+    parser.add_argument("--livekit-error-rate", type=float, default=0.0, help="Emulator error rate.")
+    parser.add_argument("--emulator-port", type=int, default=7881)
+    parser.add_argument("--output", help="Also write the JSON results to this file.")
+    parser.add_argument("--baseline", help="A previous --output file to compare against.")
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable results.")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    report = asyncio.run(main_async(args))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'operation':<18} {'conc':>5} {'req/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+        for result in report["results"]:
+            print(
+                f"{result['operation']:<18} {result['concurrency']:>5} {result['requests_per_second']:>10,.0f} "
+                f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} {result['errors']:>7}"
+            )
+    if args.baseline:
+        compare(report["results"], args.baseline)
+
+
+if __name__ == "__main__":
+    main()
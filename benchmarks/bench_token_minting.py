@@ -0,0 +1,78 @@
+"""
+Compares join-token minting through `api.AccessToken.to_jwt()` with `JoinTokenMinter`.
+
+Usage:
+    python -m benchmarks.bench_token_minting [--iterations 20000] [--json]
+"""
+import argparse
+import json
+import time
+
+from livekit import api
+
+from src.features.rooms.token_minter import JoinTokenMinter
+
+API_KEY = "bench-key"
+API_SECRET = "bench-secret-bench-secret-bench-secret"
+ROOM_NAME = "bench-room"
+
+
+def mint_with_access_token(identity: str, name: str) -> str:
+    return (
+        api.AccessToken(api_key=API_KEY, api_secret=API_SECRET)
+        .with_identity(identity)
+        .with_name(name)
+        .with_grants(api.VideoGrants(room_join=True, room=ROOM_NAME))
+        .to_jwt()
+    )
+
+
+def run(label: str, mint, iterations: int) -> dict:
+    # Warm up caches and the allocator before timing.
+    for i in range(min(1000, iterations)):
+        mint(f"user-{i}", "Bench User")
+
+    start = time.perf_counter()
+    for i in range(iterations):
+        mint(f"user-{i}", "Bench User")
+    elapsed = time.perf_counter() - start
+    return {
+        "name": label,
+        "iterations": iterations,
+        "seconds": elapsed,
+        "tokens_per_second": iterations / elapsed,
+        "microseconds_per_token": elapsed / iterations * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable results.")
+    args = parser.parse_args()
+
+    minter = JoinTokenMinter(api_key=API_KEY, api_secret=API_SECRET)
+    verifier = api.TokenVerifier(api_key=API_KEY, api_secret=API_SECRET)
+    claims = verifier.verify(minter.mint(ROOM_NAME, "check-user", "Check User"))
+    assert claims.identity == "check-user" and claims.video.room == ROOM_NAME
+
+    results = [
+        run("access_token.to_jwt", mint_with_access_token, args.iterations),
+        run("join_token_minter.mint", lambda identity, name: minter.mint(ROOM_NAME, identity, name), args.iterations),
+    ]
+    speedup = results[0]["seconds"] / results[1]["seconds"]
+
+    if args.json:
+        print(json.dumps({"benchmark": "token_minting", "results": results, "speedup": speedup}, indent=2))
+        return
+
+    for result in results:
+        print(
+            f"{result['name']:<24} {result['tokens_per_second']:>12,.0f} tokens/s "
+            f"{result['microseconds_per_token']:>8.2f} us/token"
+        )
+    print(f"speedup: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
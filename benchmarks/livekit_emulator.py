@@ -0,0 +1,339 @@
+"""
+A localhost emulator of the LiveKit room service, for load tests and failure drills.
+
+It speaks the same Twirp protocol as a LiveKit server (protobuf bodies under
+`/twirp/livekit.RoomService/<Method>`, JWT-authenticated), so the API can be pointed at
+it through `LIVEKIT_URL`. It implements CreateRoom, DeleteRoom, ListRooms and
+ListParticipants, with configurable per-method latency distributions and error rates.
+
+When `--webhook-url` is set it also delivers signed webhooks: `room_started` and
+`room_finished` for room calls, and `participant_joined`/`participant_left` for
+participants added through the control endpoints under `/emulator/`.
+
+Latency specs are given in milliseconds:
+    fixed:5  uniform:2,20  exponential:10  lognormal:8,0.5 (median, sigma)
+
+Usage:
+    python -m benchmarks.livekit_emulator [--port 7880] [--latency lognormal:8,0.5]
+        [--method-latency CreateRoom=fixed:40] [--error-rate 0.01]
+        [--method-error-rate DeleteRoom=0.2] [--webhook-url http://localhost:8000/v1/livekit/webhook]
+"""
+import argparse
+import asyncio
+import base64
+import contextlib
+import hashlib
+import math
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Optional
+
+import httpx
+import uvicorn
+from google.protobuf.json_format import MessageToJson
+from livekit import api
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+TWIRP_PREFIX = "/twirp/livekit.RoomService"
+
+
+@dataclass
+class LatencyModel:
+    """A latency distribution in milliseconds, e.g. `LatencyModel.parse("lognormal:8,0.5")`."""
+
+    kind: str = "fixed"
+    params: tuple = (0.0,)
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        kind, _, raw = spec.partition(":")
+        params = tuple(float(p) for p in raw.split(",")) if raw else (0.0,)
+        expected = {"fixed": 1, "uniform": 2, "exponential": 1, "lognormal": 2}
+        if kind not in expected or len(params) != expected[kind]:
+            raise ValueError(f"Invalid latency spec '{spec}'.")
+        return cls(kind, params)
+
+    def sample(self, rng: random.Random) -> float:
+        """Returns a latency in seconds."""
+        if self.kind == "uniform":
+            ms = rng.uniform(*self.params)
+        elif self.kind == "exponential":
+            ms = rng.expovariate(1 / self.params[0]) if self.params[0] > 0 else 0.0
+        elif self.kind == "lognormal":
+            median, sigma = self.params
+            ms = rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+        else:
+            ms = self.params[0]
+        return max(ms, 0.0) / 1000
+
+
+@dataclass
+class FaultProfile:
+    """Latency and error injection, with optional per-method overrides."""
+
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    error_rate: float = 0.0
+    method_latency: Dict[str, LatencyModel] = field(default_factory=dict)
+    method_error_rate: Dict[str, float] = field(default_factory=dict)
+
+    def latency_for(self, method: str) -> LatencyModel:
+        return self.method_latency.get(method, self.latency)
+
+    def error_rate_for(self, method: str) -> float:
+        return self.method_error_rate.get(method, self.error_rate)
+
+
+def sign_webhook(body: str, api_key: str, api_secret: str) -> str:
+    """Builds the Authorization header LiveKit sends with a webhook body."""
+    digest = base64.b64encode(hashlib.sha256(body.encode()).digest()).decode()
+    return api.AccessToken(api_key=api_key, api_secret=api_secret).with_sha256(digest).to_jwt()
+
+
+class WebhookSender:
+    """Delivers signed webhook events to the API, optionally duplicating some of them."""
+
+    def __init__(self, url: str, api_key: str, api_secret: str, duplicate_rate: float = 0.0, rng=None):
+        self.url = url
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.duplicate_rate = duplicate_rate
+        self._rng = rng or random.Random()
+        self._client: Optional[httpx.AsyncClient] = None
+        self.sent = 0
+        self.failed = 0
+
+    async def send(self, event: api.WebhookEvent):
+        event.id = event.id or f"EV_{uuid.uuid4().hex[:12]}"
+        event.created_at = event.created_at or int(time.time())
+        body = MessageToJson(event)
+        headers = {
+            "Authorization": sign_webhook(body, self.api_key, self.api_secret),
+            "Content-Type": "application/webhook+json",
+        }
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=10)
+        deliveries = 2 if self._rng.random() < self.duplicate_rate else 1
+        for _ in range(deliveries):
+            try:
+                response = await self._client.post(self.url, content=body, headers=headers)
+                response.raise_for_status()
+                self.sent += 1
+            except httpx.HTTPError:
+                self.failed += 1
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class LiveKitEmulator:
+    """In-memory room service state plus the Starlette app that serves it."""
+
+    def __init__(
+        self,
+        api_key: str,
+        api_secret: str,
+        faults: Optional[FaultProfile] = None,
+        webhook_sender: Optional[WebhookSender] = None,
+        seed: Optional[int] = None,
+    ):
+        self.faults = faults or FaultProfile()
+        self.webhook_sender = webhook_sender
+        self._verifier = api.TokenVerifier(api_key=api_key, api_secret=api_secret)
+        self._rng = random.Random(seed)
+        self.rooms: Dict[str, api.Room] = {}
+        self.participants: Dict[str, Dict[str, api.ParticipantInfo]] = {}
+        self.calls: Dict[str, int] = {}
+        self.injected_errors: Dict[str, int] = {}
+        self._pending_webhooks: set = set()
+        self._handlers = {
+            "CreateRoom": (api.CreateRoomRequest, self._create_room),
+            "DeleteRoom": (api.DeleteRoomRequest, self._delete_room),
+            "ListRooms": (api.ListRoomsRequest, self._list_rooms),
+            "ListParticipants": (api.ListParticipantsRequest, self._list_participants),
+        }
+        self.app = Starlette(
+            routes=[
+                Route(TWIRP_PREFIX + "/{method}", self._twirp, methods=["POST"]),
+                Route("/emulator/stats", self._stats, methods=["GET"]),
+                Route("/emulator/rooms/{room_name}/participants", self._join, methods=["POST"]),
+                Route("/emulator/rooms/{room_name}/participants/{identity}", self._leave, methods=["DELETE"]),
+            ],
+            lifespan=self._lifespan,
+        )
+
+    # --- Twirp ---
+    async def _twirp(self, request: Request) -> Response:
+        method = request.path_params["method"]
+        self.calls[method] = self.calls.get(method, 0) + 1
+        if method not in self._handlers:
+            return self._twirp_error(404, "bad_route", f"no handler for {method}")
+
+        authorization = request.headers.get("Authorization", "")
+        try:
+            self._verifier.verify(authorization.removeprefix("Bearer "))
+        except Exception:
+            return self._twirp_error(401, "unauthenticated", "invalid token")
+
+        await asyncio.sleep(self.faults.latency_for(method).sample(self._rng))
+        if self._rng.random() < self.faults.error_rate_for(method):
+            self.injected_errors[method] = self.injected_errors.get(method, 0) + 1
+            return self._twirp_error(503, "unavailable", "injected failure")
+
+        request_class, handler = self._handlers[method]
+        message = request_class.FromString(await request.body())
+        result = handler(message)
+        if isinstance(result, Response):
+            return result
+        return Response(result.SerializeToString(), media_type="application/protobuf")
+
+    @staticmethod
+    def _twirp_error(status: int, code: str, msg: str) -> JSONResponse:
+        return JSONResponse({"code": code, "msg": msg}, status_code=status)
+
+    def _create_room(self, request: api.CreateRoomRequest):
+        # Like LiveKit, creating an existing room returns it unchanged.
+        room = self.rooms.get(request.name)
+        if room is None:
+            room = api.Room(
+                sid=f"RM_{uuid.uuid4().hex[:12]}",
+                name=request.name,
+                empty_timeout=request.empty_timeout,
+                max_participants=request.max_participants,
+                creation_time=int(time.time()),
+            )
+            self.rooms[request.name] = room
+            self.participants[request.name] = {}
+            self._emit(api.WebhookEvent(event="room_started", room=room))
+        return room
+
+    def _delete_room(self, request: api.DeleteRoomRequest):
+        room = self.rooms.pop(request.room, None)
+        if room is None:
+            return self._twirp_error(404, "not_found", "room not found")
+        self.participants.pop(request.room, None)
+        self._emit(api.WebhookEvent(event="room_finished", room=room))
+        return api.DeleteRoomResponse()
+
+    def _list_rooms(self, request: api.ListRoomsRequest):
+        names = set(request.names)
+        rooms = [room for name, room in self.rooms.items() if not names or name in names]
+        for room in rooms:
+            room.num_participants = len(self.participants.get(room.name, {}))
+        return api.ListRoomsResponse(rooms=rooms)
+
+    def _list_participants(self, request: api.ListParticipantsRequest):
+        return api.ListParticipantsResponse(participants=list(self.participants.get(request.room, {}).values()))
+
+    # --- Control endpoints ---
+    async def _stats(self, request: Request) -> JSONResponse:
+        return JSONResponse({
+            "rooms": len(self.rooms),
+            "participants": sum(len(p) for p in self.participants.values()),
+            "calls": self.calls,
+            "injected_errors": self.injected_errors,
+            "webhooks_sent": self.webhook_sender.sent if self.webhook_sender else 0,
+            "webhooks_failed": self.webhook_sender.failed if self.webhook_sender else 0,
+        })
+
+    async def _join(self, request: Request) -> JSONResponse:
+        room_name = request.path_params["room_name"]
+        if room_name not in self.rooms:
+            return JSONResponse({"detail": "room not found"}, status_code=404)
+        payload = await request.json()
+        participant = api.ParticipantInfo(
+            sid=f"PA_{uuid.uuid4().hex[:12]}",
+            identity=payload["identity"],
+            name=payload.get("name", ""),
+            joined_at=int(time.time()),
+        )
+        self.participants[room_name][participant.identity] = participant
+        self._emit(api.WebhookEvent(event="participant_joined", room=self.rooms[room_name], participant=participant))
+        return JSONResponse({"sid": participant.sid}, status_code=201)
+
+    async def _leave(self, request: Request) -> Response:
+        room_name = request.path_params["room_name"]
+        participant = self.participants.get(room_name, {}).pop(request.path_params["identity"], None)
+        if participant is None:
+            return JSONResponse({"detail": "participant not found"}, status_code=404)
+        self._emit(api.WebhookEvent(event="participant_left", room=self.rooms[room_name], participant=participant))
+        return Response(status_code=204)
+
+    def _emit(self, event: api.WebhookEvent):
+        if self.webhook_sender is None:
+            return
+        task = asyncio.get_running_loop().create_task(self.webhook_sender.send(event))
+        self._pending_webhooks.add(task)
+        task.add_done_callback(self._pending_webhooks.discard)
+
+    @contextlib.asynccontextmanager
+    async def _lifespan(self, app):
+        yield
+        if self._pending_webhooks:
+            await asyncio.gather(*self._pending_webhooks, return_exceptions=True)
+        if self.webhook_sender is not None:
+            await self.webhook_sender.aclose()
+
+
+@contextlib.contextmanager
+def serve_in_background(emulator: LiveKitEmulator, host: str = "127.0.0.1", port: int = 7880) -> Iterator[str]:
+    """Serves the emulator from a background thread and yields its URL."""
+    server = uvicorn.Server(uvicorn.Config(emulator.app, host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="livekit-emulator", daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError(f"LiveKit emulator failed to start on {host}:{port}")
+        time.sleep(0.01)
+    try:
+        yield f"http://{host}:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+def _parse_overrides(values, convert) -> dict:
+    overrides = {}
+    for value in values or []:
+        method, _, spec = value.partition("=")
+        overrides[method] = convert(spec)
+    return overrides
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7880)
+    parser.add_argument("--api-key", default="devkey")
+    parser.add_argument("--api-secret", default="secret")
+    parser.add_argument("--latency", type=LatencyModel.parse, default=LatencyModel(), help="Default latency spec.")
+    parser.add_argument("--method-latency", action="append", help="Per-method latency, e.g. CreateRoom=fixed:40.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of a 503 'unavailable' reply.")
+    parser.add_argument("--method-error-rate", action="append", help="Per-method error rate, e.g. DeleteRoom=0.2.")
+    parser.add_argument("--webhook-url", help="Deliver signed webhooks to this URL.")
+    parser.add_argument("--webhook-duplicate-rate", type=float, default=0.0, help="Probability of delivering a webhook twice.")
+    parser.add_argument("--seed", type=int, help="Seed for reproducible latency and error sampling.")
+    args = parser.parse_args()
+
+    faults = FaultProfile(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        method_latency=_parse_overrides(args.method_latency, LatencyModel.parse),
+        method_error_rate=_parse_overrides(args.method_error_rate, float),
+    )
+    sender = None
+    if args.webhook_url:
+        sender = WebhookSender(args.webhook_url, args.api_key, args.api_secret, args.webhook_duplicate_rate)
+    emulator = LiveKitEmulator(args.api_key, args.api_secret, faults=faults, webhook_sender=sender, seed=args.seed)
+    uvicorn.run(emulator.app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,8 @@
 from fastapi import APIRouter
 
+from src.features.admin import controller as admin_controller
+from src.features.analytics import controller as analytics_controller
+from src.features.metrics import controller as metrics_controller
 from src.features.rooms import controller as rooms_controller
 from src.features.webhooks import controller as webhooks_controller
 
@@ -15,6 +18,18 @@ api_router.include_router(rooms_controller.router)
 # All routes defined in `webhooks_controller` will be prefixed with `/v1`.
 api_router.include_router(webhooks_controller.router)
 
+# Include the router from the 'metrics' feature.
+# The Prometheus scrape endpoint is served at `/v1/metrics`.
+api_router.include_router(metrics_controller.router)
+
+# Include the router from the 'admin' feature.
+# All routes defined in `admin_controller` will be prefixed with `/v1/admin`.
+api_router.include_router(admin_controller.router)
+
+# Include the router from the 'analytics' feature.
+# All routes defined in `analytics_controller` will be prefixed with `/v1/analytics`.
+api_router.include_router(analytics_controller.router)
+
 
 @api_router.get("/health", tags=["Health Check"])
 async def health_check():
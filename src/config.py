@@ -1,7 +1,8 @@
 import os
+from functools import lru_cache
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Literal, Optional
 
 # Determine the environment and load the appropriate .env file
 # In a real production scenario, you would not have a .env file.
@@ -17,6 +18,34 @@ class Settings(BaseSettings):
     # Pydantic's PostgresDsn type validates the URL format.
     DATABASE_URL: str = Field(..., env="DATABASE_URL")
 
+    # When enabled, room handlers use an async engine (asyncpg for PostgreSQL,
+    # aiosqlite for SQLite) derived from DATABASE_URL instead of blocking the event loop.
+    DATABASE_ASYNC_ENABLED: bool = Field(False, env="DATABASE_ASYNC_ENABLED")
+
+    # Create missing tables with `Base.metadata.create_all` at startup.
+    # Off by default: the schema is managed with Alembic migrations.
+    DATABASE_CREATE_SCHEMA: bool = Field(False, env="DATABASE_CREATE_SCHEMA")
+
+    # Connection Pool
+    # Size and overflow bound the connections per worker; a checkout waits up to the
+    # timeout for a free connection. Connections older than the recycle age are replaced.
+    # Pre-ping is "always" (check every checkout), "never", or "idle" (check only
+    # connections idle for longer than DATABASE_POOL_PRE_PING_IDLE_SECONDS).
+    DATABASE_POOL_SIZE: int = Field(5, env="DATABASE_POOL_SIZE")
+    DATABASE_MAX_OVERFLOW: int = Field(10, env="DATABASE_MAX_OVERFLOW")
+    DATABASE_POOL_TIMEOUT_SECONDS: float = Field(30.0, env="DATABASE_POOL_TIMEOUT_SECONDS")
+    DATABASE_POOL_RECYCLE_SECONDS: int = Field(1800, env="DATABASE_POOL_RECYCLE_SECONDS")
+    DATABASE_POOL_PRE_PING: Literal["always", "never", "idle"] = Field("idle", env="DATABASE_POOL_PRE_PING")
+    DATABASE_POOL_PRE_PING_IDLE_SECONDS: float = Field(30.0, env="DATABASE_POOL_PRE_PING_IDLE_SECONDS")
+
+    # SQLite journal and sync modes. WAL lets reads run alongside a write, and
+    # synchronous=NORMAL is durable across application crashes in WAL mode.
+    # Both are interpolated into PRAGMA statements, so only SQLite's own values are accepted.
+    SQLITE_JOURNAL_MODE: Literal["DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"] = Field(
+        "WAL", env="SQLITE_JOURNAL_MODE"
+    )
+    SQLITE_SYNCHRONOUS: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = Field("NORMAL", env="SQLITE_SYNCHRONOUS")
+
     # LiveKit API Configuration
     # These are read by the LiveKit SDK automatically, but we define them here
     # for explicit configuration and validation.
@@ -24,6 +53,158 @@ class Settings(BaseSettings):
     LIVEKIT_API_KEY: str = Field(..., env="LIVEKIT_API_KEY")
     LIVEKIT_API_SECRET: str = Field(..., env="LIVEKIT_API_SECRET")
 
+    # Room Lookup Cache
+    # Bounds the in-process LRU cache of room records used by the join-token endpoint.
+    ROOM_CACHE_MAX_SIZE: int = Field(10000, env="ROOM_CACHE_MAX_SIZE")
+    ROOM_CACHE_TTL_SECONDS: float = Field(30.0, env="ROOM_CACHE_TTL_SECONDS")
+
+    # Batch Join-Token Issuance
+    # Upper bound on items per batch request, and the batch size from which
+    # tokens are signed on a shared thread pool instead of inline.
+    TOKEN_BATCH_MAX_SIZE: int = Field(1000, env="TOKEN_BATCH_MAX_SIZE")
+    TOKEN_BATCH_THREAD_THRESHOLD: int = Field(64, env="TOKEN_BATCH_THREAD_THRESHOLD")
+    TOKEN_BATCH_MAX_WORKERS: int = Field(4, env="TOKEN_BATCH_MAX_WORKERS")
+
+    # Webhook Ingestion Queue
+    # When enabled, the webhook endpoint acknowledges verified events immediately and
+    # a pool of workers processes them, ordered per room.
+    WEBHOOK_QUEUE_ENABLED: bool = Field(False, env="WEBHOOK_QUEUE_ENABLED")
+    WEBHOOK_QUEUE_WORKERS: int = Field(4, env="WEBHOOK_QUEUE_WORKERS")
+    WEBHOOK_QUEUE_MAX_SIZE: int = Field(10000, env="WEBHOOK_QUEUE_MAX_SIZE")
+    WEBHOOK_QUEUE_FULL_POLICY: Literal["reject", "block"] = Field("reject", env="WEBHOOK_QUEUE_FULL_POLICY")
+    WEBHOOK_QUEUE_BLOCK_TIMEOUT_SECONDS: float = Field(1.0, env="WEBHOOK_QUEUE_BLOCK_TIMEOUT_SECONDS")
+
+    # Webhook Event Store
+    # Events are buffered and written with one multi-row INSERT per batch, flushed
+    # every WEBHOOK_EVENT_BATCH_SIZE events or WEBHOOK_EVENT_FLUSH_INTERVAL_MS milliseconds.
+    WEBHOOK_EVENT_STORE_ENABLED: bool = Field(True, env="WEBHOOK_EVENT_STORE_ENABLED")
+    WEBHOOK_EVENT_BATCH_SIZE: int = Field(500, env="WEBHOOK_EVENT_BATCH_SIZE")
+    WEBHOOK_EVENT_FLUSH_INTERVAL_MS: int = Field(250, env="WEBHOOK_EVENT_FLUSH_INTERVAL_MS")
+    WEBHOOK_EVENT_MAX_BUFFER: int = Field(50000, env="WEBHOOK_EVENT_MAX_BUFFER")
+    # A batch that fails this many times is written one row at a time, and rows that
+    # still fail are logged to the dead-letter logger instead of being retried forever.
+    WEBHOOK_EVENT_MAX_ATTEMPTS: int = Field(3, env="WEBHOOK_EVENT_MAX_ATTEMPTS")
+
+    # Webhook Deduplication
+    # Redelivered event IDs are recognised from a bounded in-memory set first and from
+    # the webhook_event_receipts table across workers.
+    WEBHOOK_DEDUP_CACHE_SIZE: int = Field(100000, env="WEBHOOK_DEDUP_CACHE_SIZE")
+    WEBHOOK_DEDUP_DB_ENABLED: bool = Field(True, env="WEBHOOK_DEDUP_DB_ENABLED")
+    # Receipts older than the redelivery window are deleted every
+    # WEBHOOK_DEDUP_PRUNE_INTERVAL_SECONDS (0 disables pruning).
+    WEBHOOK_DEDUP_RETENTION_SECONDS: int = Field(86400, env="WEBHOOK_DEDUP_RETENTION_SECONDS")
+    WEBHOOK_DEDUP_PRUNE_INTERVAL_SECONDS: float = Field(3600.0, env="WEBHOOK_DEDUP_PRUNE_INTERVAL_SECONDS")
+
+    # Bulk Room Creation
+    # Maximum rooms per bulk request, and how many LiveKit create calls may be in flight at once.
+    ROOM_BULK_MAX_SIZE: int = Field(100, env="ROOM_BULK_MAX_SIZE")
+    ROOM_BULK_LIVEKIT_CONCURRENCY: int = Field(10, env="ROOM_BULK_LIVEKIT_CONCURRENCY")
+
+    # Room Listing
+    # Page size bounds for GET /v1/rooms and the row batch size of its NDJSON streaming mode.
+    ROOM_LIST_DEFAULT_LIMIT: int = Field(100, env="ROOM_LIST_DEFAULT_LIMIT")
+    ROOM_LIST_MAX_LIMIT: int = Field(1000, env="ROOM_LIST_MAX_LIMIT")
+    ROOM_LIST_STREAM_BATCH_SIZE: int = Field(1000, env="ROOM_LIST_STREAM_BATCH_SIZE")
+
+    # LiveKit Resilience
+    # Every LiveKit call has a deadline covering all of its attempts. Transient failures
+    # are retried with jittered exponential backoff, and after LIVEKIT_BREAKER_FAILURE_THRESHOLD
+    # consecutive failures calls fail fast for LIVEKIT_BREAKER_RESET_SECONDS. List calls can be
+    # hedged: a second request is sent if the first has not answered in time (0 disables it).
+    LIVEKIT_WRITE_TIMEOUT_SECONDS: float = Field(5.0, env="LIVEKIT_WRITE_TIMEOUT_SECONDS")
+    LIVEKIT_LIST_TIMEOUT_SECONDS: float = Field(3.0, env="LIVEKIT_LIST_TIMEOUT_SECONDS")
+    LIVEKIT_RETRY_ATTEMPTS: int = Field(3, env="LIVEKIT_RETRY_ATTEMPTS")
+    LIVEKIT_RETRY_BASE_DELAY_SECONDS: float = Field(0.05, env="LIVEKIT_RETRY_BASE_DELAY_SECONDS")
+    LIVEKIT_RETRY_MAX_DELAY_SECONDS: float = Field(1.0, env="LIVEKIT_RETRY_MAX_DELAY_SECONDS")
+    LIVEKIT_BREAKER_FAILURE_THRESHOLD: int = Field(5, env="LIVEKIT_BREAKER_FAILURE_THRESHOLD")
+    LIVEKIT_BREAKER_RESET_SECONDS: float = Field(10.0, env="LIVEKIT_BREAKER_RESET_SECONDS")
+    LIVEKIT_HEDGE_LIST_AFTER_SECONDS: float = Field(0.0, env="LIVEKIT_HEDGE_LIST_AFTER_SECONDS")
+
+    # LiveKit Outbox
+    # When enabled, room deletions are committed as jobs in the livekit_jobs table and
+    # answered with 202; a pool of workers carries them out against LiveKit, retrying
+    # with exponential backoff up to LIVEKIT_OUTBOX_MAX_ATTEMPTS times.
+    LIVEKIT_OUTBOX_ENABLED: bool = Field(False, env="LIVEKIT_OUTBOX_ENABLED")
+    LIVEKIT_OUTBOX_WORKERS: int = Field(4, env="LIVEKIT_OUTBOX_WORKERS")
+    LIVEKIT_OUTBOX_BATCH_SIZE: int = Field(10, env="LIVEKIT_OUTBOX_BATCH_SIZE")
+    LIVEKIT_OUTBOX_POLL_INTERVAL_SECONDS: float = Field(1.0, env="LIVEKIT_OUTBOX_POLL_INTERVAL_SECONDS")
+    LIVEKIT_OUTBOX_MAX_ATTEMPTS: int = Field(8, env="LIVEKIT_OUTBOX_MAX_ATTEMPTS")
+    LIVEKIT_OUTBOX_BACKOFF_BASE_SECONDS: float = Field(1.0, env="LIVEKIT_OUTBOX_BACKOFF_BASE_SECONDS")
+    LIVEKIT_OUTBOX_BACKOFF_MAX_SECONDS: float = Field(300.0, env="LIVEKIT_OUTBOX_BACKOFF_MAX_SECONDS")
+    LIVEKIT_OUTBOX_LEASE_SECONDS: float = Field(60.0, env="LIVEKIT_OUTBOX_LEASE_SECONDS")
+    # Succeeded and failed jobs are deleted once they are older than the retention,
+    # checked every LIVEKIT_OUTBOX_PRUNE_INTERVAL_SECONDS (0 disables pruning).
+    LIVEKIT_OUTBOX_RETENTION_SECONDS: float = Field(604800.0, env="LIVEKIT_OUTBOX_RETENTION_SECONDS")
+    LIVEKIT_OUTBOX_PRUNE_INTERVAL_SECONDS: float = Field(3600.0, env="LIVEKIT_OUTBOX_PRUNE_INTERVAL_SECONDS")
+
+    # Room Analytics
+    # Usage rollups (per room session and per time bucket) are folded from the webhook
+    # stream by a background writer, in batches like the webhook event store. Sessions
+    # whose room_finished event was lost are closed by the occupancy resync.
+    ROOM_ANALYTICS_ENABLED: bool = Field(False, env="ROOM_ANALYTICS_ENABLED")
+    ROOM_ANALYTICS_BUCKET_SECONDS: int = Field(3600, env="ROOM_ANALYTICS_BUCKET_SECONDS")
+    ROOM_ANALYTICS_BATCH_SIZE: int = Field(200, env="ROOM_ANALYTICS_BATCH_SIZE")
+    ROOM_ANALYTICS_FLUSH_INTERVAL_MS: int = Field(250, env="ROOM_ANALYTICS_FLUSH_INTERVAL_MS")
+
+    # Cache Invalidation Bus
+    # Broadcasts room cache and occupancy invalidations to the other workers:
+    # "inprocess" (a single worker), "unix" (workers on this host, through datagram
+    # sockets in INVALIDATION_BUS_SOCKET_DIR) or "postgres" (LISTEN/NOTIFY on
+    # INVALIDATION_BUS_CHANNEL, for workers on several hosts).
+    INVALIDATION_BUS_BACKEND: Literal["inprocess", "unix", "postgres"] = Field("inprocess", env="INVALIDATION_BUS_BACKEND")
+    INVALIDATION_BUS_SOCKET_DIR: str = Field("/tmp/qari-invalidation-bus", env="INVALIDATION_BUS_SOCKET_DIR")
+    INVALIDATION_BUS_CHANNEL: str = Field("qari_invalidations", env="INVALIDATION_BUS_CHANNEL")
+
+    # Room Occupancy
+    # How often the in-memory occupancy view is resynced against LiveKit (0 disables it).
+    OCCUPANCY_RESYNC_INTERVAL_SECONDS: float = Field(60.0, env="OCCUPANCY_RESYNC_INTERVAL_SECONDS")
+
+    # Room Reconciliation
+    # A background worker that fixes drift between the rooms table and LiveKit
+    # (0 disables it). Rooms younger than RECONCILE_GRACE_SECONDS are never touched.
+    RECONCILE_INTERVAL_SECONDS: float = Field(300.0, env="RECONCILE_INTERVAL_SECONDS")
+    RECONCILE_BATCH_SIZE: int = Field(500, env="RECONCILE_BATCH_SIZE")
+    RECONCILE_GRACE_SECONDS: float = Field(120.0, env="RECONCILE_GRACE_SECONDS")
+    RECONCILE_FULL_SWEEP_EVERY: int = Field(12, env="RECONCILE_FULL_SWEEP_EVERY")
+    RECONCILE_DELETE_LIVEKIT_ORPHANS: bool = Field(True, env="RECONCILE_DELETE_LIVEKIT_ORPHANS")
+
+    # Webhook Verification
+    # Bodies of at least WEBHOOK_VERIFY_OFFLOAD_BYTES are verified and parsed on a
+    # dedicated thread pool instead of the event loop (0 offloads every webhook).
+    WEBHOOK_VERIFY_OFFLOAD_BYTES: int = Field(16384, env="WEBHOOK_VERIFY_OFFLOAD_BYTES")
+    WEBHOOK_VERIFY_MAX_WORKERS: int = Field(2, env="WEBHOOK_VERIFY_MAX_WORKERS")
+
+    # Room Gating
+    # Token and NFT rooms only issue join tokens to identities (wallet addresses) holding
+    # the required balance. Balances are read over JSON-RPC from GATING_RPC_URL and cached;
+    # results that grant access stay fresh longer than results that deny it.
+    GATING_ENABLED: bool = Field(False, env="GATING_ENABLED")
+    GATING_RPC_URL: Optional[str] = Field(None, env="GATING_RPC_URL")
+    GATING_RPC_TIMEOUT_SECONDS: float = Field(5.0, env="GATING_RPC_TIMEOUT_SECONDS")
+    GATING_POSITIVE_TTL_SECONDS: float = Field(300.0, env="GATING_POSITIVE_TTL_SECONDS")
+    GATING_NEGATIVE_TTL_SECONDS: float = Field(15.0, env="GATING_NEGATIVE_TTL_SECONDS")
+    GATING_CACHE_MAX_SIZE: int = Field(100000, env="GATING_CACHE_MAX_SIZE")
+
+    # Fast serialization: render responses with orjson and build room and token
+    # payloads directly from internal objects instead of re-validating them.
+    FAST_SERIALIZATION_ENABLED: bool = Field(False, env="FAST_SERIALIZATION_ENABLED")
+
+    # Server (`python -m src.server`)
+    # Defaults of the server command line. SERVER_WORKERS=0 starts one worker per
+    # available CPU. With SERVER_MAX_REQUESTS > 0, a worker is replaced gracefully after
+    # serving that many requests (plus up to SERVER_MAX_REQUESTS_JITTER, so workers do
+    # not all restart at once). With SERVER_PRELOAD and gunicorn installed, the app is
+    # imported once and the workers are forked from it, sharing the imported code.
+    SERVER_HOST: str = Field("0.0.0.0", env="SERVER_HOST")
+    SERVER_PORT: int = Field(8000, env="SERVER_PORT")
+    SERVER_WORKERS: int = Field(0, env="SERVER_WORKERS")
+    SERVER_BACKLOG: int = Field(2048, env="SERVER_BACKLOG")
+    SERVER_KEEP_ALIVE_SECONDS: int = Field(5, env="SERVER_KEEP_ALIVE_SECONDS")
+    SERVER_MAX_REQUESTS: int = Field(0, env="SERVER_MAX_REQUESTS")
+    SERVER_MAX_REQUESTS_JITTER: int = Field(0, env="SERVER_MAX_REQUESTS_JITTER")
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: int = Field(30, env="SERVER_GRACEFUL_TIMEOUT_SECONDS")
+    SERVER_PRELOAD: bool = Field(True, env="SERVER_PRELOAD")
+
     # Application Secret Key
     # Used for signing tokens or other security-related functions.
     APP_SECRET_KEY: str = Field(..., env="APP_SECRET_KEY")
@@ -37,5 +218,25 @@ class Settings(BaseSettings):
         extra='ignore'
     )
 
-# Create a single, reusable instance of the settings
-settings = Settings()
\ No newline at end of file
+@lru_cache
+def get_settings() -> Settings:
+    """Loads the settings on first use and returns the same instance afterwards."""
+    return Settings()
+
+
+class LazySettings:
+    """
+    Stands in for the Settings instance so that importing a module does not load
+    the environment; the settings are loaded by the first attribute read.
+    """
+
+    def __getattr__(self, name: str):
+        # Only called for names not yet on this object: the value is stored here so that
+        # later reads are plain attribute lookups.
+        value = getattr(get_settings(), name)
+        setattr(self, name, value)
+        return value
+
+
+# A single, reusable handle on the settings
+settings = LazySettings()
\ No newline at end of file
@@ -1,33 +1,166 @@
 # src/database/core.py (Corrected)
+import asyncio
+from typing import Optional
 from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from src.config import settings
-
-# Conditionally set connect_args for SQLite
-connect_args = {}
-if settings.DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
-
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    connect_args=connect_args
+from src.database.pool import (
+    MonitoredAsyncQueuePool,
+    MonitoredQueuePool,
+    enable_sqlite_wal,
+    is_sqlite_memory_url,
+    pool_monitor,
 )
+from src.metrics import instrument_engine
 
-# For SQLite, enable foreign key support if it's not on by default
-if settings.DATABASE_URL.startswith("sqlite"): # <-- TYPO CORRECTED HERE
-    @event.listens_for(engine, "connect")
+def to_async_database_url(database_url: str) -> str:
+    """
+    Maps a synchronous database URL onto its asyncio driver.
+    PostgreSQL is served by asyncpg and SQLite by aiosqlite.
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+    elif backend == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url.render_as_string(hide_password=False)
+
+def enable_sqlite_foreign_keys(sync_engine):
+    """Enables foreign key support on every new SQLite connection."""
+    @event.listens_for(sync_engine, "connect")
     def set_sqlite_pragma(dbapi_connection, connection_record):
         cursor = dbapi_connection.cursor()
         cursor.execute("PRAGMA foreign_keys=ON")
         cursor.close()
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def pool_options(poolclass) -> dict:
+    """
+    Builds the pool arguments of `create_engine` from Settings.
+    In-memory SQLite keeps SQLAlchemy's single-connection pool, which takes no sizing options.
+    """
+    options = {"pool_pre_ping": settings.DATABASE_POOL_PRE_PING == "always"}
+    if is_sqlite_memory_url(settings.DATABASE_URL):
+        return options
+    options.update(
+        poolclass=poolclass,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE_SECONDS,
+    )
+    return options
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 Base = declarative_base()
 
+# expire_on_commit=False keeps attributes loaded after commit, since lazy
+# loading is not available on an AsyncSession.
+AsyncSessionLocal = async_sessionmaker(class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+# The engines are created on first use rather than at import time, so importing the
+# application does not load drivers or read the environment.
+_engine: Optional[Engine] = None
+_async_engine: Optional[AsyncEngine] = None
+
+def get_engine() -> Engine:
+    """Creates the engine on first use and binds `SessionLocal` to it."""
+    global _engine
+    if _engine is None:
+        # Conditionally set connect_args for SQLite
+        connect_args = {}
+        if settings.DATABASE_URL.startswith("sqlite"):
+            connect_args = {"check_same_thread": False}
+
+        _engine = create_engine(
+            settings.DATABASE_URL,
+            connect_args=connect_args,
+            **pool_options(MonitoredQueuePool),
+        )
+
+        # For SQLite, enable foreign key support if it's not on by default
+        if settings.DATABASE_URL.startswith("sqlite"):
+            enable_sqlite_foreign_keys(_engine)
+            enable_sqlite_wal(_engine, settings.SQLITE_JOURNAL_MODE, settings.SQLITE_SYNCHRONOUS)
+        instrument_engine(_engine)
+        pool_monitor.attach(
+            "sync", _engine, settings.DATABASE_POOL_PRE_PING, settings.DATABASE_POOL_PRE_PING_IDLE_SECONDS,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        )
+        SessionLocal.configure(bind=_engine)
+    return _engine
+
+# --- Async Engine (optional) ---
+# When enabled, the room handlers use an AsyncSession so that queries and commits
+# are awaited instead of blocking the event loop.
+def get_async_engine() -> AsyncEngine:
+    """Creates the async engine on first use and binds `AsyncSessionLocal` to it."""
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            to_async_database_url(settings.DATABASE_URL),
+            **pool_options(MonitoredAsyncQueuePool),
+        )
+        if settings.DATABASE_URL.startswith("sqlite"):
+            enable_sqlite_foreign_keys(_async_engine.sync_engine)
+            enable_sqlite_wal(_async_engine.sync_engine, settings.SQLITE_JOURNAL_MODE, settings.SQLITE_SYNCHRONOUS)
+        instrument_engine(_async_engine.sync_engine)
+        pool_monitor.attach(
+            "async", _async_engine.sync_engine,
+            settings.DATABASE_POOL_PRE_PING, settings.DATABASE_POOL_PRE_PING_IDLE_SECONDS,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        )
+        AsyncSessionLocal.configure(bind=_async_engine)
+    return _async_engine
+
+async def dispose_engines():
+    """Closes the pooled connections of the engines that were created."""
+    global _engine, _async_engine
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+    if _engine is not None:
+        _engine.dispose()
+        _engine = None
+
 def get_db():
+    get_engine()
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_session_factory():
+    """
+    Provides the session factory itself, for handlers whose work outlives the
+    request-scoped session (e.g. streaming responses).
+    """
+    get_engine()
+    return SessionLocal
+
+async def get_async_db():
+    get_async_engine()
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_session():
+    """
+    The session dependency for handlers that support both paths: an AsyncSession when
+    the async database layer is enabled in Settings, a Session otherwise. The choice is
+    made per request, so importing this module does not load the settings.
+    """
+    if settings.DATABASE_ASYNC_ENABLED:
+        get_async_engine()
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        get_engine()
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            # Returning the connection to the pool may block, so it runs off the event loop.
+            await asyncio.to_thread(db.close)
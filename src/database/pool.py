@@ -0,0 +1,210 @@
+import threading
+import time
+from typing import Dict, Literal, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from src.metrics import registry
+
+# How connections are checked before being handed out:
+# - "always": SQLAlchemy's pool_pre_ping, one extra round-trip per checkout.
+# - "never": no check; a dead connection surfaces as an error on first use.
+# - "idle": ping only connections that sat in the pool longer than the idle threshold.
+PrePingMode = Literal["always", "never", "idle"]
+
+# The SQLite PRAGMA values accepted by `enable_sqlite_wal`.
+SqliteJournalMode = Literal["DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"]
+SqliteSynchronous = Literal["OFF", "NORMAL", "FULL", "EXTRA"]
+
+pool_acquire_duration = registry.histogram(
+    "db_pool_acquire_seconds",
+    "Time spent waiting for a pooled connection, by pool.",
+    ("pool",),
+)
+
+
+class PoolStats:
+    """Counters for one pool, updated from pool events and the acquire path."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pool: Optional[Pool] = None
+        # The configured overflow limit, which pools do not expose publicly.
+        self.max_overflow: Optional[int] = None
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.pings = 0
+        self.failed_pings = 0
+        self.acquire_seconds_total = 0.0
+        self.max_acquire_seconds = 0.0
+
+    def record_acquire(self, name: str, seconds: float, timed_out: bool = False):
+        pool_acquire_duration.observe(seconds, name)
+        with self._lock:
+            self.acquire_seconds_total += seconds
+            self.max_acquire_seconds = max(self.max_acquire_seconds, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> dict:
+        pool = self.pool
+        with self._lock:
+            stats = {
+                "pool_class": type(pool).__name__ if pool is not None else None,
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "pings": self.pings,
+                "failed_pings": self.failed_pings,
+                "acquire_seconds_total": self.acquire_seconds_total,
+                "max_acquire_seconds": self.max_acquire_seconds,
+                "mean_acquire_seconds": self.acquire_seconds_total / self.checkouts if self.checkouts else 0.0,
+            }
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=max(pool.overflow(), 0),
+                timeout_seconds=pool.timeout(),
+            )
+            if self.max_overflow is not None:
+                stats["max_overflow"] = self.max_overflow
+        return stats
+
+
+class PoolMonitor:
+    """Holds the statistics of every pool the application creates, keyed by name."""
+
+    def __init__(self):
+        self._pools: Dict[str, PoolStats] = {}
+        self._lock = threading.Lock()
+
+    def stats_for(self, name: str) -> PoolStats:
+        with self._lock:
+            stats = self._pools.get(name)
+            if stats is None:
+                stats = self._pools[name] = PoolStats()
+            return stats
+
+    def attach(
+        self,
+        name: str,
+        sync_engine: Engine,
+        pre_ping: PrePingMode = "always",
+        idle_seconds: float = 30.0,
+        max_overflow: Optional[int] = None,
+    ):
+        """
+        Starts tracking the pool of `sync_engine` under `name`, built with `max_overflow`.
+        The counters carry on across engine re-creation so that they stay monotonic.
+        """
+        stats = self.stats_for(name)
+        stats.pool = sync_engine.pool
+        stats.max_overflow = max_overflow
+
+        @event.listens_for(sync_engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            stats.increment("connects")
+
+        @event.listens_for(sync_engine, "checkout")
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            stats.increment("checkouts")
+            if pre_ping != "idle":
+                return
+            checked_in_at = connection_record.info.get("checked_in_at")
+            if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+                return
+            stats.increment("pings")
+            cursor = dbapi_connection.cursor()
+            try:
+                cursor.execute("SELECT 1")
+            except Exception as e:
+                stats.increment("failed_pings")
+                # The pool discards the connection and retries the checkout with a fresh one.
+                raise exc.DisconnectionError() from e
+            finally:
+                cursor.close()
+
+        @event.listens_for(sync_engine, "checkin")
+        def on_checkin(dbapi_connection, connection_record):
+            connection_record.info["checked_in_at"] = time.monotonic()
+
+        @event.listens_for(sync_engine, "invalidate")
+        def on_invalidate(dbapi_connection, connection_record, exception):
+            stats.increment("invalidations")
+
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            pools = dict(self._pools)
+        return {name: stats.snapshot() for name, stats in pools.items()}
+
+    def flat_stats(self) -> dict:
+        """The stats of every pool with keys prefixed by the pool name, for the metrics registry."""
+        return {
+            f"{name}_{key}": value
+            for name, stats in self.stats().items()
+            for key, value in stats.items()
+        }
+
+
+class _AcquireTimingMixin:
+    """Times every connection checkout, including the wait for a free slot."""
+
+    monitor_name = "sync"
+
+    def _do_get(self):
+        stats = pool_monitor.stats_for(self.monitor_name)
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            stats.record_acquire(self.monitor_name, time.perf_counter() - start, timed_out=True)
+            raise
+        stats.record_acquire(self.monitor_name, time.perf_counter() - start)
+        return connection
+
+
+class MonitoredQueuePool(_AcquireTimingMixin, QueuePool):
+    monitor_name = "sync"
+
+
+class MonitoredAsyncQueuePool(_AcquireTimingMixin, AsyncAdaptedQueuePool):
+    monitor_name = "async"
+
+
+def is_sqlite_memory_url(database_url: str) -> bool:
+    """In-memory SQLite databases use a single-connection pool that takes no sizing options."""
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite":
+        return False
+    database = url.database or ""
+    return database in ("", ":memory:") or "mode=memory" in database or "mode=memory" in str(url.query)
+
+
+def enable_sqlite_wal(sync_engine, journal_mode: SqliteJournalMode = "WAL", synchronous: SqliteSynchronous = "NORMAL"):
+    """
+    Sets the journal and synchronous modes on every new SQLite connection.
+    WAL lets readers proceed alongside a writer, and synchronous=NORMAL syncs at
+    checkpoints instead of on every commit, which is safe in WAL mode.
+    """
+    @event.listens_for(sync_engine, "connect")
+    def set_sqlite_journal(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={synchronous}")
+        cursor.close()
+
+
+# The process-wide pool statistics, served by the admin endpoint and the metrics registry.
+pool_monitor = PoolMonitor()
+registry.register_stats("db_pool", "Database connection pool", pool_monitor.flat_stats)
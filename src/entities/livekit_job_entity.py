@@ -0,0 +1,53 @@
+from sqlalchemy import Index, Integer, String, Text, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+from typing import Optional
+
+from src.database.core import Base
+
+class LiveKitJob(Base):
+    """
+    An outbox entry for a LiveKit side effect.
+    Jobs are committed in the same transaction as the database change that requires
+    them and carried out later by the outbox worker pool, which retries them until
+    they succeed or run out of attempts.
+    """
+    __tablename__ = "livekit_jobs"
+    __table_args__ = (
+        # Workers claim due jobs in id order.
+        Index("ix_livekit_jobs_status_next_attempt_at", "status", "next_attempt_at"),
+        # Finished jobs are pruned by completion time.
+        Index("ix_livekit_jobs_status_completed_at", "status", "completed_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+
+    # The LiveKit operation to perform, e.g. 'delete_room'.
+    operation: Mapped[str] = mapped_column(String, nullable=False)
+
+    # The room the operation applies to.
+    room_name: Mapped[str] = mapped_column(String, index=True, nullable=False)
+
+    # Extra arguments of the operation, serialized as JSON.
+    payload: Mapped[str] = mapped_column(Text, nullable=False, default="{}")
+
+    # 'pending', 'running', 'succeeded' or 'failed'.
+    status: Mapped[str] = mapped_column(String, nullable=False, default="pending")
+
+    # How many times a worker has claimed the job.
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    # When a pending job becomes due. A running job whose lease has expired
+    # (its worker died) becomes claimable again.
+    next_attempt_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=False)
+    lease_expires_at: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # The error of the most recent failed attempt.
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    completed_at: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<LiveKitJob(id={self.id}, operation='{self.operation}', room_name='{self.room_name}', status='{self.status}')>"
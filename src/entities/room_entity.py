@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, func
+from sqlalchemy import Column, Index, Integer, String, DateTime, func
 from sqlalchemy.orm import Mapped, mapped_column
 from typing import Optional
 
@@ -11,6 +11,11 @@ class Room(Base):
     including its configuration and LiveKit server ID.
     """
     __tablename__ = "rooms"
+    __table_args__ = (
+        # Support keyset pagination on (created_at, id), with and without an access_type filter.
+        Index("ix_rooms_created_at_id", "created_at", "id"),
+        Index("ix_rooms_access_type_created_at_id", "access_type", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
 
@@ -0,0 +1,80 @@
+from sqlalchemy import BigInteger, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from typing import Optional
+
+from src.database.core import Base
+
+# Rollups are folded from the webhook stream one event at a time and never rebuilt
+# from raw events. Times are Unix seconds, which keeps the interval arithmetic exact.
+
+class RoomSessionRollup(Base):
+    """
+    Usage of one room session (one LiveKit room SID), from its start until it finishes.
+    """
+    __tablename__ = "room_session_rollups"
+
+    # The LiveKit room SID of the session (the room name if LiveKit sent none).
+    room_sid: Mapped[str] = mapped_column(String, primary_key=True)
+    room_name: Mapped[str] = mapped_column(String, index=True, nullable=False)
+
+    started_at: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    ended_at: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    # Set when the session finishes; LiveKit's own duration when it reports one.
+    duration_seconds: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+
+    current_participants: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    peak_participants: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    unique_participants: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    # Time spent in the room by participants who already left.
+    participant_seconds: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    # The sum of the join times of participants still in the room, so that live
+    # participant time is current_participants * now - open_joined_at_sum.
+    open_joined_at_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<RoomSessionRollup(room_sid='{self.room_sid}', room_name='{self.room_name}')>"
+
+
+class RoomSessionParticipant(Base):
+    """
+    One participant of a room session, used to count unique participants and to
+    close their interval when they leave.
+    """
+    __tablename__ = "room_session_participants"
+    __table_args__ = (
+        # Counting a room's unique participants across sessions.
+        Index("ix_room_session_participants_room_name_identity", "room_name", "identity"),
+    )
+
+    room_sid: Mapped[str] = mapped_column(String, primary_key=True)
+    identity: Mapped[str] = mapped_column(String, primary_key=True)
+    room_name: Mapped[str] = mapped_column(String, nullable=False)
+
+    # When the participant's current stay began, or null while they are not in the room.
+    joined_at: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    total_seconds: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<RoomSessionParticipant(room_sid='{self.room_sid}', identity='{self.identity}')>"
+
+
+class UsageBucket(Base):
+    """
+    Organization-wide usage in one fixed-size time bucket.
+    """
+    __tablename__ = "usage_buckets"
+
+    # The start of the bucket, aligned to ROOM_ANALYTICS_BUCKET_SECONDS.
+    bucket_start: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+
+    sessions_started: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    sessions_finished: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    participant_joins: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Participant time that fell inside the bucket, from stays that have ended.
+    participant_seconds: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    # The highest concurrent participant count any single room reached in the bucket.
+    peak_room_participants: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<UsageBucket(bucket_start={self.bucket_start})>"
@@ -0,0 +1,39 @@
+from sqlalchemy import Integer, String, Text, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+from typing import Optional
+
+from src.database.core import Base
+
+class WebhookEventRecord(Base):
+    """
+    Represents a LiveKit webhook event stored for billing and debugging.
+    Rows are append-only and written in batches by the webhook event writer.
+    """
+    __tablename__ = "webhook_events"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+
+    # The unique ID LiveKit assigns to each event. Redeliveries reuse the same ID.
+    event_id: Mapped[str] = mapped_column(String, unique=True, index=True, nullable=False)
+
+    # The event type, e.g. 'participant_joined' or 'room_finished'.
+    event_type: Mapped[str] = mapped_column(String, index=True, nullable=False)
+
+    # The room and participant the event refers to, when applicable.
+    room_name: Mapped[Optional[str]] = mapped_column(String, index=True, nullable=True)
+    room_sid: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    participant_identity: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+
+    # When LiveKit emitted the event.
+    event_timestamp: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # The full event, serialized as JSON.
+    raw_payload: Mapped[str] = mapped_column(Text, nullable=False)
+
+    # Timestamp for when the event was stored.
+    received_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+    def __repr__(self):
+        return f"<WebhookEventRecord(id={self.id}, event_id='{self.event_id}', event_type='{self.event_type}')>"
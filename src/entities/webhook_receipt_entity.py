@@ -0,0 +1,23 @@
+from sqlalchemy import String, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database.core import Base
+
+class WebhookEventReceipt(Base):
+    """
+    Records that a webhook event ID has been accepted for processing.
+    The primary key doubles as the unique constraint that lets every worker
+    agree on which delivery of an event is the first one.
+    """
+    __tablename__ = "webhook_event_receipts"
+
+    # The unique ID LiveKit assigns to each event. Redeliveries reuse the same ID.
+    event_id: Mapped[str] = mapped_column(String, primary_key=True)
+
+    # Timestamp for when the first delivery was accepted. Indexed for pruning old receipts.
+    received_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), index=True
+    )
+
+    def __repr__(self):
+        return f"<WebhookEventReceipt(event_id='{self.event_id}')>"
@@ -20,6 +20,56 @@ class RoomAlreadyExistsException(HTTPException):
             detail=f"Room '{room_name}' already exists."
         )
 
+class TokenBatchTooLargeException(HTTPException):
+    """
+    Exception raised when a batch token request exceeds the configured maximum size.
+    """
+    def __init__(self, size: int, max_size: int):
+        super().__init__(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch of {size} token requests exceeds the maximum of {max_size}."
+        )
+
+class RoomBatchTooLargeException(HTTPException):
+    """
+    Exception raised when a bulk room creation request exceeds the configured maximum size.
+    """
+    def __init__(self, size: int, max_size: int):
+        super().__init__(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch of {size} rooms exceeds the maximum of {max_size}."
+        )
+
+class RoomAccessDeniedException(HTTPException):
+    """
+    Exception raised when a participant does not meet the token or NFT requirement of a room.
+    """
+    def __init__(self, room_name: str, identity: str):
+        super().__init__(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Identity '{identity}' does not meet the access requirement of room '{room_name}'."
+        )
+
+class GatingUnavailableException(HTTPException):
+    """
+    Exception raised when on-chain balances needed for a gating check cannot be looked up.
+    """
+    def __init__(self, detail: str):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Gating check unavailable: {detail}"
+        )
+
+class InvalidCursorException(HTTPException):
+    """
+    Exception raised when a pagination cursor cannot be decoded.
+    """
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor."
+        )
+
 class LiveKitServiceException(HTTPException):
     """
     Exception raised for failures when interacting with the LiveKit API.
@@ -28,4 +78,15 @@ class LiveKitServiceException(HTTPException):
         super().__init__(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=f"LiveKit service error: {detail}"
-        )
\ No newline at end of file
+        )
+
+class WebhookQueueFullException(HTTPException):
+    """
+    Exception raised when the webhook queue cannot accept an event.
+    A 503 response makes LiveKit redeliver the event later.
+    """
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Webhook queue is full. Please retry later."
+        )
@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from src.database.core import get_db
+from src.database.pool import pool_monitor
+from src.entities.livekit_job_entity import LiveKitJob
+from src.features.admin import models as admin_models
+from src.features.rooms.service import get_livekit_outbox
+
+# Create an APIRouter for the 'admin' feature.
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+)
+
+
+@router.get(
+    "/pool",
+    response_model=admin_models.PoolStatsResponse,
+    summary="Database pool statistics",
+    description=(
+        "Reports checked-out and overflow connections, checkout counts, timeouts and "
+        "the time spent waiting for a connection, for each database connection pool."
+    ),
+)
+def get_pool_stats():
+    return admin_models.PoolStatsResponse(pools=pool_monitor.stats())
+
+
+@router.get(
+    "/jobs",
+    response_model=admin_models.LiveKitJobSummaryResponse,
+    summary="LiveKit outbox summary",
+    description="Counts LiveKit outbox jobs by status and reports the worker counters of this process.",
+)
+def get_job_summary(db: Session = Depends(get_db)):
+    rows = db.execute(select(LiveKitJob.status, func.count()).group_by(LiveKitJob.status)).all()
+    return admin_models.LiveKitJobSummaryResponse(
+        counts={job_status: count for job_status, count in rows},
+        workers=get_livekit_outbox().stats(),
+    )
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=admin_models.LiveKitJobResponse,
+    summary="LiveKit outbox job",
+    description="Reports the status, attempts and last error of one LiveKit outbox job.",
+)
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    job = db.get(LiveKitJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job {job_id} not found.")
+    return job
@@ -0,0 +1,59 @@
+from datetime import datetime
+from typing import Dict, Optional, Union
+
+from pydantic import BaseModel, ConfigDict
+
+
+class ConnectionPoolStats(BaseModel):
+    """
+    Live statistics of one database connection pool.
+    Sizing fields are only reported for queue pools.
+    """
+    pool_class: Optional[str] = None
+    size: Optional[int] = None
+    checked_in: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow: Optional[int] = None
+    max_overflow: Optional[int] = None
+    timeout_seconds: Optional[float] = None
+    checkouts: int
+    connects: int
+    invalidations: int
+    timeouts: int
+    pings: int
+    failed_pings: int
+    acquire_seconds_total: float
+    max_acquire_seconds: float
+    mean_acquire_seconds: float
+
+
+class PoolStatsResponse(BaseModel):
+    """
+    Statistics of every connection pool, keyed by pool ("sync" or "async").
+    """
+    pools: Dict[str, ConnectionPoolStats]
+
+
+class LiveKitJobResponse(BaseModel):
+    """
+    The state of one LiveKit outbox job.
+    """
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    operation: str
+    room_name: str
+    status: str
+    attempts: int
+    last_error: Optional[str] = None
+    next_attempt_at: datetime
+    created_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+
+class LiveKitJobSummaryResponse(BaseModel):
+    """
+    The number of LiveKit outbox jobs in each status, plus the worker counters of this process.
+    """
+    counts: Dict[str, int]
+    workers: Dict[str, Union[int, bool]]
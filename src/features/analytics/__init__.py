@@ -0,0 +1,2 @@
+# This file can be left empty.
+# It marks the 'analytics' directory as a self-contained feature package.
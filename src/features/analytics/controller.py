@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from src.database.core import get_db
+from src.features.analytics import models as analytics_models
+from src.features.analytics import service as analytics_service
+
+# Create an APIRouter for the 'analytics' feature.
+router = APIRouter(
+    prefix="/analytics",
+    tags=["Analytics"],
+)
+
+
+@router.get(
+    "/usage",
+    response_model=analytics_models.UsageResponse,
+    summary="Organization-wide usage",
+    description=(
+        "Reports sessions, participant joins, participant minutes and the peak room size "
+        "of every room, per hour or day, from the usage rollups. Defaults to the last 24 hours."
+    ),
+)
+def get_usage(
+    start: Optional[datetime] = Query(None, description="Start of the report (inclusive); UTC unless an offset is given."),
+    end: Optional[datetime] = Query(None, description="End of the report (exclusive). Defaults to now."),
+    interval: analytics_models.UsageInterval = Query("hour"),
+    db: Session = Depends(get_db),
+):
+    # Times without an offset are read as UTC, like the rollups themselves.
+    if end is not None and end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    if start is not None and start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=1)
+    if start >= end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="`start` must be before `end`.")
+    return analytics_service.get_usage_service(db=db, start=start, end=end, interval=interval)
@@ -0,0 +1,57 @@
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+# The granularity of the organization-wide usage report.
+UsageInterval = Literal["hour", "day"]
+
+
+class SessionStats(BaseModel):
+    """
+    Usage of one room session. Live sessions report their usage up to the time of the request.
+    """
+    room_sid: str
+    started_at: datetime
+    ended_at: Optional[datetime] = Field(None, description="Null while the session is live.")
+    duration_seconds: int
+    current_participants: int
+    peak_participants: int
+    unique_participants: int
+    participant_minutes: float
+
+
+class RoomStatsResponse(BaseModel):
+    """
+    Pydantic model for the usage of a room across all of its sessions.
+    """
+    room_name: str
+    sessions: int
+    live_sessions: int
+    total_duration_seconds: int
+    peak_participants: int
+    unique_participants: int
+    participant_minutes: float
+    recent_sessions: List[SessionStats] = Field(..., description="The most recent sessions, newest first.")
+
+
+class UsageBucketStats(BaseModel):
+    """
+    Organization-wide usage in one interval. Participant minutes count stays that have ended.
+    """
+    start: datetime
+    sessions_started: int
+    sessions_finished: int
+    participant_joins: int
+    participant_minutes: float
+    peak_room_participants: int
+
+
+class UsageResponse(BaseModel):
+    """
+    Pydantic model for the organization-wide usage report. Intervals without activity are omitted.
+    """
+    interval: UsageInterval
+    start: datetime
+    end: datetime
+    buckets: List[UsageBucketStats]
@@ -0,0 +1,255 @@
+import logging
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from livekit.api import WebhookEvent
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from src.entities.room_usage_entity import RoomSessionParticipant, RoomSessionRollup, UsageBucket
+from src.features.webhooks.event_store import WebhookEventWriter
+from src.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_EVENTS = ("room_started", "room_finished", "participant_joined", "participant_left")
+
+# Sessions started this recently are not closed by a sweep, since LiveKit may not list their room yet.
+STALE_SESSION_GRACE_SECONDS = 60
+
+
+@dataclass(frozen=True)
+class UsageEvent:
+    """The fields of a webhook event that the rollups need."""
+    event: str
+    room_sid: str
+    room_name: str
+    timestamp: int
+    identity: str = ""
+    room_duration: int = 0
+
+
+@dataclass(frozen=True)
+class SessionSweep:
+    """
+    Closes the open sessions of rooms LiveKit did not list at `listed_at`, for when
+    their room_finished event was lost.
+    """
+    active_room_sids: frozenset
+    listed_at: int
+
+
+def room_duration_seconds(event: WebhookEvent) -> int:
+    """The lifetime of the room of a `room_finished` event, from its creation time (0 if unknown)."""
+    if not event.room.creation_time or not event.created_at:
+        return 0
+    return max(int(event.created_at) - int(event.room.creation_time), 0)
+
+
+def usage_event_from(event: WebhookEvent) -> Optional[UsageEvent]:
+    """Extracts a `UsageEvent`, or returns None for events that do not affect usage."""
+    if event.event not in ROLLUP_EVENTS or not (event.room.sid or event.room.name):
+        return None
+    if event.event.startswith("participant_") and not event.participant.identity:
+        return None
+    timestamp = int(event.created_at)
+    if event.event == "participant_joined" and event.participant.joined_at:
+        timestamp = int(event.participant.joined_at)
+    elif event.event == "room_started" and event.room.creation_time:
+        timestamp = int(event.room.creation_time)
+    return UsageEvent(
+        event=event.event,
+        room_sid=event.room.sid or event.room.name,
+        room_name=event.room.name,
+        timestamp=timestamp,
+        identity=event.participant.identity,
+        room_duration=room_duration_seconds(event) if event.event == "room_finished" else 0,
+    )
+
+
+class RollupUpdater:
+    """
+    Folds usage events into the rollup tables of one transaction.
+
+    Each event touches a constant number of rows: its session, the participant and the
+    buckets its time falls into. Closing the open stays when a session finishes touches
+    only participants still in the room. On PostgreSQL, rows are locked as they are
+    read so updates from several processes do not overwrite each other.
+    """
+
+    def __init__(self, db: Session, bucket_seconds: int):
+        self.db = db
+        self.bucket_seconds = bucket_seconds
+        self._lock_rows = db.get_bind().dialect.name == "postgresql"
+
+    def bucket_start(self, timestamp: int) -> int:
+        return timestamp - timestamp % self.bucket_seconds
+
+    def _add(self, row):
+        # Flushed right away so later lookups in the same batch find the row.
+        self.db.add(row)
+        self.db.flush()
+
+    def _get(self, model, ident):
+        return self.db.get(model, ident, with_for_update=self._lock_rows or None)
+
+    def bucket(self, timestamp: int) -> UsageBucket:
+        start = self.bucket_start(timestamp)
+        bucket = self._get(UsageBucket, start)
+        if bucket is None:
+            bucket = UsageBucket(
+                bucket_start=start, sessions_started=0, sessions_finished=0,
+                participant_joins=0, participant_seconds=0, peak_room_participants=0,
+            )
+            self._add(bucket)
+        return bucket
+
+    def session(self, event: UsageEvent) -> RoomSessionRollup:
+        session = self._get(RoomSessionRollup, event.room_sid)
+        if session is None:
+            # A session first seen when it finishes started `room_duration` seconds earlier.
+            started_at = event.timestamp - event.room_duration if event.event == "room_finished" else event.timestamp
+            session = RoomSessionRollup(
+                room_sid=event.room_sid, room_name=event.room_name, started_at=started_at,
+                current_participants=0, peak_participants=0, unique_participants=0,
+                participant_seconds=0, open_joined_at_sum=0,
+            )
+            self._add(session)
+            self.bucket(started_at).sessions_started += 1
+        elif event.event == "room_started" or event.timestamp < session.started_at:
+            # Events can arrive out of order; the session starts at the earliest one.
+            session.started_at = min(session.started_at, event.timestamp)
+        return session
+
+    def add_participant_seconds(self, joined_at: int, left_at: int):
+        """Spreads a stay over the buckets it overlaps."""
+        start = joined_at
+        while start < left_at:
+            end = min(left_at, self.bucket_start(start) + self.bucket_seconds)
+            self.bucket(start).participant_seconds += end - start
+            start = end
+
+    def close_stay(self, session: RoomSessionRollup, participant: RoomSessionParticipant, left_at: int):
+        joined_at = participant.joined_at
+        left_at = max(left_at, joined_at)
+        participant.total_seconds += left_at - joined_at
+        participant.joined_at = None
+        session.participant_seconds += left_at - joined_at
+        session.open_joined_at_sum -= joined_at
+        session.current_participants -= 1
+        self.add_participant_seconds(joined_at, left_at)
+
+    def apply(self, event: UsageEvent):
+        session = self.session(event)
+        if event.event == "participant_joined":
+            participant, created = self._participant(event)
+            if created:
+                session.unique_participants += 1
+            if participant.joined_at is None:
+                participant.joined_at = event.timestamp
+                session.current_participants += 1
+                session.open_joined_at_sum += event.timestamp
+                session.peak_participants = max(session.peak_participants, session.current_participants)
+                bucket = self.bucket(event.timestamp)
+                bucket.participant_joins += 1
+                bucket.peak_room_participants = max(bucket.peak_room_participants, session.current_participants)
+        elif event.event == "participant_left":
+            participant = self._get(RoomSessionParticipant, (event.room_sid, event.identity))
+            if participant is not None and participant.joined_at is not None:
+                self.close_stay(session, participant, event.timestamp)
+        elif event.event == "room_finished" and session.ended_at is None:
+            self.db.flush()
+            open_stays = self.db.execute(
+                select(RoomSessionParticipant).where(
+                    RoomSessionParticipant.room_sid == event.room_sid,
+                    RoomSessionParticipant.joined_at.is_not(None),
+                )
+            ).scalars().all()
+            for participant in open_stays:
+                self.close_stay(session, participant, event.timestamp)
+            session.ended_at = max(event.timestamp, session.started_at)
+            session.duration_seconds = event.room_duration or session.ended_at - session.started_at
+            self.bucket(event.timestamp).sessions_finished += 1
+
+    def close_sessions_except(self, sweep: SessionSweep):
+        """Finishes stale open sessions at the sweep time, closing their open stays."""
+        stale = self.db.execute(
+            select(RoomSessionRollup).where(
+                RoomSessionRollup.ended_at.is_(None),
+                RoomSessionRollup.started_at < sweep.listed_at - STALE_SESSION_GRACE_SECONDS,
+            )
+        ).scalars().all()
+        for session in stale:
+            if session.room_sid not in sweep.active_room_sids:
+                self.apply(UsageEvent(
+                    event="room_finished", room_sid=session.room_sid,
+                    room_name=session.room_name, timestamp=sweep.listed_at,
+                ))
+
+    def _participant(self, event: UsageEvent) -> Tuple[RoomSessionParticipant, bool]:
+        participant = self._get(RoomSessionParticipant, (event.room_sid, event.identity))
+        if participant is not None:
+            return participant, False
+        participant = RoomSessionParticipant(
+            room_sid=event.room_sid, identity=event.identity, room_name=event.room_name,
+            joined_at=None, total_seconds=0,
+        )
+        self._add(participant)
+        return participant, True
+
+
+class UsageRollupWriter(WebhookEventWriter):
+    """
+    Applies usage events to the rollup tables from a background thread, in arrival
+    order and one transaction per batch. A failed batch is retried as a whole, so
+    a batch is never half applied, until it has failed `max_attempts` times; its events
+    are then applied one at a time and those that still fail are dead-lettered.
+    """
+
+    thread_name = "usage-rollup-writer"
+
+    def __init__(self, bucket_seconds: int, **kwargs):
+        super().__init__(**kwargs)
+        self.bucket_seconds = bucket_seconds
+
+    def to_row(self, event: WebhookEvent) -> Optional[UsageEvent]:
+        return usage_event_from(event)
+
+    def write_batch(self, db: Session, rows: list):
+        updater = RollupUpdater(db, self.bucket_seconds)
+        for row in rows:
+            if isinstance(row, SessionSweep):
+                updater.close_sessions_except(row)
+            else:
+                updater.apply(row)
+
+    def close_sessions_except(self, rooms: list, listed_at: float):
+        """
+        Queues a sweep that finishes the open sessions of rooms missing from `rooms`, the
+        LiveKit rooms listed at `listed_at`. It runs in order with the buffered events.
+        """
+        self.add_row(SessionSweep(frozenset(room.sid or room.name for room in rooms), int(listed_at)))
+
+
+# The process-wide rollup writer, created on first use. It only buffers events once
+# started by the application.
+_usage_rollup_writer: Optional[UsageRollupWriter] = None
+
+
+def get_usage_rollup_writer() -> UsageRollupWriter:
+    global _usage_rollup_writer
+    if _usage_rollup_writer is None:
+        _usage_rollup_writer = UsageRollupWriter(
+            bucket_seconds=settings.ROOM_ANALYTICS_BUCKET_SECONDS,
+            batch_size=settings.ROOM_ANALYTICS_BATCH_SIZE,
+            flush_interval_ms=settings.ROOM_ANALYTICS_FLUSH_INTERVAL_MS,
+            max_buffer=settings.WEBHOOK_EVENT_MAX_BUFFER,
+            max_attempts=settings.WEBHOOK_EVENT_MAX_ATTEMPTS,
+        )
+    return _usage_rollup_writer
+
+
+registry.register_stats(
+    "usage_rollup_writer", "Usage rollup writer", lambda: get_usage_rollup_writer().stats()
+)
@@ -0,0 +1,138 @@
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from src.entities.room_usage_entity import RoomSessionParticipant, RoomSessionRollup, UsageBucket
+from src.features.analytics import models as analytics_models
+
+INTERVAL_SECONDS = {"hour": 3600, "day": 86400}
+
+
+def to_datetime(timestamp: int) -> datetime:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+
+def session_to_stats(session: RoomSessionRollup, now: int) -> analytics_models.SessionStats:
+    """Builds the stats of one session, counting live participants up to `now`."""
+    live_seconds = session.current_participants * now - session.open_joined_at_sum
+    if session.ended_at is None:
+        duration = max(now - session.started_at, 0)
+    else:
+        duration = session.duration_seconds or 0
+    return analytics_models.SessionStats(
+        room_sid=session.room_sid,
+        started_at=to_datetime(session.started_at),
+        ended_at=to_datetime(session.ended_at) if session.ended_at is not None else None,
+        duration_seconds=duration,
+        current_participants=session.current_participants,
+        peak_participants=session.peak_participants,
+        unique_participants=session.unique_participants,
+        participant_minutes=round((session.participant_seconds + live_seconds) / 60, 2),
+    )
+
+
+def get_room_stats_service(
+    db: Session,
+    room_name: str,
+    recent_sessions: int = 10,
+    now: Optional[int] = None,
+) -> analytics_models.RoomStatsResponse:
+    """
+    Returns the usage of a room from its rollups: one aggregate query over its session
+    rows, one distinct count over its participants and the most recent sessions.
+    Raw webhook events are never read.
+    """
+    now = int(time.time()) if now is None else now
+    is_live = RoomSessionRollup.ended_at.is_(None)
+    totals = db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(case((is_live, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((is_live, now - RoomSessionRollup.started_at),
+                                        else_=RoomSessionRollup.duration_seconds)), 0),
+            func.coalesce(func.max(RoomSessionRollup.peak_participants), 0),
+            func.coalesce(func.sum(
+                RoomSessionRollup.participant_seconds
+                + RoomSessionRollup.current_participants * now
+                - RoomSessionRollup.open_joined_at_sum
+            ), 0),
+        ).where(RoomSessionRollup.room_name == room_name)
+    ).one()
+    unique_participants = db.execute(
+        select(func.count(func.distinct(RoomSessionParticipant.identity)))
+        .where(RoomSessionParticipant.room_name == room_name)
+    ).scalar_one()
+    sessions = db.execute(
+        select(RoomSessionRollup)
+        .where(RoomSessionRollup.room_name == room_name)
+        .order_by(RoomSessionRollup.started_at.desc())
+        .limit(recent_sessions)
+    ).scalars()
+
+    session_count, live_sessions, total_duration, peak, participant_seconds = totals
+    return analytics_models.RoomStatsResponse(
+        room_name=room_name,
+        sessions=session_count,
+        live_sessions=live_sessions,
+        total_duration_seconds=total_duration,
+        peak_participants=peak,
+        unique_participants=unique_participants,
+        participant_minutes=round(participant_seconds / 60, 2),
+        recent_sessions=[session_to_stats(session, now) for session in sessions],
+    )
+
+
+def get_usage_service(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    interval: analytics_models.UsageInterval,
+) -> analytics_models.UsageResponse:
+    """
+    Returns organization-wide usage between `start` and `end`, grouped by `interval`.
+    Reads one rollup row per stored bucket in the range, regardless of event volume.
+    """
+    interval_seconds = max(INTERVAL_SECONDS[interval], settings.ROOM_ANALYTICS_BUCKET_SECONDS)
+    start_ts = int(start.timestamp())
+    start_ts -= start_ts % interval_seconds
+    end_ts = int(end.timestamp())
+
+    rows = db.execute(
+        select(UsageBucket)
+        .where(UsageBucket.bucket_start >= start_ts, UsageBucket.bucket_start < end_ts)
+        .order_by(UsageBucket.bucket_start)
+    ).scalars()
+
+    grouped: Dict[int, dict] = {}
+    for row in rows:
+        key = row.bucket_start - row.bucket_start % interval_seconds
+        group = grouped.setdefault(key, dict(
+            sessions_started=0, sessions_finished=0, participant_joins=0,
+            participant_seconds=0, peak_room_participants=0,
+        ))
+        group["sessions_started"] += row.sessions_started
+        group["sessions_finished"] += row.sessions_finished
+        group["participant_joins"] += row.participant_joins
+        group["participant_seconds"] += row.participant_seconds
+        group["peak_room_participants"] = max(group["peak_room_participants"], row.peak_room_participants)
+
+    return analytics_models.UsageResponse(
+        interval=interval,
+        start=to_datetime(start_ts),
+        end=to_datetime(end_ts),
+        buckets=[
+            analytics_models.UsageBucketStats(
+                start=to_datetime(key),
+                sessions_started=group["sessions_started"],
+                sessions_finished=group["sessions_finished"],
+                participant_joins=group["participant_joins"],
+                participant_minutes=round(group["participant_seconds"] / 60, 2),
+                peak_room_participants=group["peak_room_participants"],
+            )
+            for key, group in grouped.items()
+        ],
+    )
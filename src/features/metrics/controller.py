@@ -0,0 +1,28 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.metrics import registry
+
+# Create an APIRouter for the 'metrics' feature.
+router = APIRouter(
+    tags=["Metrics"],
+)
+
+# The content type of the Prometheus text exposition format.
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="Prometheus Metrics",
+    description=(
+        "Exposes request, LiveKit and SQL latency histograms, webhook counters and "
+        "the statistics of the in-process caches and queues in the Prometheus text format."
+    ),
+)
+def get_metrics():
+    """
+    Renders every registered metric for a Prometheus scrape.
+    """
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
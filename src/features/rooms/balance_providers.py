@@ -0,0 +1,101 @@
+import abc
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import httpx
+
+# A lookup key: (wallet address, contract address), both lowercase.
+BalanceKey = Tuple[str, str]
+
+# The `balanceOf(address)` selector, shared by ERC-20 and ERC-721 contracts.
+BALANCE_OF_SELECTOR = "0x70a08231"
+
+
+class BalanceLookupError(Exception):
+    """Raised when a provider cannot return balances."""
+
+
+class BalanceProvider(abc.ABC):
+    """
+    Looks up on-chain balances. Implementations receive every key that missed the
+    cache for a request at once, so they should fetch them in as few calls as possible.
+    """
+
+    @abc.abstractmethod
+    async def get_balances(self, keys: Sequence[BalanceKey]) -> Dict[BalanceKey, int]:
+        """Returns the balance of each (wallet, contract) key, in the contract's base units."""
+
+    async def aclose(self):
+        """Releases any connections held by the provider."""
+
+
+class StaticBalanceProvider(BalanceProvider):
+    """
+    Serves balances from memory. Stands in for a chain in tests and local development;
+    unknown keys have a zero balance.
+    """
+
+    def __init__(self, balances: Optional[Dict[BalanceKey, int]] = None):
+        self.balances: Dict[BalanceKey, int] = {
+            (wallet.lower(), contract.lower()): amount for (wallet, contract), amount in (balances or {}).items()
+        }
+        self.calls = 0
+
+    def set_balance(self, wallet: str, contract: str, amount: int):
+        self.balances[(wallet.lower(), contract.lower())] = amount
+
+    async def get_balances(self, keys: Sequence[BalanceKey]) -> Dict[BalanceKey, int]:
+        self.calls += 1
+        return {key: self.balances.get(key, 0) for key in keys}
+
+
+class JsonRpcBalanceProvider(BalanceProvider):
+    """
+    Reads `balanceOf` from an Ethereum JSON-RPC endpoint. All keys of one lookup are
+    sent as a single JSON-RPC batch of `eth_call`s.
+    """
+
+    def __init__(self, rpc_url: str, timeout_seconds: float = 5.0, client: Optional[httpx.AsyncClient] = None):
+        self.rpc_url = rpc_url
+        self._client = client or httpx.AsyncClient(timeout=timeout_seconds)
+
+    @staticmethod
+    def build_batch(keys: Iterable[BalanceKey]) -> list:
+        return [
+            {
+                "jsonrpc": "2.0",
+                "id": index,
+                "method": "eth_call",
+                "params": [{"to": contract, "data": BALANCE_OF_SELECTOR + wallet[2:].rjust(64, "0")}, "latest"],
+            }
+            for index, (wallet, contract) in enumerate(keys)
+        ]
+
+    async def get_balances(self, keys: Sequence[BalanceKey]) -> Dict[BalanceKey, int]:
+        keys = list(keys)
+        try:
+            response = await self._client.post(self.rpc_url, json=self.build_batch(keys))
+            response.raise_for_status()
+            replies = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            raise BalanceLookupError(f"Balance lookup failed: {e}") from e
+
+        # A single error object means the whole batch was rejected.
+        if isinstance(replies, dict):
+            raise BalanceLookupError(f"Balance lookup failed: {replies.get('error')}")
+
+        balances: Dict[BalanceKey, int] = {}
+        for reply in replies:
+            index = reply.get("id")
+            if not isinstance(index, int) or not 0 <= index < len(keys):
+                continue
+            if "error" in reply:
+                raise BalanceLookupError(f"Balance lookup failed for {keys[index]}: {reply['error']}")
+            result = reply.get("result") or "0x"
+            balances[keys[index]] = int(result, 16) if result != "0x" else 0
+        missing = [key for key in keys if key not in balances]
+        if missing:
+            raise BalanceLookupError(f"Balance lookup returned no result for {missing}")
+        return balances
+
+    async def aclose(self):
+        await self._client.aclose()
@@ -0,0 +1,147 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional
+
+from src.config import settings
+from src.entities.room_entity import Room as RoomEntity
+from src.invalidation import ROOM_TOPIC, invalidation_bus
+from src.metrics import registry
+
+
+@dataclass(frozen=True)
+class CachedRoom:
+    """
+    An immutable snapshot of a room record.
+    Snapshots are safe to share across requests, unlike ORM instances bound to a session.
+    """
+    id: int
+    name: str
+    livekit_sid: str
+    access_type: str
+    token_address: Optional[str]
+    token_amount: Optional[str]
+    nft_address: Optional[str]
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_entity(cls, db_room: RoomEntity) -> "CachedRoom":
+        return cls(
+            id=db_room.id,
+            name=db_room.name,
+            livekit_sid=db_room.livekit_sid,
+            access_type=db_room.access_type,
+            token_address=db_room.token_address,
+            token_amount=db_room.token_amount,
+            nft_address=db_room.nft_address,
+            created_at=db_room.created_at,
+        )
+
+
+class RoomCache:
+    """
+    A bounded, thread-safe LRU cache of room records keyed by room name.
+
+    Entries expire `ttl_seconds` after they are stored. When the cache is full,
+    the least recently used entry is evicted.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple[float, CachedRoom]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, name: str) -> Optional[CachedRoom]:
+        """Returns the cached room, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, room = entry
+            if expires_at <= self._clock():
+                del self._entries[name]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(name)
+            self.hits += 1
+            return room
+
+    def set(self, room: CachedRoom) -> CachedRoom:
+        """Stores a room, evicting the least recently used entries if the cache is full."""
+        if self.max_size <= 0:
+            return room
+
+        with self._lock:
+            self._entries[room.name] = (self._clock() + self.ttl_seconds, room)
+            self._entries.move_to_end(room.name)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return room
+
+    def invalidate(self, name: str):
+        """Drops a single room from the cache."""
+        with self._lock:
+            self._entries.pop(name, None)
+
+    def clear(self):
+        """Drops every entry and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self) -> dict:
+        """Returns a snapshot of the cache counters."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+# A single process-wide cache shared by the token hot path and its invalidators,
+# created on first use so that importing this module does not load the settings.
+_room_cache: Optional[RoomCache] = None
+
+
+def get_room_cache() -> RoomCache:
+    global _room_cache
+    if _room_cache is None:
+        _room_cache = RoomCache(
+            max_size=settings.ROOM_CACHE_MAX_SIZE,
+            ttl_seconds=settings.ROOM_CACHE_TTL_SECONDS,
+        )
+    return _room_cache
+
+
+def _invalidate(name: str):
+    if _room_cache is not None:
+        _room_cache.invalidate(name)
+
+
+def _clear():
+    if _room_cache is not None:
+        _room_cache.clear()
+
+
+registry.register_stats("room_cache", "Room cache statistics", lambda: get_room_cache().stats())
+# Rooms changed by another worker are dropped through the invalidation bus. If the bus
+# may have missed messages, the whole cache is dropped.
+invalidation_bus.subscribe(ROOM_TOPIC, _invalidate, on_reset=_clear)
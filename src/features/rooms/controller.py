@@ -1,11 +1,29 @@
 # src/features/rooms/controller.py (Updated)
-from fastapi import APIRouter, Depends, status, HTTPException, Response
+from fastapi import APIRouter, Depends, Query, status, HTTPException, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List, Literal, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from src.database.core import get_db
+from src.config import settings
+from src.database.core import get_db, get_session, get_session_factory
 from src.features.rooms import service as room_service
 from src.features.rooms import models as room_models
-from src.exceptions import RoomNotFoundException, RoomAlreadyExistsException, LiveKitServiceException
+from src.features.rooms import listing as room_listing
+from src.features.rooms import serializers as room_serializers
+from src.features.analytics import models as analytics_models
+from src.features.analytics import service as analytics_service
+from src.serialization import FastJSONResponse
+from src.exceptions import (
+    RoomNotFoundException,
+    RoomAlreadyExistsException,
+    RoomAccessDeniedException,
+    GatingUnavailableException,
+    LiveKitServiceException,
+    InvalidCursorException,
+    RoomBatchTooLargeException,
+    TokenBatchTooLargeException
+)
 
 router = APIRouter(
     prefix="/rooms",
@@ -21,10 +39,12 @@ router = APIRouter(
 )
 async def create_room(
     request: room_models.RoomCreateRequest,
-    db: Session = Depends(get_db)
+    db: Session | AsyncSession = Depends(get_session)
 ):
     try:
         db_room = await room_service.create_room_service(db=db, request=request)
+        if settings.FAST_SERIALIZATION_ENABLED:
+            return FastJSONResponse(room_serializers.room_to_dict(db_room), status_code=status.HTTP_201_CREATED)
         return db_room
     except (RoomAlreadyExistsException, LiveKitServiceException) as e:
         raise e
@@ -34,6 +54,121 @@ async def create_room(
             detail=f"An unexpected error occurred: {str(e)}"
         )
 
+@router.get(
+    "/",
+    response_model=room_models.RoomListResponse,
+    summary="List meeting rooms",
+    description=(
+        "Lists rooms ordered by creation time using keyset pagination: pass `next_cursor` "
+        "as `cursor` to fetch the next page. With `format=ndjson`, every matching room is "
+        "streamed as newline-delimited JSON instead of being paginated."
+    )
+)
+def list_rooms(
+    access_type: Optional[room_models.AccessType] = Query(None, description="Only list rooms with this access type."),
+    cursor: Optional[str] = Query(None, description="The `next_cursor` of the previous page."),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (ROOM_LIST_DEFAULT_LIMIT by default, at most ROOM_LIST_MAX_LIMIT)."),
+    format: Literal["json", "ndjson"] = Query("json", description="`ndjson` streams all matching rooms."),
+    db: Session = Depends(get_db),
+    session_factory=Depends(get_session_factory)
+):
+    # The page size bounds are settings, so they are applied here rather than in Query().
+    if limit is None:
+        limit = settings.ROOM_LIST_DEFAULT_LIMIT
+    elif limit > settings.ROOM_LIST_MAX_LIMIT:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"limit may not exceed {settings.ROOM_LIST_MAX_LIMIT}."
+        )
+    try:
+        if format == "ndjson":
+            if cursor is not None:
+                room_listing.decode_cursor(cursor)  # reject a bad cursor before streaming starts
+            return StreamingResponse(
+                room_listing.stream_rooms_ndjson(
+                    session_factory,
+                    batch_size=settings.ROOM_LIST_STREAM_BATCH_SIZE,
+                    access_type=access_type,
+                    cursor=cursor,
+                    fast=settings.FAST_SERIALIZATION_ENABLED,
+                ),
+                media_type="application/x-ndjson",
+            )
+
+        rooms, next_cursor = room_listing.list_rooms_page(db, limit=limit, access_type=access_type, cursor=cursor)
+        if settings.FAST_SERIALIZATION_ENABLED:
+            return FastJSONResponse(room_serializers.room_list_to_dict(rooms, next_cursor))
+        return room_models.RoomListResponse(items=rooms, next_cursor=next_cursor)
+    except InvalidCursorException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An unexpected error occurred while listing rooms: {str(e)}"
+        )
+
+@router.post(
+    "/bulk",
+    response_model=room_models.BulkRoomCreateResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Create many meeting rooms at once",
+    description=(
+        "Creates every room in the request, calling LiveKit concurrently and storing the "
+        "created rooms in one transaction. Each room reports its own outcome, in request order."
+    )
+)
+async def create_rooms_bulk(
+    requests: List[room_models.RoomCreateRequest],
+    db: Session | AsyncSession = Depends(get_session)
+):
+    try:
+        results = await room_service.bulk_create_rooms_service(db=db, requests=requests)
+        return room_models.BulkRoomCreateResponse(results=results)
+    except RoomBatchTooLargeException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An unexpected error occurred: {str(e)}"
+        )
+
+@router.get(
+    "/occupancy",
+    response_model=room_models.RoomOccupancyResponse,
+    summary="Get the occupancy of all rooms",
+    description="Served from the in-memory occupancy view maintained from LiveKit webhooks."
+)
+async def get_occupancy():
+    return room_service.get_occupancy_service()
+
+@router.get(
+    "/{room_name}/participants",
+    response_model=room_models.RoomParticipantsResponse,
+    summary="List the participants in a room",
+    description="Served from the in-memory occupancy view maintained from LiveKit webhooks."
+)
+async def get_room_participants(room_name: str):
+    return room_service.get_room_participants_service(room_name)
+
+@router.get(
+    "/{room_name}/stats",
+    response_model=analytics_models.RoomStatsResponse,
+    summary="Get usage statistics of a room",
+    description=(
+        "Reports total duration, peak concurrent participants, unique participants and "
+        "participant minutes of a room across its sessions, served from the usage rollups."
+    )
+)
+def get_room_stats(
+    room_name: str,
+    recent_sessions: int = Query(10, ge=0, le=100, description="How many recent sessions to list."),
+    db: Session = Depends(get_db)
+):
+    stats = analytics_service.get_room_stats_service(db=db, room_name=room_name, recent_sessions=recent_sessions)
+    if stats.sessions == 0 and room_service.get_cached_room_by_name(db, room_name) is None:
+        raise RoomNotFoundException(room_name=room_name)
+    return stats
+
 @router.post(
     "/{room_name}/token",
     response_model=room_models.JoinTokenResponse,
@@ -47,8 +182,10 @@ def create_join_token(
 ):
     try:
         jwt = room_service.create_join_token_service(db=db, room_name=room_name, request=request)
+        if settings.FAST_SERIALIZATION_ENABLED:
+            return FastJSONResponse(room_serializers.join_token_to_dict(jwt))
         return room_models.JoinTokenResponse(token=jwt)
-    except RoomNotFoundException as e:
+    except (RoomNotFoundException, RoomAccessDeniedException, GatingUnavailableException) as e:
         raise e
     except Exception as e:
         raise HTTPException(
@@ -56,15 +193,56 @@ def create_join_token(
             detail=f"An unexpected error occurred while generating the token: {str(e)}"
         )
 
+@router.post(
+    "/{room_name}/tokens",
+    response_model=room_models.BatchJoinTokenResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Generate join tokens for many participants",
+    description=(
+        "Issues one join token per request item. The room is resolved once for the whole batch, "
+        "results are returned in request order, and per-item failures are reported in `error`."
+    )
+)
+def create_join_tokens_batch(
+    room_name: str,
+    requests: List[room_models.JoinTokenRequest],
+    db: Session = Depends(get_db)
+):
+    try:
+        results = room_service.create_join_tokens_batch_service(db=db, room_name=room_name, requests=requests)
+        if settings.FAST_SERIALIZATION_ENABLED:
+            return FastJSONResponse(room_serializers.join_token_results_to_dict(results))
+        return room_models.BatchJoinTokenResponse(results=results)
+    except (RoomNotFoundException, TokenBatchTooLargeException, GatingUnavailableException) as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An unexpected error occurred while generating the tokens: {str(e)}"
+        )
+
 # --- NEW ENDPOINT ---
 @router.delete(
     "/{room_name}",
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Delete a meeting room",
-    description="Deletes a room from the LiveKit server and removes its record from the local database."
+    description=(
+        "Deletes a room from the LiveKit server and removes its record from the local database. "
+        "With the LiveKit outbox enabled, the record is removed right away and the LiveKit "
+        "deletion is queued as a job: the response is 202 with the job to poll."
+    ),
+    responses={202: {"model": room_models.RoomDeletionAccepted}},
 )
-async def delete_room(room_name: str, db: Session = Depends(get_db)):
+async def delete_room(room_name: str, db: Session | AsyncSession = Depends(get_session)):
     try:
+        if settings.LIVEKIT_OUTBOX_ENABLED:
+            job = await room_service.schedule_room_deletion_service(db=db, room_name=room_name)
+            accepted = room_models.RoomDeletionAccepted(room_name=room_name, job_id=job.id, status=job.status)
+            return JSONResponse(
+                accepted.model_dump(),
+                status_code=status.HTTP_202_ACCEPTED,
+                headers={"Location": f"/v1/admin/jobs/{job.id}"},
+            )
         await room_service.delete_room_service(db=db, room_name=room_name)
         # For DELETE, a 204 response means success and has no body.
         return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.config import settings
+from src.features.rooms.balance_providers import (
+    BalanceKey,
+    BalanceLookupError,
+    BalanceProvider,
+    JsonRpcBalanceProvider,
+    StaticBalanceProvider,
+)
+from src.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+WALLET_ADDRESS = re.compile(r"^0x[0-9a-fA-F]{40}$")
+
+
+@dataclass(frozen=True)
+class AccessRequirement:
+    """The minimum balance of `contract` a participant's wallet must hold to join a room."""
+
+    contract: Optional[str]
+    minimum: int
+
+
+def requirement_for(room) -> Optional[AccessRequirement]:
+    """
+    Returns the requirement of a token- or NFT-gated room, or None for a public room.
+    `token_amount` is in the token's base units; NFT rooms require holding at least one.
+    """
+    if room.access_type == "token":
+        try:
+            minimum = int(room.token_amount) if room.token_amount else 1
+        except ValueError:
+            logger.warning(f"Room '{room.name}' has an invalid token_amount '{room.token_amount}'.")
+            return AccessRequirement(contract=None, minimum=1)
+        return AccessRequirement(contract=room.token_address, minimum=max(minimum, 1))
+    if room.access_type == "nft":
+        return AccessRequirement(contract=room.nft_address, minimum=1)
+    return None
+
+
+class BalanceGate:
+    """
+    Decides whether wallets meet a room's requirement, caching balances per (wallet, contract).
+
+    A cached balance stays fresh for `positive_ttl_seconds` when it grants access and for
+    `negative_ttl_seconds` when it does not, so a participant who just acquired the token
+    is let in quickly. All cache misses of one check go to the provider in a single call,
+    and concurrent checks for the same key share one in-flight lookup.
+    The gate runs on the event loop and is not meant to be called from other threads.
+    """
+
+    def __init__(
+        self,
+        provider: BalanceProvider,
+        positive_ttl_seconds: float,
+        negative_ttl_seconds: float,
+        max_size: int = 100000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.provider = provider
+        self.positive_ttl_seconds = positive_ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_size = max_size
+        self._clock = clock
+        self._entries: "OrderedDict[BalanceKey, Tuple[int, float]]" = OrderedDict()
+        self._inflight: Dict[BalanceKey, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.provider_calls = 0
+        self.provider_errors = 0
+
+    def _cached_balance(self, key: BalanceKey, minimum: int) -> Optional[int]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        balance, fetched_at = entry
+        ttl = self.positive_ttl_seconds if balance >= minimum else self.negative_ttl_seconds
+        if self._clock() - fetched_at >= ttl:
+            return None
+        self._entries.move_to_end(key)
+        return balance
+
+    def _store(self, key: BalanceKey, balance: int):
+        self._entries[key] = (balance, self._clock())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def check(self, wallets: Sequence[str], requirement: AccessRequirement) -> Dict[str, bool]:
+        """Returns, for each wallet, whether it holds at least the required balance."""
+        results: Dict[str, bool] = {}
+        pending: Dict[str, asyncio.Future] = {}
+        to_fetch: List[BalanceKey] = []
+        contract = (requirement.contract or "").lower()
+
+        for wallet in dict.fromkeys(wallets):
+            if not WALLET_ADDRESS.match(contract) or not WALLET_ADDRESS.match(wallet):
+                results[wallet] = False
+                continue
+            key = (wallet.lower(), contract)
+            balance = self._cached_balance(key, requirement.minimum)
+            if balance is not None:
+                self.hits += 1
+                results[wallet] = balance >= requirement.minimum
+            elif key in self._inflight:
+                self.coalesced += 1
+                pending[wallet] = self._inflight[key]
+            else:
+                self.misses += 1
+                future = asyncio.get_running_loop().create_future()
+                self._inflight[key] = pending[wallet] = future
+                to_fetch.append(key)
+
+        if to_fetch:
+            await self._fetch(to_fetch)
+
+        if pending:
+            balances = await asyncio.gather(*pending.values())
+            for wallet, balance in zip(pending, balances):
+                results[wallet] = balance >= requirement.minimum
+        return results
+
+    async def _fetch(self, keys: List[BalanceKey]):
+        """Looks up `keys` in one provider call and settles their in-flight futures."""
+        self.provider_calls += 1
+        try:
+            balances = await self.provider.get_balances(keys)
+        except BaseException as e:
+            self.provider_errors += 1
+            error = e if isinstance(e, BalanceLookupError) else BalanceLookupError(f"Balance lookup failed: {e!r}")
+            for key in keys:
+                future = self._inflight.pop(key)
+                if not future.done():
+                    future.set_exception(error)
+            if not isinstance(e, Exception):
+                raise
+            return
+        for key in keys:
+            balance = balances.get(key, 0)
+            self._store(key, balance)
+            future = self._inflight.pop(key)
+            if not future.done():
+                future.set_result(balance)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "provider_calls": self.provider_calls,
+            "provider_errors": self.provider_errors,
+        }
+
+
+# The gate is created on first use, with the provider chosen in Settings.
+_balance_gate: Optional[BalanceGate] = None
+
+
+def get_balance_gate() -> BalanceGate:
+    """Returns the shared gate, backed by JSON-RPC when GATING_RPC_URL is set."""
+    global _balance_gate
+    if _balance_gate is None:
+        if settings.GATING_RPC_URL:
+            provider = JsonRpcBalanceProvider(settings.GATING_RPC_URL, settings.GATING_RPC_TIMEOUT_SECONDS)
+        else:
+            logger.warning("GATING_RPC_URL is not set; gated rooms are checked against an empty balance table.")
+            provider = StaticBalanceProvider()
+        _balance_gate = BalanceGate(
+            provider,
+            positive_ttl_seconds=settings.GATING_POSITIVE_TTL_SECONDS,
+            negative_ttl_seconds=settings.GATING_NEGATIVE_TTL_SECONDS,
+            max_size=settings.GATING_CACHE_MAX_SIZE,
+        )
+    return _balance_gate
+
+
+async def close_balance_gate():
+    """Closes the provider of the shared gate, if it was created."""
+    global _balance_gate
+    if _balance_gate is not None:
+        await _balance_gate.provider.aclose()
+        _balance_gate = None
+
+
+registry.register_stats("gating", "Room gating balance cache", lambda: _balance_gate.stats() if _balance_gate else {})
@@ -0,0 +1,115 @@
+import base64
+import json
+from datetime import datetime
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+
+from sqlalchemy import Select, and_, func, or_, select
+from sqlalchemy.orm import Session
+
+from src.entities.room_entity import Room as RoomEntity
+from src.exceptions import InvalidCursorException
+from src.features.rooms import models as room_models
+from src.features.rooms.serializers import room_to_dict
+from src.serialization import dumps
+
+
+def encode_cursor(db_room: RoomEntity) -> str:
+    """Encodes the (created_at, id) position of a room as an opaque cursor."""
+    payload = json.dumps([db_room.created_at.isoformat(), db_room.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decodes a cursor produced by `encode_cursor`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, room_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(room_id)
+    except (ValueError, TypeError):
+        raise InvalidCursorException()
+
+
+def _created_at_key(db: Session, value: Optional[datetime] = None):
+    """
+    Returns the created_at sort key, or the bound key of `value`.
+    SQLite stores server-generated and client-supplied timestamps in different text
+    formats, so it compares julianday() values; other databases compare the column directly.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        if value is None:
+            return func.julianday(RoomEntity.created_at)
+        return func.julianday(value.replace(tzinfo=None).isoformat(sep=" "))
+    return RoomEntity.created_at if value is None else value
+
+
+def build_room_listing_query(
+    db: Session,
+    access_type: Optional[str] = None,
+    cursor: Optional[str] = None,
+) -> Select:
+    """Builds the keyset-ordered room query, starting after `cursor` if given."""
+    created_at_key = _created_at_key(db)
+    statement = select(RoomEntity).order_by(created_at_key, RoomEntity.id)
+    if access_type is not None:
+        statement = statement.where(RoomEntity.access_type == access_type)
+    if cursor is not None:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        cursor_key = _created_at_key(db, cursor_created_at)
+        statement = statement.where(
+            or_(
+                created_at_key > cursor_key,
+                and_(created_at_key == cursor_key, RoomEntity.id > cursor_id),
+            )
+        )
+    return statement
+
+
+def list_rooms_page(
+    db: Session,
+    limit: int,
+    access_type: Optional[str] = None,
+    cursor: Optional[str] = None,
+) -> Tuple[List[RoomEntity], Optional[str]]:
+    """
+    Returns up to `limit` rooms after `cursor` and the cursor of the next page.
+    Each page is a single index seek, however deep into the table it starts.
+    """
+    statement = build_room_listing_query(db, access_type=access_type, cursor=cursor).limit(limit + 1)
+    rooms = list(db.execute(statement).scalars())
+    if len(rooms) > limit:
+        rooms = rooms[:limit]
+        return rooms, encode_cursor(rooms[-1])
+    return rooms, None
+
+
+def stream_rooms_ndjson(
+    session_factory: Callable[[], Session],
+    batch_size: int,
+    access_type: Optional[str] = None,
+    cursor: Optional[str] = None,
+    fast: bool = False,
+) -> Iterator[Union[str, bytes]]:
+    """
+    Yields every matching room as newline-delimited JSON.
+    With `fast`, rows are encoded with orjson without building a `RoomResponse` first.
+
+    Plain rows (not ORM instances) are fetched `batch_size` at a time from a server-side
+    cursor, so nothing accumulates in the session and memory stays flat regardless of
+    table size. The generator owns its session because it keeps running after the
+    request handler has returned.
+    """
+    db = session_factory()
+    try:
+        statement = build_room_listing_query(db, access_type=access_type, cursor=cursor)
+        statement = statement.with_only_columns(*RoomEntity.__table__.columns)
+        result = db.execute(statement.execution_options(yield_per=batch_size))
+        for batch in result.partitions():
+            if fast:
+                yield b"".join(dumps(room_to_dict(row)) + b"\n" for row in batch)
+            else:
+                yield "".join(
+                    room_models.RoomResponse.model_validate(row).model_dump_json() + "\n"
+                    for row in batch
+                )
+    finally:
+        db.close()
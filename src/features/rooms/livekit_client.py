@@ -0,0 +1,266 @@
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import aiohttp
+from livekit.api import ServerError, ServerErrorCode
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Server error codes that say nothing about the request itself, so another attempt may succeed.
+TRANSIENT_ERROR_CODES = {
+    ServerErrorCode.UNAVAILABLE,
+    ServerErrorCode.INTERNAL,
+    ServerErrorCode.DEADLINE_EXCEEDED,
+    ServerErrorCode.RESOURCE_EXHAUSTED,
+    ServerErrorCode.UNKNOWN,
+}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling LiveKit while the circuit breaker is open."""
+
+    def __init__(self, retry_in_seconds: float):
+        super().__init__(f"LiveKit is unavailable; failing fast for another {retry_in_seconds:.1f}s.")
+        self.retry_in_seconds = retry_in_seconds
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether `error` points at LiveKit's health rather than at the request."""
+    if isinstance(error, ServerError):
+        return error.status >= 500 or error.code in TRANSIENT_ERROR_CODES
+    return isinstance(error, (asyncio.TimeoutError, aiohttp.ClientError, OSError))
+
+
+class CircuitBreaker:
+    """
+    A consecutive-failure circuit breaker.
+
+    After `failure_threshold` transient failures in a row the breaker opens and rejects
+    calls for `reset_timeout_seconds`. It then lets a single probe through (half-open):
+    a success closes it again, a failure re-opens it. Used from the event loop only.
+    """
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+    # Numeric states for the metrics registry, which only exports numbers.
+    STATE_CODES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout_seconds: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._clock = clock
+        self.reset()
+
+    def reset(self):
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at: Optional[float] = None
+        self.opened_count = 0
+        self.rejected = 0
+
+    def before_call(self):
+        """Raises CircuitOpenError if a call may not go to LiveKit now."""
+        now = self._clock()
+        if self.state == self.OPEN:
+            remaining = self._opened_at + self.reset_timeout_seconds - now
+            if remaining > 0:
+                self.rejected += 1
+                raise CircuitOpenError(remaining)
+            self.state = self.HALF_OPEN
+            self._probe_started_at = None
+        if self.state == self.HALF_OPEN:
+            # A probe whose outcome never came back (e.g. it was cancelled) stops
+            # blocking others after one reset timeout.
+            if self._probe_started_at is not None and now - self._probe_started_at < self.reset_timeout_seconds:
+                self.rejected += 1
+                raise CircuitOpenError(self._probe_started_at + self.reset_timeout_seconds - now)
+            self._probe_started_at = now
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._probe_started_at = None
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.opened_count += 1
+                logger.warning(f"LiveKit circuit breaker opened after {self.consecutive_failures} failures.")
+            self.state = self.OPEN
+            self._opened_at = self._clock()
+            self._probe_started_at = None
+
+    def stats(self) -> dict:
+        return {
+            "state": self.STATE_CODES[self.state],
+            "consecutive_failures": self.consecutive_failures,
+            "opened": self.opened_count,
+            "rejected": self.rejected,
+        }
+
+
+@dataclass(frozen=True)
+class CallPolicy:
+    """
+    How one LiveKit operation is called. `timeout_seconds` is the budget of the whole
+    call, retries included. Only idempotent operations should have `attempts` above 1.
+    With `hedge_after_seconds` set, a second identical request is sent if the first has
+    not answered by then, and whichever answers first wins.
+    """
+
+    timeout_seconds: float
+    attempts: int = 1
+    hedge_after_seconds: float = 0.0
+
+
+class ResilientRoomClient:
+    """
+    Wraps the `room` service of the shared `api.LiveKitAPI` client with per-operation
+    deadlines, jittered exponential backoff between retries, hedged requests and a
+    circuit breaker. It exposes the same methods as the wrapped service, so it can be
+    handed to the occupancy resync and the reconciler in its place.
+    """
+
+    def __init__(
+        self,
+        room_service: Callable[[], Any],
+        policies: Dict[str, CallPolicy],
+        breaker: Optional[CircuitBreaker] = None,
+        retry_base_delay_seconds: float = 0.05,
+        retry_max_delay_seconds: float = 1.0,
+        rng: Callable[[], float] = random.random,
+    ):
+        # Resolves the wrapped room service per call; replace it to route calls elsewhere.
+        self.room_service = room_service
+        self.policies = policies
+        self.breaker = breaker or CircuitBreaker()
+        self.retry_base_delay_seconds = retry_base_delay_seconds
+        self.retry_max_delay_seconds = retry_max_delay_seconds
+        self._rng = rng
+        self.retries = 0
+        self.hedges = 0
+        self.deadline_exceeded = 0
+
+    @classmethod
+    def from_settings(cls, room_service: Callable[[], Any]) -> "ResilientRoomClient":
+        write_timeout = settings.LIVEKIT_WRITE_TIMEOUT_SECONDS
+        list_timeout = settings.LIVEKIT_LIST_TIMEOUT_SECONDS
+        attempts = max(settings.LIVEKIT_RETRY_ATTEMPTS, 1)
+        hedge_after = settings.LIVEKIT_HEDGE_LIST_AFTER_SECONDS
+        return cls(
+            room_service,
+            policies={
+                # LiveKit returns the existing room when one with the same name exists,
+                # so creating is idempotent; deleting is retried since a repeat is harmless.
+                "create_room": CallPolicy(write_timeout, attempts),
+                "delete_room": CallPolicy(write_timeout, attempts),
+                "list_rooms": CallPolicy(list_timeout, attempts, hedge_after),
+                "list_participants": CallPolicy(list_timeout, attempts, hedge_after),
+            },
+            breaker=CircuitBreaker(
+                failure_threshold=settings.LIVEKIT_BREAKER_FAILURE_THRESHOLD,
+                reset_timeout_seconds=settings.LIVEKIT_BREAKER_RESET_SECONDS,
+            ),
+            retry_base_delay_seconds=settings.LIVEKIT_RETRY_BASE_DELAY_SECONDS,
+            retry_max_delay_seconds=settings.LIVEKIT_RETRY_MAX_DELAY_SECONDS,
+        )
+
+    async def create_room(self, request):
+        return await self.call("create_room", request)
+
+    async def delete_room(self, request):
+        return await self.call("delete_room", request)
+
+    async def list_rooms(self, request):
+        return await self.call("list_rooms", request)
+
+    async def list_participants(self, request):
+        return await self.call("list_participants", request)
+
+    async def call(self, operation: str, request):
+        """Calls `operation` on the room service within its policy."""
+        policy = self.policies[operation]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + policy.timeout_seconds
+        attempt = 0
+        while True:
+            attempt += 1
+            self.breaker.before_call()
+            try:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                method = getattr(self.room_service(), operation)
+                result = await asyncio.wait_for(self._attempt(method, request, policy), remaining)
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self.deadline_exceeded += 1
+                if not is_transient(e):
+                    # LiveKit answered, so it is healthy even though the request failed.
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                delay = self._rng() * min(
+                    self.retry_max_delay_seconds, self.retry_base_delay_seconds * 2 ** (attempt - 1)
+                )
+                if attempt >= policy.attempts or loop.time() + delay >= deadline:
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise asyncio.TimeoutError(
+                            f"LiveKit {operation} exceeded its {policy.timeout_seconds}s deadline"
+                        ) from e
+                    raise
+                self.retries += 1
+                logger.info(f"Retrying LiveKit {operation} in {delay * 1000:.0f} ms after: {e!r}")
+                await asyncio.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return result
+
+    async def _attempt(self, method: Callable[[Any], Awaitable[Any]], request, policy: CallPolicy):
+        if policy.hedge_after_seconds <= 0:
+            return await method(request)
+
+        first = asyncio.ensure_future(method(request))
+        tasks = [first]
+        try:
+            # Cancelling this attempt (e.g. at the deadline) cancels every request it started.
+            done, _ = await asyncio.wait({first}, timeout=policy.hedge_after_seconds)
+            if done:
+                return first.result()
+
+            self.hedges += 1
+            tasks.append(asyncio.ensure_future(method(request)))
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            **{f"breaker_{key}": value for key, value in self.breaker.stats().items()},
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "deadline_exceeded": self.deadline_exceeded,
+        }
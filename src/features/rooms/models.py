@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
-from typing import Optional, Literal
+from typing import List, Optional, Literal
 
 # Define a literal type for access control to enforce specific values.
 AccessType = Literal['public', 'token', 'nft']
@@ -107,4 +107,111 @@ class JoinTokenResponse(BaseModel):
                 "token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9..."
             }
         }
-    )
\ No newline at end of file
+    )
+
+class JoinTokenResult(BaseModel):
+    """
+    Pydantic model for a single item of a batch token response.
+    Exactly one of `token` or `error` is set.
+    """
+    identity: str = Field(..., description="The identity the token was requested for.")
+    token: Optional[str] = Field(None, description="The JWT access token, if signing succeeded.")
+    error: Optional[str] = Field(None, description="Why the token could not be issued, if it failed.")
+
+class BatchJoinTokenResponse(BaseModel):
+    """
+    Pydantic model for the API response of a batch token request.
+    Results are returned in the same order as the request items.
+    """
+    results: List[JoinTokenResult]
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "results": [
+                    {"identity": "0x1234...abcd", "token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...", "error": None},
+                    {"identity": "", "token": None, "error": "identity and room must be set when joining a room"}
+                ]
+            }
+        }
+    )
+
+
+class ParticipantPresence(BaseModel):
+    """
+    A participant currently in a room, as seen by the occupancy view.
+    """
+    identity: str
+    joined_at: datetime
+
+class RoomParticipantsResponse(BaseModel):
+    """
+    Pydantic model for the live participants of a room.
+    """
+    room_name: str
+    room_sid: Optional[str] = Field(None, description="The SID of the current room session, if occupied.")
+    participant_count: int
+    participants: List[ParticipantPresence]
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "room_name": "my-dao-meeting",
+                "room_sid": "RM_xxxxxxxxx",
+                "participant_count": 1,
+                "participants": [
+                    {"identity": "0x1234...abcd", "joined_at": "2024-01-01T12:00:00Z"}
+                ]
+            }
+        }
+    )
+
+class RoomOccupancyEntry(BaseModel):
+    """
+    The participant count of one room.
+    """
+    room_name: str
+    participant_count: int
+
+class RoomOccupancyResponse(BaseModel):
+    """
+    Pydantic model for the occupancy of every occupied room.
+    """
+    total_participants: int
+    rooms: List[RoomOccupancyEntry]
+
+
+class BulkRoomCreateResult(BaseModel):
+    """
+    The outcome of creating one room in a bulk request.
+    """
+    name: str
+    status: Literal['created', 'already_exists', 'failed']
+    room: Optional[RoomResponse] = Field(None, description="The created room, if creation succeeded.")
+    error: Optional[str] = Field(None, description="Why the room was not created, if it failed.")
+
+class BulkRoomCreateResponse(BaseModel):
+    """
+    Pydantic model for the API response of a bulk room creation request.
+    Results are returned in the same order as the request items.
+    """
+    results: List[BulkRoomCreateResult]
+
+
+class RoomListResponse(BaseModel):
+    """
+    Pydantic model for one page of the room listing.
+    Pass `next_cursor` back as `cursor` to fetch the following page.
+    """
+    items: List[RoomResponse]
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page, or null on the last page.")
+
+
+class RoomDeletionAccepted(BaseModel):
+    """
+    Pydantic model for the 202 response of a deletion handled by the LiveKit outbox.
+    The room is already gone from the database; the LiveKit side is carried out by job `job_id`.
+    """
+    room_name: str
+    job_id: int
+    status: str = Field(..., description="The status of the LiveKit job, e.g. 'pending'.")
@@ -0,0 +1,185 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from livekit.api import ListParticipantsRequest, ListRoomsRequest
+
+from src.invalidation import OCCUPANCY_TOPIC, PARTICIPANT_JOINED_TOPIC, PARTICIPANT_LEFT_TOPIC, invalidation_bus
+from src.metrics import registry, time_livekit_call
+
+logger = logging.getLogger(__name__)
+
+
+class RoomPresence:
+    """The live participants of one room, keyed by identity with their join time (Unix seconds)."""
+    __slots__ = ("room_sid", "participants", "updated_at")
+
+    def __init__(self, room_sid: str):
+        self.room_sid = room_sid
+        self.participants: Dict[str, int] = {}
+        self.updated_at = time.monotonic()
+
+
+class RoomOccupancy:
+    """
+    An in-memory materialized view of who is in which room.
+
+    The view is maintained from participant_joined, participant_left and room_finished
+    webhooks, so reads never call LiveKit. Every worker keeps its own view: the worker
+    that receives a webhook broadcasts it on the invalidation bus, see `announce_*`.
+    A periodic resync against the LiveKit API corrects drift from missed or dropped events.
+    """
+
+    def __init__(self):
+        self._rooms: Dict[str, RoomPresence] = {}
+        self._total_participants = 0
+        self._lock = threading.Lock()
+
+    def participant_joined(self, room_name: str, room_sid: str, identity: str, joined_at: int):
+        with self._lock:
+            presence = self._rooms.get(room_name)
+            if presence is None or (room_sid and presence.room_sid != room_sid):
+                # A new room session replaces whatever was left of a previous one.
+                if presence is not None:
+                    self._total_participants -= len(presence.participants)
+                presence = self._rooms[room_name] = RoomPresence(room_sid)
+            if identity not in presence.participants:
+                self._total_participants += 1
+            presence.participants[identity] = joined_at
+            presence.updated_at = time.monotonic()
+
+    def participant_left(self, room_name: str, identity: str):
+        with self._lock:
+            presence = self._rooms.get(room_name)
+            if presence is None:
+                return
+            if presence.participants.pop(identity, None) is not None:
+                self._total_participants -= 1
+            presence.updated_at = time.monotonic()
+            if not presence.participants:
+                del self._rooms[room_name]
+
+    def room_finished(self, room_name: str):
+        with self._lock:
+            presence = self._rooms.pop(room_name, None)
+            if presence is not None:
+                self._total_participants -= len(presence.participants)
+
+    def get(self, room_name: str) -> Tuple[Optional[str], Dict[str, int]]:
+        """Returns the room SID and a copy of its participants (identity -> joined_at)."""
+        with self._lock:
+            presence = self._rooms.get(room_name)
+            if presence is None:
+                return None, {}
+            return presence.room_sid, dict(presence.participants)
+
+    def counts(self) -> Dict[str, int]:
+        """Returns the participant count of every occupied room."""
+        with self._lock:
+            return {name: len(presence.participants) for name, presence in self._rooms.items()}
+
+    @property
+    def total_participants(self) -> int:
+        return self._total_participants
+
+    def stats(self) -> dict:
+        """Returns the number of occupied rooms and connected participants."""
+        with self._lock:
+            return {"rooms": len(self._rooms), "participants": self._total_participants}
+
+    def replace_room(self, room_name: str, room_sid: str, participants: Dict[str, int], observed_at: float):
+        """
+        Replaces a room's state with a snapshot taken from LiveKit at `observed_at`.
+        Rooms changed by a webhook after the snapshot was taken are left alone.
+        """
+        with self._lock:
+            presence = self._rooms.get(room_name)
+            if presence is not None:
+                if presence.updated_at > observed_at:
+                    return
+                self._total_participants -= len(presence.participants)
+            if not participants:
+                self._rooms.pop(room_name, None)
+                return
+            presence = self._rooms[room_name] = RoomPresence(room_sid)
+            presence.participants.update(participants)
+            presence.updated_at = observed_at
+            self._total_participants += len(participants)
+
+    def drop_rooms_except(self, room_names: set, observed_at: float):
+        """Removes rooms LiveKit no longer reports, unless they changed after `observed_at`."""
+        with self._lock:
+            for name in [name for name in self._rooms if name not in room_names]:
+                if self._rooms[name].updated_at <= observed_at:
+                    self._total_participants -= len(self._rooms.pop(name).participants)
+
+    def clear(self):
+        with self._lock:
+            self._rooms.clear()
+            self._total_participants = 0
+
+    async def resync(self, room_client, concurrency: int = 8):
+        """
+        Reconciles the view with LiveKit's `list_rooms` and `list_participants`.
+        `room_client` is the `room` service of an `api.LiveKitAPI` client.
+        """
+        started_at = time.monotonic()
+        async with time_livekit_call("list_rooms"):
+            response = await room_client.list_rooms(ListRoomsRequest())
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def sync_room(room):
+            async with semaphore:
+                observed_at = time.monotonic()
+                async with time_livekit_call("list_participants"):
+                    listing = await room_client.list_participants(ListParticipantsRequest(room=room.name))
+            participants = {p.identity: int(p.joined_at) for p in listing.participants}
+            self.replace_room(room.name, room.sid, participants, observed_at)
+
+        rooms: List = list(response.rooms)
+        await asyncio.gather(*(sync_room(room) for room in rooms))
+        self.drop_rooms_except({room.name for room in rooms}, started_at)
+        return rooms
+
+    async def run_resync_loop(
+        self, room_client, interval_seconds: float, on_resync: Optional[Callable[[List, float], None]] = None
+    ):
+        """
+        Resyncs the view every `interval_seconds` until cancelled. `on_resync` is called
+        with the rooms LiveKit reported and the wall-clock time they were listed at.
+        """
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                listed_at = time.time()
+                rooms = await self.resync(room_client)
+                if on_resync is not None:
+                    on_resync(rooms, listed_at)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Room occupancy resync with LiveKit failed: {e}")
+
+
+# The process-wide occupancy view, fed by the webhook handlers.
+room_occupancy = RoomOccupancy()
+registry.register_stats("room_occupancy", "Room occupancy view", room_occupancy.stats)
+# A room_finished webhook handled by another worker drops the room here too.
+invalidation_bus.subscribe(OCCUPANCY_TOPIC, room_occupancy.room_finished)
+
+
+def announce_participant_joined(room_name: str, room_sid: str, identity: str, joined_at: int):
+    """Records a join in this worker's view and in those of the other workers."""
+    invalidation_bus.publish(PARTICIPANT_JOINED_TOPIC, json.dumps([room_name, room_sid, identity, joined_at]))
+
+
+def announce_participant_left(room_name: str, identity: str):
+    """Records a leave in this worker's view and in those of the other workers."""
+    invalidation_bus.publish(PARTICIPANT_LEFT_TOPIC, json.dumps([room_name, identity]))
+
+
+invalidation_bus.subscribe(PARTICIPANT_JOINED_TOPIC, lambda key: room_occupancy.participant_joined(*json.loads(key)))
+invalidation_bus.subscribe(PARTICIPANT_LEFT_TOPIC, lambda key: room_occupancy.participant_left(*json.loads(key)))
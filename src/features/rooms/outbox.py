@@ -0,0 +1,292 @@
+import asyncio
+import json
+import logging
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.orm import Session
+
+from src.entities.livekit_job_entity import LiveKitJob
+
+logger = logging.getLogger(__name__)
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def new_job(operation: str, room_name: str, payload: Optional[dict] = None) -> LiveKitJob:
+    """Builds a job that is due immediately. Add it to the session of the change that needs it."""
+    return LiveKitJob(
+        operation=operation,
+        room_name=room_name,
+        payload=json.dumps(payload or {}),
+        status=JOB_PENDING,
+        attempts=0,
+        next_attempt_at=utcnow(),
+    )
+
+
+@dataclass(frozen=True)
+class ClaimedJob:
+    """A job a worker holds a lease on. `attempts` includes the current attempt."""
+    id: int
+    operation: str
+    room_name: str
+    payload: dict
+    attempts: int
+
+
+JobHandler = Callable[[ClaimedJob], Awaitable[None]]
+
+
+class LiveKitOutbox:
+    """
+    Carries out the LiveKit jobs stored in the `livekit_jobs` table.
+
+    A pool of asyncio workers claims due jobs in batches. On PostgreSQL the claim uses
+    `FOR UPDATE SKIP LOCKED`, so workers of every process share the table without
+    blocking each other; elsewhere the claim is a single conditional UPDATE. A claimed
+    job is leased for `lease_seconds`: if its worker dies, another one picks it up after
+    the lease expires. Failed attempts are retried with jittered exponential backoff until
+    `max_attempts` is reached, and the final status is recorded on the job. Finished jobs
+    are deleted `retention_seconds` after completion by a sweep that runs every
+    `prune_interval_seconds`.
+    Database work runs on worker threads so it never blocks the event loop.
+    """
+
+    def __init__(
+        self,
+        handlers: Dict[str, JobHandler],
+        num_workers: int = 4,
+        batch_size: int = 10,
+        poll_interval_seconds: float = 1.0,
+        max_attempts: int = 8,
+        backoff_base_seconds: float = 1.0,
+        backoff_max_seconds: float = 300.0,
+        lease_seconds: float = 60.0,
+        retention_seconds: float = 604800.0,
+        prune_interval_seconds: float = 3600.0,
+        rng: Callable[[], float] = random.random,
+    ):
+        self.handlers = handlers
+        self.num_workers = max(1, num_workers)
+        self.batch_size = max(1, batch_size)
+        self.poll_interval_seconds = poll_interval_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.lease_seconds = lease_seconds
+        self.retention_seconds = retention_seconds
+        self.prune_interval_seconds = prune_interval_seconds
+        self._rng = rng
+
+        self._session_factory: Optional[Callable[[], Session]] = None
+        self._workers: List[asyncio.Task] = []
+        self._pruner: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+
+        self.claimed = 0
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+        self.pruned = 0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self, session_factory: Callable[[], Session]):
+        """Starts the workers, using sessions from `session_factory`."""
+        if self.running:
+            return
+        self._session_factory = session_factory
+        self._wake = asyncio.Event()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"livekit-outbox-worker-{index}")
+            for index in range(self.num_workers)
+        ]
+        if self.prune_interval_seconds > 0:
+            self._pruner = asyncio.create_task(self._prune_forever(), name="livekit-outbox-pruner")
+        logger.info(f"Started {self.num_workers} LiveKit outbox workers.")
+
+    async def stop(self):
+        """
+        Stops the workers. Jobs they were running keep their lease and are retried by
+        the next worker to claim them once it expires.
+        """
+        tasks = self._workers + ([self._pruner] if self._pruner is not None else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._pruner = None
+
+    def notify(self):
+        """Wakes idle workers so a job that was just committed does not wait for the next poll."""
+        if self._wake is not None:
+            self._wake.set()
+
+    def backoff_seconds(self, attempts: int) -> float:
+        """The delay before the next attempt after `attempts` failed ones, with equal jitter."""
+        delay = min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** (attempts - 1))
+        return delay / 2 + self._rng() * delay / 2
+
+    def claim(self, db: Session, limit: int) -> List[ClaimedJob]:
+        """Leases up to `limit` due jobs, oldest first, and returns them."""
+        now = utcnow()
+        claimable = or_(
+            and_(LiveKitJob.status == JOB_PENDING, LiveKitJob.next_attempt_at <= now),
+            and_(LiveKitJob.status == JOB_RUNNING, LiveKitJob.lease_expires_at <= now),
+        )
+        due_ids = (
+            select(LiveKitJob.id)
+            .where(claimable)
+            .order_by(LiveKitJob.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        statement = (
+            update(LiveKitJob)
+            .where(LiveKitJob.id.in_(due_ids), claimable)
+            .values(
+                status=JOB_RUNNING,
+                attempts=LiveKitJob.attempts + 1,
+                lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+            )
+            .returning(LiveKitJob.id, LiveKitJob.operation, LiveKitJob.room_name, LiveKitJob.payload, LiveKitJob.attempts)
+            .execution_options(synchronize_session=False)
+        )
+        rows = db.execute(statement).all()
+        db.commit()
+        jobs = [
+            ClaimedJob(id=row.id, operation=row.operation, room_name=row.room_name,
+                       payload=json.loads(row.payload or "{}"), attempts=row.attempts)
+            for row in rows
+        ]
+        jobs.sort(key=lambda job: job.id)
+        self.claimed += len(jobs)
+        return jobs
+
+    def record(self, db: Session, outcomes: List[Tuple[ClaimedJob, Optional[BaseException]]]):
+        """
+        Stores the outcome of each attempt. An outcome is ignored if the job was reclaimed
+        by another worker in the meantime, since that worker now owns it.
+        """
+        now = utcnow()
+        for job, error in outcomes:
+            if error is None:
+                values = dict(status=JOB_SUCCEEDED, completed_at=now, lease_expires_at=None, last_error=None)
+                self.succeeded += 1
+            elif job.attempts >= self.max_attempts:
+                values = dict(status=JOB_FAILED, completed_at=now, lease_expires_at=None, last_error=repr(error))
+                self.failed += 1
+                logger.error(f"LiveKit job {job.id} ({job.operation} '{job.room_name}') failed for good: {error!r}")
+            else:
+                values = dict(
+                    status=JOB_PENDING,
+                    next_attempt_at=now + timedelta(seconds=self.backoff_seconds(job.attempts)),
+                    lease_expires_at=None,
+                    last_error=repr(error),
+                )
+                self.retried += 1
+            db.execute(
+                update(LiveKitJob)
+                .where(LiveKitJob.id == job.id, LiveKitJob.attempts == job.attempts, LiveKitJob.status == JOB_RUNNING)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+
+    def prune(self, db: Session) -> int:
+        """Deletes succeeded and failed jobs completed more than `retention_seconds` ago."""
+        cutoff = utcnow() - timedelta(seconds=self.retention_seconds)
+        result = db.execute(
+            delete(LiveKitJob)
+            .where(LiveKitJob.status.in_((JOB_SUCCEEDED, JOB_FAILED)), LiveKitJob.completed_at < cutoff)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        self.pruned += result.rowcount
+        return result.rowcount
+
+    async def _run(self, job: ClaimedJob) -> Optional[BaseException]:
+        handler = self.handlers.get(job.operation)
+        try:
+            if handler is None:
+                raise ValueError(f"No handler for LiveKit job operation '{job.operation}'.")
+            await handler(job)
+            return None
+        except Exception as e:
+            logger.warning(f"LiveKit job {job.id} ({job.operation} '{job.room_name}') attempt {job.attempts} failed: {e!r}")
+            return e
+
+    def _claim_batch(self) -> List[ClaimedJob]:
+        with self._session_factory() as db:
+            return self.claim(db, self.batch_size)
+
+    def _record_outcomes(self, outcomes):
+        with self._session_factory() as db:
+            self.record(db, outcomes)
+
+    def _prune(self) -> int:
+        with self._session_factory() as db:
+            return self.prune(db)
+
+    async def run_once(self, session_factory: Optional[Callable[[], Session]] = None) -> int:
+        """Claims one batch, runs its jobs concurrently and records the outcomes. Returns the batch size."""
+        if session_factory is not None:
+            self._session_factory = session_factory
+        jobs = await asyncio.to_thread(self._claim_batch)
+        if not jobs:
+            return 0
+        errors = await asyncio.gather(*(self._run(job) for job in jobs))
+        await asyncio.to_thread(self._record_outcomes, list(zip(jobs, errors)))
+        return len(jobs)
+
+    async def _worker(self):
+        while True:
+            self._wake.clear()
+            try:
+                processed = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"LiveKit outbox worker failed to claim or record jobs: {e}", exc_info=True)
+                processed = 0
+            if processed < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _prune_forever(self):
+        while True:
+            await asyncio.sleep(self.prune_interval_seconds)
+            try:
+                pruned = await asyncio.to_thread(self._prune)
+                if pruned:
+                    logger.info(f"Pruned {pruned} finished LiveKit jobs.")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Pruning finished LiveKit jobs failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "workers": self.num_workers,
+            "claimed": self.claimed,
+            "succeeded": self.succeeded,
+            "retried": self.retried,
+            "failed": self.failed,
+            "pruned": self.pruned,
+        }
@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from livekit.api import DeleteRoomRequest, ListRoomsRequest
+from sqlalchemy import bindparam, delete, select, update
+from sqlalchemy.orm import Session
+
+from src.entities.room_entity import Room as RoomEntity
+from src.features.rooms import listing as room_listing
+from src.invalidation import ROOM_TOPIC, invalidation_bus
+from src.metrics import time_livekit_call
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReconcileReport:
+    """What a single reconciliation pass looked at and fixed."""
+    full_sweep: bool = False
+    livekit_rooms: int = 0
+    db_rows_checked: int = 0
+    stale_rows_deleted: int = 0
+    sids_updated: int = 0
+    orphans_deleted: int = 0
+
+
+def _chunks(items: List[str], size: int) -> Iterable[List[str]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _age_seconds(created_at: Optional[datetime], now: float) -> float:
+    if created_at is None:
+        return float("inf")
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return now - created_at.timestamp()
+
+
+class RoomReconciler:
+    """
+    Brings the `rooms` table and the LiveKit server back in line.
+
+    Three kinds of drift are fixed in bulk:
+    - stale rows: rooms in the database that LiveKit no longer has (closed on empty_timeout);
+    - SID mismatches: rooms recreated in LiveKit under the same name;
+    - orphans: LiveKit rooms with no database row (e.g. a crash between the LiveKit call
+      and the database commit), which are deleted from LiveKit.
+
+    Passes are incremental. Each pass diffs LiveKit's room list against the previous pass
+    and only checks rows created after the database watermark, plus the names that
+    appeared or disappeared in LiveKit. Every `full_sweep_every` passes, everything is
+    compared. Rooms younger than `grace_seconds` are never touched, so in-flight creations
+    are not mistaken for drift; their names are checked again on the next pass.
+    """
+
+    def __init__(
+        self,
+        room_client,
+        session_factory: Callable[[], Session],
+        batch_size: int = 500,
+        grace_seconds: float = 120.0,
+        full_sweep_every: int = 12,
+        delete_livekit_orphans: bool = True,
+        livekit_concurrency: int = 5,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._room_client = room_client
+        self._session_factory = session_factory
+        self.batch_size = batch_size
+        self.grace_seconds = grace_seconds
+        self.full_sweep_every = max(1, full_sweep_every)
+        self.delete_livekit_orphans = delete_livekit_orphans
+        self.livekit_concurrency = livekit_concurrency
+        self._clock = clock
+
+        self.passes = 0
+        self._previous_livekit_names: Optional[Set[str]] = None
+        # Names skipped by the last pass because their room was within the grace period.
+        self._pending_names: Set[str] = set()
+        # The keyset cursor of the newest row already checked.
+        self._db_watermark: Optional[str] = None
+
+    async def run_once(self) -> ReconcileReport:
+        """Runs a single reconciliation pass."""
+        full_sweep = self._previous_livekit_names is None or self.passes % self.full_sweep_every == 0
+        report = ReconcileReport(full_sweep=full_sweep)
+
+        async with time_livekit_call("list_rooms"):
+            response = await self._room_client.list_rooms(ListRoomsRequest())
+        livekit_rooms = {room.name: room for room in response.rooms}
+        report.livekit_rooms = len(livekit_rooms)
+        current_names = set(livekit_rooms)
+
+        if full_sweep:
+            names_to_check = sorted(current_names)
+            disappeared: List[str] = []
+        else:
+            pending = self._pending_names
+            names_to_check = sorted((current_names - self._previous_livekit_names) | (pending & current_names))
+            disappeared = sorted((self._previous_livekit_names - current_names) | (pending - current_names))
+
+        now = self._clock()
+        deferred: Set[str] = set()
+        orphans = await asyncio.to_thread(
+            self._reconcile_db, livekit_rooms, names_to_check, disappeared, full_sweep, now, report, deferred
+        )
+        young_orphans = {
+            name for name in orphans
+            if now - livekit_rooms[name].creation_time < self.grace_seconds
+        }
+        orphans = [name for name in orphans if name not in young_orphans]
+        if orphans and self.delete_livekit_orphans:
+            report.orphans_deleted = await self._delete_livekit_rooms(orphans)
+
+        self._previous_livekit_names = current_names
+        self._pending_names = deferred | young_orphans
+        self.passes += 1
+        logger.info(f"Room reconciliation pass finished: {report}")
+        return report
+
+    def _reconcile_db(
+        self,
+        livekit_rooms: Dict,
+        names_to_check: List[str],
+        disappeared: List[str],
+        full_sweep: bool,
+        now: float,
+        report: ReconcileReport,
+        deferred: Set[str],
+    ) -> List[str]:
+        """
+        Fixes the database side of the drift and returns the LiveKit orphans found.
+        Rows left alone because they are within the grace period are added to `deferred`.
+        """
+        # Stale rows are deleted by id, so a row recreated under the same name survives.
+        stale: Dict[int, str] = {}
+        sid_updates: Dict[int, str] = {}
+
+        def check_row(name: str, room_id: int, livekit_sid: str, created_at: Optional[datetime]):
+            report.db_rows_checked += 1
+            livekit_room = livekit_rooms.get(name)
+            if livekit_room is None:
+                if _age_seconds(created_at, now) >= self.grace_seconds:
+                    stale[room_id] = name
+                else:
+                    deferred.add(name)
+            elif livekit_room.sid and livekit_room.sid != livekit_sid:
+                sid_updates[room_id] = livekit_room.sid
+
+        db = self._session_factory()
+        try:
+            # Walk rows past the watermark (everything on a full sweep) in keyset order.
+            cursor = None if full_sweep else self._db_watermark
+            while True:
+                rows, next_cursor = room_listing.list_rooms_page(db, limit=self.batch_size, cursor=cursor)
+                for row in rows:
+                    check_row(row.name, row.id, row.livekit_sid, row.created_at)
+                if rows:
+                    self._db_watermark = room_listing.encode_cursor(rows[-1])
+                db.expunge_all()
+                if next_cursor is None:
+                    break
+                cursor = next_cursor
+
+            # Rooms that closed in LiveKit since the last pass, whatever their age in the table.
+            for batch in _chunks(disappeared, self.batch_size):
+                statement = select(RoomEntity.name, RoomEntity.id, RoomEntity.livekit_sid, RoomEntity.created_at)
+                for row in db.execute(statement.where(RoomEntity.name.in_(batch))):
+                    check_row(row.name, row.id, row.livekit_sid, row.created_at)
+
+            # LiveKit rooms without a row are orphans.
+            orphans: List[str] = []
+            for batch in _chunks(names_to_check, self.batch_size):
+                known = set(db.execute(select(RoomEntity.name).where(RoomEntity.name.in_(batch))).scalars())
+                orphans.extend(name for name in batch if name not in known)
+
+            for batch in _chunks(sorted(stale), self.batch_size):
+                db.execute(delete(RoomEntity).where(RoomEntity.id.in_(batch)))
+            if sid_updates:
+                db.connection().execute(
+                    update(RoomEntity.__table__)
+                    .where(RoomEntity.__table__.c.id == bindparam("room_id"))
+                    .values(livekit_sid=bindparam("new_sid")),
+                    [{"room_id": room_id, "new_sid": sid} for room_id, sid in sid_updates.items()],
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        for name in set(stale.values()):
+            invalidation_bus.publish(ROOM_TOPIC, name)
+        report.stale_rows_deleted = len(stale)
+        report.sids_updated = len(sid_updates)
+        return orphans
+
+    async def _delete_livekit_rooms(self, names: List[str]) -> int:
+        semaphore = asyncio.Semaphore(self.livekit_concurrency)
+
+        async def delete_one(name: str) -> bool:
+            async with semaphore:
+                try:
+                    async with time_livekit_call("delete_room"):
+                        await self._room_client.delete_room(DeleteRoomRequest(room=name))
+                    return True
+                except Exception as e:
+                    logger.warning(f"Failed to delete orphaned LiveKit room '{name}': {e}")
+                    return False
+
+        return sum(await asyncio.gather(*(delete_one(name) for name in names)))
+
+    async def run_forever(self, interval_seconds: float):
+        """Runs a pass every `interval_seconds` until cancelled."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Room reconciliation pass failed: {e}")
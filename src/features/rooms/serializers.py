@@ -0,0 +1,40 @@
+from typing import Iterable, List, Optional
+
+from src.features.rooms import models as room_models
+
+
+def room_to_dict(room) -> dict:
+    """
+    Builds the `RoomResponse` payload from a room entity, cached room or row without
+    re-validating it. Keys follow the field order of `RoomResponse`.
+    """
+    return {
+        "name": room.name,
+        "access_type": room.access_type,
+        "token_address": room.token_address,
+        "token_amount": room.token_amount,
+        "nft_address": room.nft_address,
+        "id": room.id,
+        "livekit_sid": room.livekit_sid,
+        "created_at": room.created_at,
+    }
+
+
+def room_list_to_dict(rooms: Iterable, next_cursor: Optional[str]) -> dict:
+    """Builds the `RoomListResponse` payload."""
+    return {"items": [room_to_dict(room) for room in rooms], "next_cursor": next_cursor}
+
+
+def join_token_to_dict(token: str) -> dict:
+    """Builds the `JoinTokenResponse` payload."""
+    return {"token": token}
+
+
+def join_token_results_to_dict(results: List[room_models.JoinTokenResult]) -> dict:
+    """Builds the `BatchJoinTokenResponse` payload."""
+    return {
+        "results": [
+            {"identity": result.identity, "token": result.token, "error": result.error}
+            for result in results
+        ]
+    }
@@ -1,30 +1,104 @@
 # src/features/rooms/service.py (Final Corrected Version)
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import anyio
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from livekit import api
 # Import DeleteRoomRequest along with the others
-from livekit.api import CreateRoomRequest as LiveKitCreateRoomRequest, DeleteRoomRequest
+from livekit.api import CreateRoomRequest as LiveKitCreateRoomRequest, DeleteRoomRequest, ServerError, ServerErrorCode
 
 from src.config import settings
+from src.invalidation import ROOM_TOPIC, invalidation_bus
+from src.metrics import registry, time_livekit_call
+from src.single_flight import AsyncSingleFlight, SingleFlight
 from src.features.rooms import models as room_models
+from src.features.rooms.cache import CachedRoom, get_room_cache
+from src.features.rooms.livekit_client import ResilientRoomClient
+from src.features.rooms.outbox import ClaimedJob, LiveKitOutbox, new_job
+from src.features.rooms import gating
+from src.features.rooms.balance_providers import BalanceLookupError
+from src.features.rooms.occupancy import room_occupancy
+from src.features.rooms.token_minter import JoinTokenMinter
 from src.entities.room_entity import Room as RoomEntity
+from src.entities.livekit_job_entity import LiveKitJob
 from src.exceptions import (
     RoomNotFoundException,
     RoomAlreadyExistsException,
-    LiveKitServiceException
+    RoomAccessDeniedException,
+    GatingUnavailableException,
+    LiveKitServiceException,
+    RoomBatchTooLargeException,
+    TokenBatchTooLargeException
 )
 
 logger = logging.getLogger(__name__)
 
-# Initialize the LiveKit API client explicitly from our settings object.
-try:
-    lkapi = api.LiveKitAPI(
-        url=settings.LIVEKIT_URL,
-        api_key=settings.LIVEKIT_API_KEY,
-        api_secret=settings.LIVEKIT_API_SECRET,
-    )
-except ValueError as e:
-    raise RuntimeError(f"LiveKit API credentials are not configured correctly: {e}") from e
+# The LiveKit API client is created on first use, inside the running event loop,
+# since it opens an HTTP session.
+_lkapi: Optional[api.LiveKitAPI] = None
+
+def get_livekit_api() -> api.LiveKitAPI:
+    """Returns the shared LiveKit API client, creating it from our settings on first use."""
+    global _lkapi
+    if _lkapi is None:
+        try:
+            _lkapi = api.LiveKitAPI(
+                url=settings.LIVEKIT_URL,
+                api_key=settings.LIVEKIT_API_KEY,
+                api_secret=settings.LIVEKIT_API_SECRET,
+            )
+        except ValueError as e:
+            raise RuntimeError(f"LiveKit API credentials are not configured correctly: {e}") from e
+    return _lkapi
+
+# The room service singletons below are created on first use, like the LiveKit client,
+# so importing this module does not load the settings.
+_join_token_minter: Optional[JoinTokenMinter] = None
+_token_signing_executor: Optional[ThreadPoolExecutor] = None
+_livekit_rooms: Optional[ResilientRoomClient] = None
+_livekit_outbox: Optional[LiveKitOutbox] = None
+
+def get_join_token_minter() -> JoinTokenMinter:
+    """Returns the shared minter, which reuses the HMAC key and encoded JWT header across every join token."""
+    global _join_token_minter
+    if _join_token_minter is None:
+        _join_token_minter = JoinTokenMinter(
+            api_key=settings.LIVEKIT_API_KEY,
+            api_secret=settings.LIVEKIT_API_SECRET,
+        )
+    return _join_token_minter
+
+def get_token_signing_executor() -> ThreadPoolExecutor:
+    """Returns the shared pool used to sign large token batches off the request thread."""
+    global _token_signing_executor
+    if _token_signing_executor is None:
+        _token_signing_executor = ThreadPoolExecutor(
+            max_workers=settings.TOKEN_BATCH_MAX_WORKERS,
+            thread_name_prefix="token-signer",
+        )
+    return _token_signing_executor
+
+def get_livekit_rooms() -> ResilientRoomClient:
+    """Returns the resilience layer all room calls go through; it resolves the LiveKit client per call."""
+    global _livekit_rooms
+    if _livekit_rooms is None:
+        _livekit_rooms = ResilientRoomClient.from_settings(lambda: get_livekit_api().room)
+    return _livekit_rooms
+
+registry.register_stats("livekit_client", "LiveKit client resilience", lambda: get_livekit_rooms().stats())
+
+# Concurrent cache misses for one room name share a single query, and concurrent
+# creates of one name share a single LiveKit call and insert.
+room_lookup_flight = SingleFlight()
+room_create_flight = AsyncSingleFlight()
+registry.register_stats("room_lookup_flight", "Coalesced room lookups", room_lookup_flight.stats)
+registry.register_stats("room_create_flight", "Coalesced room creations", room_create_flight.stats)
 
 async def create_room_in_livekit(
     name: str,
@@ -33,13 +107,14 @@ async def create_room_in_livekit(
 ) -> api.Room:
     """Calls the LiveKit API to create a new room."""
     try:
-        livekit_room = await lkapi.room.create_room(
-            LiveKitCreateRoomRequest(
-                name=name,
-                empty_timeout=empty_timeout,
-                max_participants=max_participants,
+        async with time_livekit_call("create_room"):
+            livekit_room = await get_livekit_rooms().create_room(
+                LiveKitCreateRoomRequest(
+                    name=name,
+                    empty_timeout=empty_timeout,
+                    max_participants=max_participants,
+                )
             )
-        )
         return livekit_room
     except Exception as e:
         raise LiveKitServiceException(detail=str(e))
@@ -55,17 +130,106 @@ def create_room_in_db(db: Session, request: room_models.RoomCreateRequest, livek
         nft_address=request.nft_address
     )
     db.add(db_room)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another process inserted the same name after our existence check.
+        db.rollback()
+        raise RoomAlreadyExistsException(room_name=request.name)
     db.refresh(db_room)
     return db_room
 
+async def create_room_in_db_async(
+    db: AsyncSession,
+    request: room_models.RoomCreateRequest,
+    livekit_sid: str
+) -> RoomEntity:
+    """Creates and saves a new room record using an AsyncSession."""
+    db_room = RoomEntity(
+        name=request.name,
+        livekit_sid=livekit_sid,
+        access_type=request.access_type,
+        token_address=request.token_address,
+        token_amount=request.token_amount,
+        nft_address=request.nft_address
+    )
+    db.add(db_room)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise RoomAlreadyExistsException(room_name=request.name)
+    await db.refresh(db_room)
+    return db_room
+
 def get_room_by_name(db: Session, name: str) -> RoomEntity | None:
     """Retrieves a room from the database by its name."""
     return db.query(RoomEntity).filter(RoomEntity.name == name).first()
 
-async def create_room_service(db: Session, request: room_models.RoomCreateRequest) -> RoomEntity:
-    """Orchestrates the creation of a new room."""
-    if get_room_by_name(db, request.name):
+async def get_room_by_name_async(db: AsyncSession, name: str) -> RoomEntity | None:
+    """Retrieves a room by its name using an AsyncSession."""
+    result = await db.execute(select(RoomEntity).where(RoomEntity.name == name).limit(1))
+    return result.scalars().first()
+
+def delete_room_from_db(db: Session, db_room: RoomEntity):
+    """Removes a room record from the database."""
+    db.delete(db_room)
+    db.commit()
+
+async def delete_room_from_db_async(db: AsyncSession, db_room: RoomEntity):
+    """Removes a room record from the database using an AsyncSession."""
+    await db.delete(db_room)
+    await db.commit()
+
+def get_cached_room_by_name(db: Session, name: str) -> CachedRoom | None:
+    """
+    Retrieves a room snapshot, serving it from the in-process cache when possible.
+    Misses fall through to the database and fill the cache; concurrent misses for
+    the same name wait for one query instead of each running their own.
+    """
+    room_cache = get_room_cache()
+    cached_room = room_cache.get(name)
+    if cached_room is not None:
+        return cached_room
+
+    def load() -> CachedRoom | None:
+        db_room = get_room_by_name(db, name)
+        if db_room is None:
+            return None
+        return room_cache.set(CachedRoom.from_entity(db_room))
+
+    cached_room, _ = room_lookup_flight.do(name, load)
+    return cached_room
+
+async def create_room_service(
+    db: Session | AsyncSession,
+    request: room_models.RoomCreateRequest
+) -> RoomEntity | CachedRoom:
+    """
+    Orchestrates the creation of a new room.
+    Accepts either session type; an AsyncSession keeps every query off the event loop.
+
+    Concurrent creates of the same name run once. Callers that asked for the same room
+    as the one that ran get a snapshot of the created room, while callers that asked for
+    a different configuration, or any caller once the room exists, get a 409.
+    """
+    async def create() -> tuple[RoomEntity, CachedRoom, room_models.RoomCreateRequest]:
+        db_room = await _create_room(db, request)
+        return db_room, CachedRoom.from_entity(db_room), request
+
+    (db_room, snapshot, created_request), shared = await room_create_flight.do(request.name, create)
+    if not shared:
+        return db_room
+    if created_request != request:
+        raise RoomAlreadyExistsException(room_name=request.name)
+    return snapshot
+
+async def _create_room(db: Session | AsyncSession, request: room_models.RoomCreateRequest) -> RoomEntity:
+    if isinstance(db, AsyncSession):
+        existing_room = await get_room_by_name_async(db, request.name)
+    else:
+        existing_room = get_room_by_name(db, request.name)
+    if existing_room:
         raise RoomAlreadyExistsException(room_name=request.name)
 
     livekit_room = await create_room_in_livekit(
@@ -73,36 +237,191 @@ async def create_room_service(db: Session, request: room_models.RoomCreateReques
         empty_timeout=request.empty_timeout,
         max_participants=request.max_participants
     )
-    db_room = create_room_in_db(db, request, livekit_room.sid)
+    if isinstance(db, AsyncSession):
+        db_room = await create_room_in_db_async(db, request, livekit_room.sid)
+    else:
+        db_room = create_room_in_db(db, request, livekit_room.sid)
+    invalidation_bus.publish(ROOM_TOPIC, request.name)
     return db_room
 
+async def bulk_create_rooms_service(
+    db: Session | AsyncSession,
+    requests: List[room_models.RoomCreateRequest]
+) -> List[room_models.BulkRoomCreateResult]:
+    """
+    Creates many rooms in one call.
+
+    Name collisions are checked with a single IN query, LiveKit rooms are created
+    concurrently (bounded by ROOM_BULK_LIVEKIT_CONCURRENCY), and every successful room
+    is stored in one transaction. Results keep the order of the request items.
+    """
+    if len(requests) > settings.ROOM_BULK_MAX_SIZE:
+        raise RoomBatchTooLargeException(size=len(requests), max_size=settings.ROOM_BULK_MAX_SIZE)
+
+    names = [request.name for request in requests]
+    existing_statement = select(RoomEntity.name).where(RoomEntity.name.in_(names))
+    if isinstance(db, AsyncSession):
+        existing_names = set((await db.execute(existing_statement)).scalars())
+    else:
+        existing_names = set(db.execute(existing_statement).scalars())
+
+    results: List[room_models.BulkRoomCreateResult | None] = [None] * len(requests)
+    pending: List[int] = []
+    for index, request in enumerate(requests):
+        if request.name in existing_names:
+            results[index] = room_models.BulkRoomCreateResult(
+                name=request.name,
+                status="already_exists",
+                error=RoomAlreadyExistsException(room_name=request.name).detail,
+            )
+        else:
+            # Later duplicates within the same batch collide with the first occurrence.
+            existing_names.add(request.name)
+            pending.append(index)
+
+    semaphore = asyncio.Semaphore(settings.ROOM_BULK_LIVEKIT_CONCURRENCY)
+
+    async def create_in_livekit(request: room_models.RoomCreateRequest) -> api.Room:
+        async with semaphore:
+            return await create_room_in_livekit(
+                name=request.name,
+                empty_timeout=request.empty_timeout,
+                max_participants=request.max_participants
+            )
+
+    livekit_rooms = await asyncio.gather(
+        *(create_in_livekit(requests[index]) for index in pending),
+        return_exceptions=True,
+    )
+
+    created: List[tuple[int, RoomEntity]] = []
+    for index, livekit_room in zip(pending, livekit_rooms):
+        request = requests[index]
+        if isinstance(livekit_room, BaseException):
+            detail = getattr(livekit_room, "detail", None) or str(livekit_room)
+            results[index] = room_models.BulkRoomCreateResult(name=request.name, status="failed", error=detail)
+            continue
+        created.append((index, RoomEntity(
+            name=request.name,
+            livekit_sid=livekit_room.sid,
+            access_type=request.access_type,
+            token_address=request.token_address,
+            token_amount=request.token_amount,
+            nft_address=request.nft_address
+        )))
+
+    if created:
+        created_names = [db_room.name for _, db_room in created]
+        # Re-selecting after commit reloads every new row (including created_at) in one query.
+        reload_statement = select(RoomEntity).where(RoomEntity.name.in_(created_names))
+        try:
+            db.add_all([db_room for _, db_room in created])
+            if isinstance(db, AsyncSession):
+                await db.commit()
+                await db.execute(reload_statement)
+            else:
+                db.commit()
+                db.execute(reload_statement)
+        except Exception as e:
+            if isinstance(db, AsyncSession):
+                await db.rollback()
+            else:
+                db.rollback()
+            logger.error(f"Failed to store {len(created)} bulk-created rooms: {e}")
+            for index, db_room in created:
+                results[index] = room_models.BulkRoomCreateResult(
+                    name=db_room.name, status="failed", error=f"Database error: {e}"
+                )
+            created = []
+
+        for index, db_room in created:
+            invalidation_bus.publish(ROOM_TOPIC, db_room.name)
+            results[index] = room_models.BulkRoomCreateResult(
+                name=db_room.name,
+                status="created",
+                room=room_models.RoomResponse.model_validate(db_room),
+            )
+
+    return results
+
+def check_room_access(room: CachedRoom, identities: List[str]) -> Dict[str, bool]:
+    """
+    Returns whether each identity may join `room`. Public rooms, and every room while
+    GATING_ENABLED is off, admit everyone; gated rooms check all identities in one lookup.
+    Must be called from a worker thread of the running event loop, as sync endpoints are.
+    """
+    requirement = gating.requirement_for(room) if settings.GATING_ENABLED else None
+    if requirement is None:
+        return {identity: True for identity in identities}
+    try:
+        return anyio.from_thread.run(gating.get_balance_gate().check, identities, requirement)
+    except BalanceLookupError as e:
+        raise GatingUnavailableException(detail=str(e))
+
 def create_join_token_service(db: Session, room_name: str, request: room_models.JoinTokenRequest) -> str:
     """Generates a JWT access token for a user to join a specific room."""
-    db_room = get_room_by_name(db, room_name)
+    db_room = get_cached_room_by_name(db, room_name)
     if not db_room:
         raise RoomNotFoundException(room_name=room_name)
 
-    token = (
-        api.AccessToken(
-            api_key=settings.LIVEKIT_API_KEY,
-            api_secret=settings.LIVEKIT_API_SECRET,
-        )
-        .with_identity(request.identity)
-        .with_name(request.name)
-        .with_grants(
-            api.VideoGrants(
-                room_join=True,
-                room=room_name,
+    if not check_room_access(db_room, [request.identity])[request.identity]:
+        raise RoomAccessDeniedException(room_name=room_name, identity=request.identity)
+
+    return sign_join_token(room_name, request)
+
+def sign_join_token(room_name: str, request: room_models.JoinTokenRequest) -> str:
+    """Signs a join token for a room that is already known to exist."""
+    return get_join_token_minter().mint(room_name=room_name, identity=request.identity, name=request.name)
+
+def create_join_tokens_batch_service(
+    db: Session,
+    room_name: str,
+    requests: List[room_models.JoinTokenRequest]
+) -> List[room_models.JoinTokenResult]:
+    """
+    Generates join tokens for many participants of one room.
+
+    The room is resolved and its access requirement checked once for the whole batch.
+    A denied or failed item is reported in its result instead of failing the batch,
+    and results keep the order of the request items.
+    """
+    if len(requests) > settings.TOKEN_BATCH_MAX_SIZE:
+        raise TokenBatchTooLargeException(size=len(requests), max_size=settings.TOKEN_BATCH_MAX_SIZE)
+
+    db_room = get_cached_room_by_name(db, room_name)
+    if not db_room:
+        raise RoomNotFoundException(room_name=room_name)
+
+    access = check_room_access(db_room, [request.identity for request in requests])
+
+    def sign_one(request: room_models.JoinTokenRequest) -> room_models.JoinTokenResult:
+        if not access[request.identity]:
+            return room_models.JoinTokenResult(
+                identity=request.identity,
+                error=RoomAccessDeniedException(room_name=room_name, identity=request.identity).detail,
             )
-        )
-    )
-    return token.to_jwt()
+        try:
+            return room_models.JoinTokenResult(
+                identity=request.identity,
+                token=sign_join_token(room_name, request),
+            )
+        except Exception as e:
+            return room_models.JoinTokenResult(identity=request.identity, error=str(e))
+
+    if len(requests) >= settings.TOKEN_BATCH_THREAD_THRESHOLD:
+        # Executor.map yields results in submission order.
+        return list(get_token_signing_executor().map(sign_one, requests))
+    return [sign_one(request) for request in requests]
 
-async def delete_room_service(db: Session, room_name: str):
+async def delete_room_service(db: Session | AsyncSession, room_name: str):
     """
     Deletes a room from LiveKit and the local database.
     """
-    db_room = get_room_by_name(db, room_name)
+    get_room_cache().invalidate(room_name)
+    if isinstance(db, AsyncSession):
+        db_room = await get_room_by_name_async(db, room_name)
+    else:
+        db_room = get_room_by_name(db, room_name)
     if not db_room:
         logger.warning(f"Room '{room_name}' not found in local DB, but attempting LiveKit deletion.")
     
@@ -111,18 +430,109 @@ async def delete_room_service(db: Session, room_name: str):
         # --- THIS IS THE FIX ---
         # We must create a DeleteRoomRequest object and pass that to the method.
         delete_request = DeleteRoomRequest(room=room_name)
-        await lkapi.room.delete_room(delete_request)
+        async with time_livekit_call("delete_room"):
+            await get_livekit_rooms().delete_room(delete_request)
         logger.info(f"Successfully deleted room '{room_name}' from LiveKit.")
 
         if db_room:
-            db.delete(db_room)
-            db.commit()
+            if isinstance(db, AsyncSession):
+                await delete_room_from_db_async(db, db_room)
+            else:
+                delete_room_from_db(db, db_room)
+            invalidation_bus.publish(ROOM_TOPIC, room_name)
             logger.info(f"Successfully deleted room '{room_name}' from local database.")
 
     except Exception as e:
         logger.error(f"Error during LiveKit room deletion for '{room_name}': {e}")
 
 
+async def delete_room_in_livekit(room_name: str):
+    """Deletes a room from LiveKit. A room that is already gone counts as deleted."""
+    try:
+        async with time_livekit_call("delete_room"):
+            await get_livekit_rooms().delete_room(DeleteRoomRequest(room=room_name))
+    except ServerError as e:
+        if e.code != ServerErrorCode.NOT_FOUND:
+            raise
+
+async def run_delete_room_job(job: ClaimedJob):
+    await delete_room_in_livekit(job.room_name)
+
+def get_livekit_outbox() -> LiveKitOutbox:
+    """Returns the worker pool that carries out the LiveKit side effects committed to the livekit_jobs table."""
+    global _livekit_outbox
+    if _livekit_outbox is None:
+        _livekit_outbox = LiveKitOutbox(
+            handlers={"delete_room": run_delete_room_job},
+            num_workers=settings.LIVEKIT_OUTBOX_WORKERS,
+            batch_size=settings.LIVEKIT_OUTBOX_BATCH_SIZE,
+            poll_interval_seconds=settings.LIVEKIT_OUTBOX_POLL_INTERVAL_SECONDS,
+            max_attempts=settings.LIVEKIT_OUTBOX_MAX_ATTEMPTS,
+            backoff_base_seconds=settings.LIVEKIT_OUTBOX_BACKOFF_BASE_SECONDS,
+            backoff_max_seconds=settings.LIVEKIT_OUTBOX_BACKOFF_MAX_SECONDS,
+            lease_seconds=settings.LIVEKIT_OUTBOX_LEASE_SECONDS,
+            retention_seconds=settings.LIVEKIT_OUTBOX_RETENTION_SECONDS,
+            prune_interval_seconds=settings.LIVEKIT_OUTBOX_PRUNE_INTERVAL_SECONDS,
+        )
+    return _livekit_outbox
+
+registry.register_stats("livekit_outbox", "LiveKit outbox workers", lambda: get_livekit_outbox().stats())
+
+async def schedule_room_deletion_service(db: Session | AsyncSession, room_name: str) -> LiveKitJob:
+    """
+    Removes a room from the local database and, in the same transaction, records a job
+    to delete it from LiveKit. Returns without waiting for LiveKit; the outbox workers
+    carry the job out and retry it until it succeeds.
+    """
+    get_room_cache().invalidate(room_name)
+    job = new_job("delete_room", room_name)
+    if isinstance(db, AsyncSession):
+        db_room = await get_room_by_name_async(db, room_name)
+        if db_room:
+            await db.delete(db_room)
+        db.add(job)
+        await db.commit()
+    else:
+        db_room = get_room_by_name(db, room_name)
+        if db_room:
+            db.delete(db_room)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+    invalidation_bus.publish(ROOM_TOPIC, room_name)
+    get_livekit_outbox().notify()
+    return job
+
+
+def get_room_participants_service(room_name: str) -> room_models.RoomParticipantsResponse:
+    """Returns the live participants of a room from the in-memory occupancy view."""
+    room_sid, participants = room_occupancy.get(room_name)
+    return room_models.RoomParticipantsResponse(
+        room_name=room_name,
+        room_sid=room_sid,
+        participant_count=len(participants),
+        participants=[
+            room_models.ParticipantPresence(
+                identity=identity,
+                joined_at=datetime.fromtimestamp(joined_at, tz=timezone.utc),
+            )
+            for identity, joined_at in participants.items()
+        ],
+    )
+
+def get_occupancy_service() -> room_models.RoomOccupancyResponse:
+    """Returns the participant count of every occupied room from the occupancy view."""
+    return room_models.RoomOccupancyResponse(
+        total_participants=room_occupancy.total_participants,
+        rooms=[
+            room_models.RoomOccupancyEntry(room_name=name, participant_count=count)
+            for name, count in room_occupancy.counts().items()
+        ],
+    )
+
 async def close_livekit_client():
-    """Gracefully closes the LiveKit API client."""
-    await lkapi.aclose()
\ No newline at end of file
+    """Gracefully closes the LiveKit API client, if it was created."""
+    global _lkapi
+    if _lkapi is not None:
+        await _lkapi.aclose()
+        _lkapi = None
\ No newline at end of file
@@ -1,9 +1,17 @@
+import asyncio
 import logging
-from fastapi import APIRouter, Request, Header, HTTPException, status
+from functools import partial
+from fastapi import APIRouter, Depends, Request, Header, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
 from typing import Optional
 
+from src.config import settings
+from src.database.core import get_db
+from src.exceptions import WebhookQueueFullException
 from src.features.webhooks import service as webhook_service
 from src.features.webhooks import models as webhook_models
+from src.features.webhooks.queue import get_webhook_queue
 
 # Configure a logger for this module
 logger = logging.getLogger(__name__)
@@ -26,7 +34,8 @@ router = APIRouter(
 )
 async def handle_webhook(
     request: Request,
-    authorization: Optional[str] = Header(None)
+    authorization: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
 ):
     """
     Endpoint to process incoming webhooks from LiveKit.
@@ -35,6 +44,7 @@ async def handle_webhook(
     signed by the LiveKit API secret, which this endpoint will verify.
 
     The raw request body is passed to the service layer for validation and parsing.
+    Redeliveries of an already processed event are acknowledged without running the handlers again.
     """
     if authorization is None:
         logger.warning("Webhook received without Authorization header.")
@@ -44,21 +54,42 @@ async def handle_webhook(
         )
 
     try:
-        # Get the raw body as bytes, then decode to a string
-        body_bytes = await request.body()
-        body_str = body_bytes.decode("utf-8")
+        # The service layer validates and parses the raw bytes of the body.
+        body = await request.body()
+        if len(body) >= settings.WEBHOOK_VERIFY_OFFLOAD_BYTES:
+            # Hashing and parsing a large payload would stall the event loop.
+            event = await asyncio.get_running_loop().run_in_executor(
+                webhook_service.get_webhook_verify_executor(),
+                partial(webhook_service.process_webhook_event, body=body, authorization=authorization),
+            )
+        else:
+            event = webhook_service.process_webhook_event(
+                body=body,
+                authorization=authorization
+            )
 
-        # The service layer handles validation and parsing
-        event = webhook_service.process_webhook_event(
-            body=body_str,
-            authorization=authorization
-        )
+        # LiveKit redelivers events on timeouts; only the first delivery is processed.
+        if not await run_in_threadpool(webhook_service.claim_event, db, event):
+            logger.info(f"Ignoring duplicate webhook event '{event.id}'.")
+            return webhook_models.WebhookConfirmation()
 
-        # The service layer contains the business logic for each event type
-        webhook_service.handle_event_logic(event)
+        try:
+            if settings.WEBHOOK_QUEUE_ENABLED:
+                # Acknowledge right away; the queue workers run the business logic.
+                await get_webhook_queue().enqueue(event)
+            else:
+                # The service layer contains the business logic for each event type
+                webhook_service.handle_event_logic(event)
+        except Exception:
+            # Let the redelivery of a failed event be processed again.
+            await run_in_threadpool(webhook_service.release_event, db, event)
+            raise
 
+    except WebhookQueueFullException as e:
+        logger.warning("Webhook rejected because the ingestion queue is full.")
+        raise e
     except Exception as e:
-        # This catches validation errors from `webhook_receiver.receive`
+        # This catches validation errors from `process_webhook_event`
         # (e.g., invalid signature) or any other processing error.
         logger.error(f"Webhook processing failed: {e}", exc_info=True)
         raise HTTPException(
@@ -66,4 +97,13 @@ async def handle_webhook(
             detail=f"Webhook validation or processing failed: {str(e)}"
         )
 
-    return webhook_models.WebhookConfirmation()
\ No newline at end of file
+    return webhook_models.WebhookConfirmation()
+
+@router.get(
+    "/webhook/queue",
+    response_model=webhook_models.WebhookQueueStats,
+    summary="Webhook queue metrics",
+    description="Reports depth, lag, rejections and throughput of the webhook ingestion queue."
+)
+async def get_webhook_queue_stats():
+    return webhook_models.WebhookQueueStats(**get_webhook_queue().stats())
@@ -0,0 +1,39 @@
+import threading
+from collections import OrderedDict
+
+
+class RecentEventIds:
+    """
+    A bounded, thread-safe set of recently seen webhook event IDs.
+    Once full, the oldest IDs are forgotten first.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._ids: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, event_id: str) -> bool:
+        with self._lock:
+            return event_id in self._ids
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._ids)
+
+    def add(self, event_id: str):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._ids[event_id] = None
+            self._ids.move_to_end(event_id)
+            while len(self._ids) > self.max_size:
+                self._ids.popitem(last=False)
+
+    def discard(self, event_id: str):
+        with self._lock:
+            self._ids.pop(event_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._ids.clear()
@@ -0,0 +1,239 @@
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from google.protobuf.json_format import MessageToJson
+from livekit.api import WebhookEvent
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from src.entities.webhook_event_entity import WebhookEventRecord
+from src.metrics import registry
+
+logger = logging.getLogger(__name__)
+# Rows that could not be stored are logged here, so they can be routed to their own sink and replayed.
+dead_letter_logger = logging.getLogger(f"{__name__}.dead_letter")
+
+
+def event_to_row(event: WebhookEvent) -> dict:
+    """Flattens a webhook event into a `webhook_events` row."""
+    return {
+        "event_id": event.id,
+        "event_type": event.event,
+        "room_name": event.room.name or None,
+        "room_sid": event.room.sid or None,
+        "participant_identity": event.participant.identity or None,
+        "event_timestamp": (
+            datetime.fromtimestamp(event.created_at, tz=timezone.utc) if event.created_at else None
+        ),
+        "raw_payload": MessageToJson(event, indent=None),
+    }
+
+
+def build_bulk_insert(db: Session, rows: list):
+    """
+    Builds a single multi-row INSERT for `rows`.
+    On PostgreSQL and SQLite, rows whose event_id is already stored are skipped.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(WebhookEventRecord).values(rows).on_conflict_do_nothing(index_elements=["event_id"])
+    if dialect == "sqlite":
+        return sqlite.insert(WebhookEventRecord).values(rows).on_conflict_do_nothing(index_elements=["event_id"])
+    return insert(WebhookEventRecord).values(rows)
+
+
+class WebhookEventWriter:
+    """
+    Buffers webhook events and stores them in batches from a background thread.
+
+    A batch is flushed once `batch_size` events are buffered or `flush_interval_ms`
+    has elapsed, using one multi-row INSERT and one commit per batch. The buffer is
+    bounded: if the database falls behind, the oldest events are dropped.
+    A failed batch is retried on the next flush interval. After `max_attempts` failures
+    its rows are written one at a time, and rows that still fail are dead-lettered.
+    Subclasses can store events differently by overriding `to_row` and `write_batch`.
+    """
+
+    thread_name = "webhook-event-writer"
+
+    def __init__(self, batch_size: int, flush_interval_ms: int, max_buffer: int, max_attempts: int = 3):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_seconds = flush_interval_ms / 1000
+        self.max_buffer = max(self.batch_size, max_buffer)
+        self.max_attempts = max(1, max_attempts)
+
+        self._buffer: deque = deque()
+        # The batch that failed last, with its number of failed attempts. It is only
+        # touched by the flushing thread.
+        self._retry: list = []
+        self._retry_attempts = 0
+        self._condition = threading.Condition()
+        self._session_factory: Optional[Callable[[], Session]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.failed_batches = 0
+        self.dead_lettered = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, session_factory: Callable[[], Session]):
+        """Starts the background flusher using sessions from `session_factory`."""
+        if self.running:
+            return
+        self._session_factory = session_factory
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Flushes any buffered events and stops the background flusher."""
+        if not self.running:
+            return
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        self._thread.join()
+        self._thread = None
+
+    def to_row(self, event: WebhookEvent) -> Optional[dict]:
+        """Converts an event into what `write_batch` stores, or None to skip it."""
+        return event_to_row(event)
+
+    def write_batch(self, db: Session, rows: list):
+        """Writes one batch; the caller commits."""
+        db.execute(build_bulk_insert(db, rows))
+
+    def add(self, event: WebhookEvent):
+        """Buffers an event for the next batch."""
+        row = self.to_row(event)
+        if row is not None:
+            self.add_row(row)
+
+    def add_row(self, row):
+        """Buffers a row that is already in the form `write_batch` stores."""
+        with self._condition:
+            if len(self._buffer) >= self.max_buffer:
+                self._buffer.popleft()
+                self.dropped += 1
+            self._buffer.append(row)
+            if len(self._buffer) >= self.batch_size:
+                self._condition.notify()
+
+    def flush(self) -> int:
+        """Writes up to one batch of buffered events. Returns the number of rows written."""
+        if self._retry:
+            rows, self._retry = self._retry, []
+        else:
+            with self._condition:
+                rows = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+            self._retry_attempts = 0
+        if not rows:
+            return 0
+
+        try:
+            self._write(rows)
+        except Exception as e:
+            self.failed_batches += 1
+            self._retry_attempts += 1
+            if self._retry_attempts < self.max_attempts:
+                logger.error(f"Failed to store a batch of {len(rows)} webhook events, will retry: {e}")
+                self._retry = rows
+                return 0
+            logger.error(
+                f"Failed to store a batch of {len(rows)} webhook events {self._retry_attempts} times, "
+                f"storing them one by one: {e}"
+            )
+            self._retry_attempts = 0
+            return self._write_one_by_one(rows)
+
+        self.written += len(rows)
+        self.batches += 1
+        return len(rows)
+
+    def _write(self, rows: list):
+        db = self._session_factory()
+        try:
+            self.write_batch(db, rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _write_one_by_one(self, rows: list) -> int:
+        """Writes each row in its own transaction and dead-letters the rows that fail."""
+        written = 0
+        for row in rows:
+            try:
+                self._write([row])
+            except Exception as e:
+                self.dead_lettered += 1
+                dead_letter_logger.error(f"Dead-lettered {row!r}: {e}")
+            else:
+                written += 1
+        self.written += written
+        return written
+
+    def _run(self):
+        while True:
+            with self._condition:
+                # A pending retry waits for the next flush interval rather than a full batch.
+                self._condition.wait_for(
+                    lambda: self._stopping or (not self._retry and len(self._buffer) >= self.batch_size),
+                    timeout=self.flush_interval_seconds,
+                )
+                stopping = self._stopping
+
+            while self.flush() == self.batch_size:
+                pass
+
+            if stopping:
+                # Drain whatever is left; stop early if the database keeps failing.
+                while (self._retry or self._buffer) and self.flush():
+                    pass
+                return
+
+    def stats(self) -> dict:
+        """Returns a snapshot of the writer counters."""
+        with self._condition:
+            buffered = len(self._buffer) + len(self._retry)
+        return {
+            "running": self.running,
+            "buffered": buffered,
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "failed_batches": self.failed_batches,
+            "dead_lettered": self.dead_lettered,
+        }
+
+
+# The process-wide writer, created on first use. It only buffers events once started by the application.
+_event_writer: Optional[WebhookEventWriter] = None
+
+
+def get_event_writer() -> WebhookEventWriter:
+    global _event_writer
+    if _event_writer is None:
+        _event_writer = WebhookEventWriter(
+            batch_size=settings.WEBHOOK_EVENT_BATCH_SIZE,
+            flush_interval_ms=settings.WEBHOOK_EVENT_FLUSH_INTERVAL_MS,
+            max_buffer=settings.WEBHOOK_EVENT_MAX_BUFFER,
+            max_attempts=settings.WEBHOOK_EVENT_MAX_ATTEMPTS,
+        )
+    return _event_writer
+
+
+registry.register_stats("webhook_event_writer", "Webhook event writer", lambda: get_event_writer().stats())
@@ -12,4 +12,20 @@ class WebhookConfirmation(BaseModel):
                 "status": "ok"
             }
         }
-    )
\ No newline at end of file
+    )
+
+class WebhookQueueStats(BaseModel):
+    """
+    Metrics of the in-process webhook ingestion queue.
+    """
+    running: bool
+    workers: int
+    policy: str
+    depth: int
+    capacity: int
+    enqueued: int
+    processed: int
+    failed: int
+    rejected: int
+    last_lag_seconds: float
+    max_lag_seconds: float
@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import time
+import zlib
+from typing import Callable, List, Literal, Optional
+
+from livekit.api import WebhookEvent
+
+from src.config import settings
+from src.exceptions import WebhookQueueFullException
+from src.features.webhooks import service as webhook_service
+from src.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# What to do with a new event when its shard queue is full:
+# - "reject": answer 503 so LiveKit redelivers the event later.
+# - "block": wait up to the configured timeout for space, then reject.
+# An acknowledged event is never discarded, since LiveKit would not deliver it again.
+BackpressurePolicy = Literal["reject", "block"]
+
+
+def shard_key(event: WebhookEvent) -> str:
+    """
+    Returns the ordering key of an event.
+    Events of the same room share a key, so they are handled by the same worker in order.
+    """
+    if event.room.sid:
+        return event.room.sid
+    if event.room.name:
+        return event.room.name
+    return event.id
+
+
+class WebhookQueue:
+    """
+    A bounded in-process queue that decouples webhook delivery from event processing.
+
+    Events are sharded by room across a fixed pool of asyncio workers. Each worker owns
+    one shard and processes it sequentially, which preserves the order of events within
+    a room while different rooms are processed concurrently. The synchronous handler
+    runs on a worker thread so it never blocks the event loop.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[WebhookEvent], None],
+        num_workers: int,
+        max_size: int,
+        policy: BackpressurePolicy = "reject",
+        block_timeout_seconds: float = 1.0,
+    ):
+        self._handler = handler
+        self.num_workers = max(1, num_workers)
+        self.shard_max_size = max(1, max_size // self.num_workers)
+        self.policy = policy
+        self.block_timeout_seconds = block_timeout_seconds
+
+        self._shards: List[asyncio.Queue] = []
+        self._workers: List[asyncio.Task] = []
+
+        self.enqueued = 0
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.last_lag_seconds = 0.0
+        self.max_lag_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self):
+        """Creates the shard queues and starts one worker per shard."""
+        if self.running:
+            return
+        self._shards = [asyncio.Queue(maxsize=self.shard_max_size) for _ in range(self.num_workers)]
+        self._workers = [
+            asyncio.create_task(self._worker(shard), name=f"webhook-worker-{index}")
+            for index, shard in enumerate(self._shards)
+        ]
+        logger.info(f"Started {self.num_workers} webhook workers (policy: {self.policy}).")
+
+    async def stop(self, drain_timeout_seconds: float = 5.0):
+        """Waits up to `drain_timeout_seconds` for queued events, then stops the workers."""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(shard.join() for shard in self._shards)),
+                timeout=drain_timeout_seconds,
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Stopping webhook workers with {self.depth()} events still queued.")
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._shards = []
+
+    async def enqueue(self, event: WebhookEvent):
+        """
+        Queues an event for processing.
+        Raises WebhookQueueFullException if it was rejected.
+        """
+        if not self.running:
+            raise RuntimeError("Webhook queue is not running.")
+
+        shard = self._shards[zlib.crc32(shard_key(event).encode("utf-8")) % self.num_workers]
+        item = (time.monotonic(), event)
+
+        try:
+            shard.put_nowait(item)
+        except asyncio.QueueFull:
+            if self.policy == "block":
+                try:
+                    await asyncio.wait_for(shard.put(item), timeout=self.block_timeout_seconds)
+                except asyncio.TimeoutError:
+                    self.rejected += 1
+                    raise WebhookQueueFullException()
+            else:
+                self.rejected += 1
+                raise WebhookQueueFullException()
+
+        self.enqueued += 1
+
+    async def _worker(self, shard: asyncio.Queue):
+        while True:
+            enqueued_at, event = await shard.get()
+            lag = time.monotonic() - enqueued_at
+            self.last_lag_seconds = lag
+            self.max_lag_seconds = max(self.max_lag_seconds, lag)
+            try:
+                await asyncio.to_thread(self._handler, event)
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Webhook worker failed to process event '{event.id}': {e}", exc_info=True)
+            finally:
+                shard.task_done()
+
+    def depth(self) -> int:
+        """Returns the number of events waiting across all shards."""
+        return sum(shard.qsize() for shard in self._shards)
+
+    def stats(self) -> dict:
+        """Returns a snapshot of the queue metrics."""
+        return {
+            "running": self.running,
+            "workers": self.num_workers,
+            "policy": self.policy,
+            "depth": self.depth(),
+            "capacity": self.shard_max_size * self.num_workers,
+            "enqueued": self.enqueued,
+            "processed": self.processed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "last_lag_seconds": self.last_lag_seconds,
+            "max_lag_seconds": self.max_lag_seconds,
+        }
+
+
+# The process-wide queue used by the webhook endpoint when WEBHOOK_QUEUE_ENABLED is set,
+# created on first use. The handler is looked up at call time so the service function
+# can be patched in tests.
+_webhook_queue: Optional[WebhookQueue] = None
+
+
+def get_webhook_queue() -> WebhookQueue:
+    global _webhook_queue
+    if _webhook_queue is None:
+        _webhook_queue = WebhookQueue(
+            handler=lambda event: webhook_service.handle_event_logic(event),
+            num_workers=settings.WEBHOOK_QUEUE_WORKERS,
+            max_size=settings.WEBHOOK_QUEUE_MAX_SIZE,
+            policy=settings.WEBHOOK_QUEUE_FULL_POLICY,
+            block_timeout_seconds=settings.WEBHOOK_QUEUE_BLOCK_TIMEOUT_SECONDS,
+        )
+    return _webhook_queue
+
+
+registry.register_stats("webhook_queue", "Webhook ingestion queue", lambda: get_webhook_queue().stats())
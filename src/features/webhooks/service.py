@@ -1,39 +1,155 @@
 # src/features/webhooks/service.py (Corrected)
+import asyncio
+import base64
+import hashlib
+import hmac
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Callable
+
+import orjson
+from google.protobuf.json_format import ParseDict
 from livekit import api
 from livekit.api import WebhookEvent
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 
 from src.config import settings # <-- Import settings
+from src.features.rooms.occupancy import announce_participant_joined, announce_participant_left
+from src.entities.webhook_receipt_entity import WebhookEventReceipt
+from src.features.webhooks.dedup import RecentEventIds
+from src.features.webhooks.event_store import get_event_writer
+from src.features.analytics.rollups import get_usage_rollup_writer, room_duration_seconds
+from src.invalidation import OCCUPANCY_TOPIC, ROOM_TOPIC, invalidation_bus
+from src.metrics import webhook_events
 
 # Configure a logger for this module
 logger = logging.getLogger(__name__)
 
-# --- Webhook Receiver Initialization ---
-# Explicitly initialize the TokenVerifier with credentials from our settings.
-try:
-    token_verifier = api.TokenVerifier(
-        api_key=settings.LIVEKIT_API_KEY,
-        api_secret=settings.LIVEKIT_API_SECRET,
-    )
-except ValueError as e:
-    # This provides a clear startup error if credentials are not set.
-    raise RuntimeError(f"LiveKit API credentials are not set for TokenVerifier: {e}") from e
+# --- Webhook Verification ---
+# The verifier is created on first use, and checks tokens against our LiveKit credentials.
+@lru_cache
+def get_token_verifier() -> api.TokenVerifier:
+    """Returns the shared TokenVerifier, creating it on first use."""
+    try:
+        return api.TokenVerifier(
+            api_key=settings.LIVEKIT_API_KEY,
+            api_secret=settings.LIVEKIT_API_SECRET,
+        )
+    except ValueError as e:
+        # This provides a clear error if credentials are not set.
+        raise RuntimeError(f"LiveKit API credentials are not set for TokenVerifier: {e}") from e
 
-# The WebhookReceiver uses the verifier to process incoming events.
-webhook_receiver = api.WebhookReceiver(token_verifier)
+@lru_cache
+def get_webhook_verify_executor() -> ThreadPoolExecutor:
+    """Returns the pool that verifies and parses large webhook bodies off the event loop."""
+    return ThreadPoolExecutor(
+        max_workers=settings.WEBHOOK_VERIFY_MAX_WORKERS,
+        thread_name_prefix="webhook-verifier",
+    )
 
-def process_webhook_event(body: str, authorization: str) -> WebhookEvent:
+def process_webhook_event(body: bytes, authorization: str) -> WebhookEvent:
     """
     Validates and parses a raw webhook request into a structured WebhookEvent.
+
+    This is what `api.WebhookReceiver.receive` does, but on the raw bytes: the body
+    is hashed and parsed as received instead of being decoded to `str` and encoded back.
     """
-    event = webhook_receiver.receive(body, authorization)
-    return event
+    if isinstance(body, str):
+        body = body.encode()
+    claims = get_token_verifier().verify(authorization)
+    if claims.sha256 is None:
+        raise Exception("sha256 was not found in the token")
+    if not hmac.compare_digest(hashlib.sha256(body).digest(), base64.b64decode(claims.sha256)):
+        raise Exception("hash mismatch")
+    return ParseDict(orjson.loads(body), WebhookEvent(), ignore_unknown_fields=True)
+
+@lru_cache
+def get_recent_event_ids() -> RecentEventIds:
+    """Returns the fast-path record of event IDs this worker has already accepted."""
+    return RecentEventIds(max_size=settings.WEBHOOK_DEDUP_CACHE_SIZE)
+
+def claim_event(db: Session, event: WebhookEvent) -> bool:
+    """
+    Claims an event for processing.
+    Returns True for the first delivery of an event ID and False for redeliveries.
+    """
+    if not event.id:
+        return True
+    recent_event_ids = get_recent_event_ids()
+    if event.id in recent_event_ids:
+        return False
+
+    if settings.WEBHOOK_DEDUP_DB_ENABLED:
+        try:
+            db.add(WebhookEventReceipt(event_id=event.id))
+            db.commit()
+        except IntegrityError:
+            # Another worker (or an earlier delivery) already claimed this event.
+            db.rollback()
+            recent_event_ids.add(event.id)
+            return False
+
+    recent_event_ids.add(event.id)
+    return True
+
+def release_event(db: Session, event: WebhookEvent):
+    """
+    Releases a claimed event whose processing failed, so a redelivery is processed again.
+    """
+    if not event.id:
+        return
+    get_recent_event_ids().discard(event.id)
+    if settings.WEBHOOK_DEDUP_DB_ENABLED:
+        db.query(WebhookEventReceipt).filter(WebhookEventReceipt.event_id == event.id).delete()
+        db.commit()
+
+def prune_event_receipts(db: Session, retention_seconds: int) -> int:
+    """
+    Deletes receipts older than `retention_seconds`, past which LiveKit no longer
+    redelivers the event. Returns the number of receipts deleted.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=retention_seconds)
+    deleted = db.query(WebhookEventReceipt).filter(WebhookEventReceipt.received_at < cutoff).delete()
+    db.commit()
+    return deleted
+
+async def run_receipt_pruning_loop(
+    session_factory: Callable[[], Session], interval_seconds: float, retention_seconds: int
+):
+    """Prunes old receipts every `interval_seconds` until cancelled."""
+    def prune() -> int:
+        with session_factory() as db:
+            return prune_event_receipts(db, retention_seconds)
+
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            deleted = await asyncio.to_thread(prune)
+            if deleted:
+                logger.info(f"Pruned {deleted} webhook event receipts.")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Pruning webhook event receipts failed: {e}")
 
 def handle_event_logic(event: WebhookEvent):
     """
     Contains the business logic for different types of webhook events.
     """
     logger.info(f"Received webhook event: {event.event}")
+    webhook_events.inc(event.event or "unknown")
+
+    # Persist every event; the writer batches inserts in the background.
+    event_writer = get_event_writer()
+    if event_writer.running:
+        event_writer.add(event)
+    # Fold room and participant events into the usage rollups.
+    usage_rollup_writer = get_usage_rollup_writer()
+    if usage_rollup_writer.running:
+        usage_rollup_writer.add(event)
 
     # Example of handling specific events
     if event.event == "participant_joined":
@@ -41,15 +157,26 @@ def handle_event_logic(event: WebhookEvent):
             f"Participant '{event.participant.identity}' ({event.participant.name}) "
             f"joined room '{event.room.name}' (SID: {event.room.sid})."
         )
+        announce_participant_joined(
+            room_name=event.room.name,
+            room_sid=event.room.sid,
+            identity=event.participant.identity,
+            joined_at=int(event.participant.joined_at or event.created_at),
+        )
     elif event.event == "participant_left":
         logger.info(
             f"Participant '{event.participant.identity}' left room '{event.room.name}'."
         )
+        announce_participant_left(room_name=event.room.name, identity=event.participant.identity)
     elif event.event == "room_finished":
         logger.info(
             f"Room '{event.room.name}' (SID: {event.room.sid}) has finished. "
-            f"Duration: {event.room.duration}s."
+            f"Duration: {room_duration_seconds(event)}s."
         )
+        # Drop the cached record and the room's occupancy in every worker, so the next
+        # token request re-reads the room.
+        invalidation_bus.publish(ROOM_TOPIC, event.room.name)
+        invalidation_bus.publish(OCCUPANCY_TOPIC, event.room.name)
     elif event.event == "track_published":
         logger.info(
             f"Track '{event.track.sid}' of type '{event.track.type}' published by "
@@ -0,0 +1,366 @@
+import abc
+import asyncio
+import json
+import logging
+import os
+import socket
+import threading
+import uuid
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Literal, Optional
+
+from src.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Where invalidations are broadcast:
+# - "inprocess": only within this process (a single worker).
+# - "unix": to every worker on this host, over Unix datagram sockets in a shared directory.
+# - "postgres": to every worker connected to the database, with LISTEN/NOTIFY.
+BusBackendName = Literal["inprocess", "unix", "postgres"]
+
+# Topics published by the application. The key is the room name, except for the
+# participant topics, whose key is a JSON-encoded join or leave of one participant.
+ROOM_TOPIC = "room"
+OCCUPANCY_TOPIC = "occupancy"
+PARTICIPANT_JOINED_TOPIC = "participant_joined"
+PARTICIPANT_LEFT_TOPIC = "participant_left"
+
+Handler = Callable[[str], None]
+
+
+class BusBackend(abc.ABC):
+    """Carries encoded invalidations between processes."""
+
+    async def start(self, deliver: Callable[[bytes], None], on_gap: Callable[[], None]):
+        """
+        Starts receiving. `deliver` is called with every payload from another process;
+        `on_gap` is called when messages may have been missed, e.g. after a reconnect.
+        """
+
+    @abc.abstractmethod
+    def send(self, payload: bytes):
+        """Broadcasts a payload. Must be thread-safe and must not block."""
+
+    async def stop(self):
+        """Stops receiving and releases the backend's resources."""
+
+    def stats(self) -> dict:
+        return {}
+
+
+class InProcessBackend(BusBackend):
+    """Broadcasts nothing: with a single worker, local delivery is all there is."""
+
+    def send(self, payload: bytes):
+        pass
+
+
+class UnixSocketBackend(BusBackend):
+    """
+    Broadcasts to the other workers on this host. Every process binds a datagram socket
+    in `directory` and sends each message to all the other sockets found there; sockets
+    left behind by dead processes are removed when a send to them is refused.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path: Optional[str] = None
+        self._receiver: Optional[socket.socket] = None
+        self._sender: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self.sent = 0
+        self.send_failures = 0
+
+    async def start(self, deliver: Callable[[bytes], None], on_gap: Callable[[], None]):
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, f"{os.getpid()}-{uuid.uuid4().hex[:8]}.sock")
+        self._receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._receiver.bind(self.path)
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sender.setblocking(False)
+        self._thread = threading.Thread(target=self._receive, args=(deliver,), name="invalidation-bus", daemon=True)
+        self._thread.start()
+
+    def _receive(self, deliver: Callable[[bytes], None]):
+        receiver = self._receiver
+        while True:
+            try:
+                payload = receiver.recv(65536)
+            except OSError:
+                return  # The socket was closed by stop().
+            if not payload:
+                return
+            deliver(payload)
+
+    def send(self, payload: bytes):
+        if self._sender is None:
+            return
+        try:
+            peers = [name for name in os.listdir(self.directory) if name.endswith(".sock")]
+        except FileNotFoundError:
+            return
+        for name in peers:
+            peer = os.path.join(self.directory, name)
+            if peer == self.path:
+                continue
+            try:
+                self._sender.sendto(payload, peer)
+                self.sent += 1
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Nobody is listening: the worker that bound this socket has exited.
+                try:
+                    os.unlink(peer)
+                except FileNotFoundError:
+                    pass
+            except OSError as e:
+                # The peer's receive buffer is full; it will recover on its cache TTL.
+                self.send_failures += 1
+                logger.warning(f"Failed to send an invalidation to {peer}: {e}")
+
+    async def stop(self):
+        if self._receiver is None:
+            return
+        # Shutting down wakes the receiver thread blocked in recv().
+        try:
+            self._receiver.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._receiver.close()
+        self._sender.close()
+        self._receiver = self._sender = None
+        if self.path:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join, 1.0)
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {"sent": self.sent, "send_failures": self.send_failures}
+
+
+class PostgresNotifyBackend(BusBackend):
+    """
+    Broadcasts through PostgreSQL LISTEN/NOTIFY on a dedicated asyncpg connection, which
+    reaches workers on every host sharing the database. Sends are queued and issued from
+    the event loop, so `send` can be called from any thread. When the connection drops,
+    it is re-established with backoff right away and LISTEN is issued again; `on_gap`
+    is then called, since notifications sent meanwhile are lost.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        channel: str,
+        connect: Optional[Callable[[str], Awaitable]] = None,
+        reconnect_delay_seconds: float = 1.0,
+    ):
+        self.dsn = dsn
+        self.channel = channel
+        self._connect = connect
+        self.reconnect_delay_seconds = reconnect_delay_seconds
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._connection = None
+        self._deliver: Optional[Callable[[bytes], None]] = None
+        self._on_gap: Optional[Callable[[], None]] = None
+        self._connected = asyncio.Event()
+        self._lost = asyncio.Event()
+        self.sent = 0
+        self.reconnects = 0
+
+    async def start(self, deliver: Callable[[bytes], None], on_gap: Callable[[], None]):
+        if self._connect is None:
+            import asyncpg
+            self._connect = asyncpg.connect
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._deliver = deliver
+        self._on_gap = on_gap
+        await self._open()
+        self._tasks = [
+            asyncio.create_task(self._publish(), name="invalidation-bus-notify"),
+            asyncio.create_task(self._watch(), name="invalidation-bus-reconnect"),
+        ]
+
+    async def _open(self):
+        self._lost.clear()
+        self._connection = await self._connect(self.dsn)
+        await self._connection.add_listener(self.channel, self._on_notify)
+        self._connection.add_termination_listener(self._on_terminated)
+        self._connected.set()
+
+    def _on_notify(self, connection, pid, channel, payload: str):
+        self._deliver(payload.encode())
+
+    def _on_terminated(self, connection):
+        if connection is self._connection:
+            logger.warning("Invalidation bus lost its PostgreSQL connection.")
+            self._mark_lost()
+
+    def _mark_lost(self):
+        self._connected.clear()
+        self._lost.set()
+
+    async def _watch(self):
+        # Reconnects as soon as the connection is lost, so a worker that only listens
+        # does not stay deaf until it happens to publish.
+        while True:
+            await self._lost.wait()
+            await self._reconnect()
+
+    async def _publish(self):
+        while True:
+            payload = await self._queue.get()
+            while True:
+                await self._connected.wait()
+                connection = self._connection
+                try:
+                    await connection.execute("SELECT pg_notify($1, $2)", self.channel, payload.decode())
+                    self.sent += 1
+                    break
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Failed to publish an invalidation: {e}")
+                    if connection is self._connection:
+                        self._mark_lost()
+
+    async def _reconnect(self):
+        lost, self._connection = self._connection, None
+        if not lost.is_closed():
+            lost.terminate()
+        while True:
+            try:
+                await self._open()
+                self.reconnects += 1
+                self._on_gap()
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Invalidation bus failed to reconnect to PostgreSQL: {e}")
+                await asyncio.sleep(self.reconnect_delay_seconds)
+
+    def send(self, payload: bytes):
+        if self._loop is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, payload)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        connection, self._connection = self._connection, None
+        if connection is not None and not connection.is_closed():
+            await connection.close()
+        self._connection = None
+        self._loop = None
+
+    def stats(self) -> dict:
+        return {"sent": self.sent, "reconnects": self.reconnects, "pending": self._queue.qsize() if self._queue else 0}
+
+
+class InvalidationBus:
+    """
+    Publishes invalidations to the subscribers of this process and, through the
+    backend, of every other worker.
+
+    Subscribers register per topic at import time; the backend is chosen at startup.
+    Local subscribers are called synchronously by `publish`, so the publishing worker
+    never serves stale data. Other workers are notified asynchronously. A subscriber can
+    also pass `on_reset`, called when the backend may have missed messages.
+    """
+
+    def __init__(self):
+        self.origin = self._new_origin()
+        self.backend: BusBackend = InProcessBackend()
+        self._handlers: Dict[str, List[Handler]] = defaultdict(list)
+        self._reset_handlers: List[Callable[[], None]] = []
+        self.published = 0
+        self.received = 0
+        self.handler_errors = 0
+
+    @staticmethod
+    def _new_origin() -> str:
+        # Unique per process: workers forked from a preloaded app must not share it,
+        # or each would drop the others' messages as its own.
+        return f"{os.getpid()}-{uuid.uuid4().hex}"
+
+    def subscribe(self, topic: str, handler: Handler, on_reset: Optional[Callable[[], None]] = None):
+        self._handlers[topic].append(handler)
+        if on_reset is not None:
+            self._reset_handlers.append(on_reset)
+
+    async def start(self, backend: BusBackend):
+        """Starts broadcasting through `backend`."""
+        self.origin = self._new_origin()
+        await backend.start(self._receive, self._reset)
+        self.backend = backend
+        logger.info(f"Invalidation bus started with {type(backend).__name__}.")
+
+    async def stop(self):
+        backend, self.backend = self.backend, InProcessBackend()
+        await backend.stop()
+
+    def publish(self, topic: str, key: str):
+        """Invalidates `key` of `topic` in this process and broadcasts it to the others."""
+        self.published += 1
+        self._dispatch(topic, key)
+        payload = json.dumps({"o": self.origin, "t": topic, "k": key}, separators=(",", ":")).encode()
+        self.backend.send(payload)
+
+    def _receive(self, payload: bytes):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring a malformed invalidation message.")
+            return
+        if message.get("o") == self.origin:
+            return
+        self.received += 1
+        self._dispatch(message.get("t"), message.get("k"))
+
+    def _dispatch(self, topic: str, key: str):
+        for handler in self._handlers.get(topic, ()):
+            try:
+                handler(key)
+            except Exception as e:
+                self.handler_errors += 1
+                logger.error(f"Invalidation handler for '{topic}' failed: {e}", exc_info=True)
+
+    def _reset(self):
+        for on_reset in self._reset_handlers:
+            on_reset()
+
+    def stats(self) -> dict:
+        return {
+            "published": self.published,
+            "received": self.received,
+            "handler_errors": self.handler_errors,
+            **self.backend.stats(),
+        }
+
+
+def build_backend(name: BusBackendName, database_url: str, socket_dir: str, channel: str) -> BusBackend:
+    """Creates the backend selected in Settings."""
+    if name == "unix":
+        return UnixSocketBackend(socket_dir)
+    if name == "postgres":
+        from sqlalchemy.engine import make_url
+        url = make_url(database_url)
+        if url.get_backend_name() != "postgresql":
+            raise ValueError("The postgres invalidation bus requires a PostgreSQL DATABASE_URL.")
+        dsn = url.set(drivername="postgresql").render_as_string(hide_password=False)
+        return PostgresNotifyBackend(dsn, channel)
+    return InProcessBackend()
+
+
+# The process-wide bus. Until the application starts a backend, it only reaches this process.
+invalidation_bus = InvalidationBus()
+registry.register_stats("invalidation_bus", "Cross-worker invalidation bus", invalidation_bus.stats)
@@ -1,54 +1,147 @@
+import asyncio
 import logging
-import uvicorn
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.datastructures import Default
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from src.api import api_router
+from src.config import settings
 from src.features.rooms import service as room_service
-from src.database.core import Base, engine
+from src.features.rooms.gating import close_balance_gate
+from src.features.rooms.occupancy import room_occupancy
+from src.features.rooms.reconciler import RoomReconciler
+from src.features.webhooks.event_store import get_event_writer
+from src.features.analytics.rollups import get_usage_rollup_writer
+from src.features.webhooks.queue import get_webhook_queue
+from src.features.webhooks.service import run_receipt_pruning_loop
+from src.invalidation import build_backend, invalidation_bus
+from src.database.core import Base, SessionLocal, dispose_engines, get_async_engine, get_engine
+from src.metrics import MetricsMiddleware
+from src.serialization import FastJSONResponse
 
 # --- Application Configuration ---
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-# Create all database tables based on the ORM models.
-# This is a simple way to ensure tables exist for development.
-# For production, it's highly recommended to use a migration tool like Alembic.
-Base.metadata.create_all(bind=engine) # We will use Alembic, so this is commented out.
-
-# --- FastAPI App Initialization ---
-app = FastAPI(
-    title="Qari Video Conferencing API",
-    description="Backend API for the Qari Web3 video conferencing application, powered by LiveKit.",
-    version="1.0.0",
-)
-
-# --- Middleware Configuration ---
-# Configure CORS (Cross-Origin Resource Sharing) to allow requests from the frontend.
-# In a production environment, you should restrict the origins to your actual frontend domain.
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Allows all origins for simplicity. Change to specific domain in production.
-    allow_credentials=True,
-    allow_methods=["*"],  # Allows all methods (GET, POST, etc.).
-    allow_headers=["*"],  # Allows all headers.
-)
-
-# --- Event Handlers ---
-@app.on_event("shutdown")
-async def app_shutdown():
+# --- Lifespan ---
+@asynccontextmanager
+async def lifespan(app: FastAPI):
     """
-    Gracefully close the LiveKit API client when the application shuts down.
+    Creates the engines and the LiveKit client, starts the cache invalidation bus, the
+    webhook event writer, the occupancy resync, room reconciliation and webhook receipt
+    pruning loops and, when enabled, the webhook ingestion and LiveKit outbox workers.
+    On shutdown, stops them in reverse order.
+    Nothing here runs at import time, so importing the app stays cheap.
     """
+    started_at = time.perf_counter()
+    engine = get_engine()
+    if settings.DATABASE_ASYNC_ENABLED:
+        get_async_engine()
+
+    # Create all database tables based on the ORM models.
+    # This is a simple way to ensure tables exist for development.
+    # For production, use Alembic migrations and leave DATABASE_CREATE_SCHEMA off.
+    if settings.DATABASE_CREATE_SCHEMA:
+        await asyncio.to_thread(Base.metadata.create_all, bind=engine)
+
+    room_service.get_livekit_api()
+    await invalidation_bus.start(build_backend(
+        settings.INVALIDATION_BUS_BACKEND,
+        database_url=settings.DATABASE_URL,
+        socket_dir=settings.INVALIDATION_BUS_SOCKET_DIR,
+        channel=settings.INVALIDATION_BUS_CHANNEL,
+    ))
+    if settings.WEBHOOK_EVENT_STORE_ENABLED:
+        get_event_writer().start(SessionLocal)
+    if settings.ROOM_ANALYTICS_ENABLED:
+        get_usage_rollup_writer().start(SessionLocal)
+    if settings.WEBHOOK_QUEUE_ENABLED:
+        await get_webhook_queue().start()
+    if settings.LIVEKIT_OUTBOX_ENABLED:
+        await room_service.get_livekit_outbox().start(SessionLocal)
+    if settings.OCCUPANCY_RESYNC_INTERVAL_SECONDS > 0:
+        app.state.occupancy_resync_task = asyncio.create_task(
+            room_occupancy.run_resync_loop(
+                room_service.get_livekit_rooms(),
+                settings.OCCUPANCY_RESYNC_INTERVAL_SECONDS,
+                # Closes rollup sessions whose room_finished event was dropped or lost.
+                on_resync=get_usage_rollup_writer().close_sessions_except if settings.ROOM_ANALYTICS_ENABLED else None,
+            )
+        )
+    if settings.RECONCILE_INTERVAL_SECONDS > 0:
+        reconciler = RoomReconciler(
+            room_client=room_service.get_livekit_rooms(),
+            session_factory=SessionLocal,
+            batch_size=settings.RECONCILE_BATCH_SIZE,
+            grace_seconds=settings.RECONCILE_GRACE_SECONDS,
+            full_sweep_every=settings.RECONCILE_FULL_SWEEP_EVERY,
+            delete_livekit_orphans=settings.RECONCILE_DELETE_LIVEKIT_ORPHANS,
+        )
+        app.state.reconciler_task = asyncio.create_task(
+            reconciler.run_forever(settings.RECONCILE_INTERVAL_SECONDS)
+        )
+    if settings.WEBHOOK_DEDUP_DB_ENABLED and settings.WEBHOOK_DEDUP_PRUNE_INTERVAL_SECONDS > 0:
+        app.state.receipt_pruning_task = asyncio.create_task(run_receipt_pruning_loop(
+            SessionLocal, settings.WEBHOOK_DEDUP_PRUNE_INTERVAL_SECONDS, settings.WEBHOOK_DEDUP_RETENTION_SECONDS
+        ))
+    logging.info(f"Application started in {(time.perf_counter() - started_at) * 1000:.1f} ms.")
+
+    yield
+
+    for task_name in ("occupancy_resync_task", "reconciler_task", "receipt_pruning_task"):
+        task = getattr(app.state, task_name, None)
+        if task is not None:
+            task.cancel()
+    await room_service.get_livekit_outbox().stop()
+    await get_webhook_queue().stop()
+    get_event_writer().stop()
+    get_usage_rollup_writer().stop()
     logging.info("Application is shutting down. Closing LiveKit client.")
     await room_service.close_livekit_client()
+    await invalidation_bus.stop()
+    await close_balance_gate()
+    await dispose_engines()
 
-# --- API Router Inclusion ---
-# Include the main router from `api.py`. All API routes will be available under its prefix.
-app.include_router(api_router)
+# --- FastAPI App Initialization ---
+def create_app() -> FastAPI:
+    """
+    Builds the application. It is called on first access to `app`, not at import, since
+    the response class depends on the settings.
+    """
+    app = FastAPI(
+        title="Qari Video Conferencing API",
+        description="Backend API for the Qari Web3 video conferencing application, powered by LiveKit.",
+        version="1.0.0",
+        lifespan=lifespan,
+        # orjson renders responses when fast serialization is enabled. Otherwise FastAPI's
+        # default placeholder is kept, which lets it serialize with pydantic-core directly.
+        default_response_class=FastJSONResponse if settings.FAST_SERIALIZATION_ENABLED else Default(JSONResponse),
+    )
+
+    # --- Middleware Configuration ---
+    # Configure CORS (Cross-Origin Resource Sharing) to allow requests from the frontend.
+    # In a production environment, you should restrict the origins to your actual frontend domain.
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # Allows all origins for simplicity. Change to specific domain in production.
+        allow_credentials=True,
+        allow_methods=["*"],  # Allows all methods (GET, POST, etc.).
+        allow_headers=["*"],  # Allows all headers.
+    )
+    # Record per-route request latency for the /v1/metrics endpoint.
+    app.add_middleware(MetricsMiddleware)
+
+    # --- API Router Inclusion ---
+    # Include the main router from `api.py`. All API routes will be available under its prefix.
+    app.include_router(api_router)
+    app.add_api_route("/", read_root, methods=["GET"], tags=["Root"])
+    return app
 
 
 # --- Root Endpoint ---
-@app.get("/", tags=["Root"])
 async def read_root():
     """
     A simple root endpoint to confirm the API is accessible.
@@ -56,14 +149,17 @@ async def read_root():
     return {"message": "Welcome to the Qari API. Visit /docs for documentation."}
 
 
-# --- Uvicorn Runner (for direct execution) ---
+def __getattr__(name: str):
+    # `src.main:app` is created on first access and then stored as a plain module attribute.
+    if name == "app":
+        app = globals()["app"] = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# --- Server Runner (for direct execution) ---
 if __name__ == "__main__":
-    # This block allows running the app directly with `python src/main.py`
-    # Useful for development and debugging.
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,  # Automatically reload on code changes
-        log_level="info"
-    )
\ No newline at end of file
+    # `python -m src.main` takes the same options as `python -m src.server`;
+    # add `--reload` for development.
+    from src.server import main as run_server
+    run_server()
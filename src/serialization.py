@@ -0,0 +1,27 @@
+"""
+Fast JSON serialization for hot endpoints.
+
+When FAST_SERIALIZATION_ENABLED is set, handlers build plain dicts straight from
+trusted internal objects (ORM rows, cached rooms, freshly minted tokens) and return
+them as a `FastJSONResponse`. Returning a Response bypasses FastAPI's response_model
+validation, while the declared response_model still documents the endpoint, so the
+OpenAPI schema does not change. The output matches what the Pydantic models produce.
+"""
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+# OPT_UTC_Z renders UTC datetimes with a "Z" suffix, as Pydantic does.
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """A JSON response rendered with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,216 @@
+"""
+Production entry point: `python -m src.server [options]`.
+
+Serves `src.main:app` with several worker processes. When gunicorn is installed and
+preloading is on, gunicorn imports the app once and forks the workers from it, so they
+share the imported code; otherwise uvicorn's own supervisor spawns the workers. Both
+restart workers that exit, which is what makes recycling after SERVER_MAX_REQUESTS
+graceful. uvloop and httptools are used when installed.
+"""
+import argparse
+import importlib.util
+import logging
+import os
+import sys
+from dataclasses import dataclass
+from typing import List, Literal, Optional
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+APP = "src.main:app"
+
+LoopName = Literal["auto", "uvloop", "asyncio"]
+HttpName = Literal["auto", "httptools", "h11"]
+
+
+@dataclass(frozen=True)
+class ServerOptions:
+    host: str
+    port: int
+    workers: int
+    loop: LoopName
+    http: HttpName
+    backlog: int
+    keep_alive_seconds: int
+    max_requests: int
+    max_requests_jitter: int
+    graceful_timeout_seconds: int
+    preload: bool
+    reload: bool
+    log_level: str
+
+
+def installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def default_workers() -> int:
+    """The CPUs this process may run on, which honours CPU affinity limits of containers."""
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 1
+
+
+def resolve_loop(loop: LoopName) -> str:
+    if loop == "auto":
+        return "uvloop" if installed("uvloop") else "asyncio"
+    return loop
+
+
+def resolve_http(http: HttpName) -> str:
+    if http == "auto":
+        return "httptools" if installed("httptools") else "h11"
+    return http
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """The command line; defaults come from the SERVER_* settings."""
+    parser = argparse.ArgumentParser(prog="python -m src.server", description="Serve the Qari API.")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS,
+                        help="Worker processes (0: one per available CPU).")
+    parser.add_argument("--loop", choices=["auto", "uvloop", "asyncio"], default="auto",
+                        help="Event loop (auto: uvloop when installed).")
+    parser.add_argument("--http", choices=["auto", "httptools", "h11"], default="auto",
+                        help="HTTP parser (auto: httptools when installed).")
+    parser.add_argument("--backlog", type=int, default=settings.SERVER_BACKLOG,
+                        help="Pending connections the listening socket holds.")
+    parser.add_argument("--keep-alive", dest="keep_alive_seconds", type=int, default=settings.SERVER_KEEP_ALIVE_SECONDS,
+                        help="Seconds an idle keep-alive connection stays open.")
+    parser.add_argument("--max-requests", type=int, default=settings.SERVER_MAX_REQUESTS,
+                        help="Replace a worker after this many requests (0: never).")
+    parser.add_argument("--max-requests-jitter", type=int, default=settings.SERVER_MAX_REQUESTS_JITTER,
+                        help="Random extra requests per worker, so workers do not restart together.")
+    parser.add_argument("--graceful-timeout", dest="graceful_timeout_seconds", type=int,
+                        default=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+                        help="Seconds a stopping worker has to finish its requests.")
+    parser.add_argument("--preload", action=argparse.BooleanOptionalAction, default=settings.SERVER_PRELOAD,
+                        help="Import the app once and fork the workers from it (needs gunicorn).")
+    parser.add_argument("--reload", action="store_true",
+                        help="Development: one worker that restarts on code changes.")
+    parser.add_argument("--log-level", default="info")
+    return parser
+
+
+def parse_options(argv: Optional[List[str]] = None) -> ServerOptions:
+    args = build_parser().parse_args(argv)
+    workers = 1 if args.reload else (args.workers if args.workers > 0 else default_workers())
+    return ServerOptions(
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop=resolve_loop(args.loop),
+        http=resolve_http(args.http),
+        backlog=args.backlog,
+        keep_alive_seconds=args.keep_alive_seconds,
+        max_requests=max(0, args.max_requests),
+        max_requests_jitter=max(0, args.max_requests_jitter),
+        graceful_timeout_seconds=args.graceful_timeout_seconds,
+        preload=args.preload and not args.reload,
+        reload=args.reload,
+        log_level=args.log_level,
+    )
+
+
+def uses_gunicorn(options: ServerOptions) -> bool:
+    return options.preload and installed("gunicorn")
+
+
+def worker_class(options: ServerOptions) -> type:
+    """
+    The gunicorn worker running uvicorn, from the uvicorn-worker package when installed,
+    with the chosen event loop and HTTP parser. gunicorn has no options for these, so
+    they are set on a subclass through the worker's CONFIG_KWARGS.
+    """
+    if installed("uvicorn_worker"):
+        from uvicorn_worker import UvicornWorker
+    else:
+        from uvicorn.workers import UvicornWorker
+    return type("UvicornWorker", (UvicornWorker,), {
+        "CONFIG_KWARGS": {**UvicornWorker.CONFIG_KWARGS, "loop": options.loop, "http": options.http},
+    })
+
+
+def gunicorn_config(options: ServerOptions) -> dict:
+    return {
+        "bind": f"{options.host}:{options.port}",
+        "workers": options.workers,
+        "worker_class": worker_class(options),
+        "preload_app": True,
+        "backlog": options.backlog,
+        "keepalive": options.keep_alive_seconds,
+        "max_requests": options.max_requests,
+        "max_requests_jitter": options.max_requests_jitter,
+        "graceful_timeout": options.graceful_timeout_seconds,
+        "loglevel": options.log_level,
+    }
+
+
+def uvicorn_config(options: ServerOptions) -> dict:
+    max_requests = options.max_requests or None
+    if max_requests and options.workers == 1 and not options.reload:
+        # Only uvicorn's multi-process supervisor replaces a worker that exits.
+        logger.warning("Worker recycling needs more than one worker under uvicorn; it is disabled.")
+        max_requests = None
+    return {
+        "host": options.host,
+        "port": options.port,
+        "workers": options.workers,
+        "loop": options.loop,
+        "http": options.http,
+        "backlog": options.backlog,
+        "timeout_keep_alive": options.keep_alive_seconds,
+        "limit_max_requests": max_requests,
+        "limit_max_requests_jitter": options.max_requests_jitter if max_requests else 0,
+        "timeout_graceful_shutdown": options.graceful_timeout_seconds,
+        "reload": options.reload,
+        "log_level": options.log_level,
+    }
+
+
+def run_gunicorn(options: ServerOptions):
+    from gunicorn.app.base import BaseApplication
+
+    class Application(BaseApplication):
+        def load_config(self):
+            for key, value in gunicorn_config(options).items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from src.main import app
+            return app
+
+    Application().run()
+
+
+def run_uvicorn(options: ServerOptions):
+    import uvicorn
+
+    if options.preload and not options.reload:
+        logger.warning("gunicorn is not installed; workers import the app separately.")
+    uvicorn.run(APP, **uvicorn_config(options))
+
+
+def main(argv: Optional[List[str]] = None):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    options = parse_options(argv)
+    logger.info(
+        f"Serving {APP} on {options.host}:{options.port} with {options.workers} workers "
+        f"({options.loop} loop, {options.http} parser, "
+        f"{'gunicorn with preloading' if uses_gunicorn(options) else 'uvicorn'})."
+    )
+    if options.workers > 1 and settings.INVALIDATION_BUS_BACKEND == "inprocess":
+        logger.warning(
+            "INVALIDATION_BUS_BACKEND is inprocess: room caches and occupancy will differ between workers."
+        )
+    if uses_gunicorn(options):
+        run_gunicorn(options)
+    else:
+        run_uvicorn(options)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,12 +1,19 @@
 import pytest
-from typing import Generator
+import pytest_asyncio
+from typing import AsyncGenerator, Generator
 
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import StaticPool
 
 from src.main import app
-from src.database.core import Base, get_db
+from src.database.core import Base, get_db, get_session, get_session_factory
+from src.features.rooms.cache import get_room_cache
+from src.features.rooms.occupancy import room_occupancy
+from src.features.rooms.service import get_livekit_rooms
+from src.features.webhooks.service import get_recent_event_ids
 
 # --- Test Database Configuration ---
 # Use an in-memory SQLite database for testing. It's fast and isolated.
@@ -14,15 +21,64 @@ SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
 
 # Create a new SQLAlchemy engine for the test database.
 # `connect_args` is specific to SQLite to allow the same connection to be used across threads.
+# `StaticPool` keeps a single connection so the in-memory database is shared with
+# the TestClient's worker threads instead of each thread getting an empty database.
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
 )
 
 # Create a session factory for the test database.
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# The async test engine uses aiosqlite against its own in-memory database.
+ASYNC_SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+
 # --- Fixture Definitions ---
 
+@pytest.fixture(autouse=True)
+def clear_room_cache() -> Generator[None, None, None]:
+    """
+    Clears the process-wide room cache around every test so cached records
+    never leak between the per-test databases.
+    """
+    get_room_cache().clear()
+    yield
+    get_room_cache().clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_livekit_breaker() -> Generator[None, None, None]:
+    """
+    Closes the process-wide LiveKit circuit breaker around every test so failures
+    injected by one test never make another fail fast.
+    """
+    get_livekit_rooms().breaker.reset()
+    yield
+    get_livekit_rooms().breaker.reset()
+
+
+@pytest.fixture(autouse=True)
+def clear_room_occupancy() -> Generator[None, None, None]:
+    """
+    Clears the process-wide room occupancy view around every test.
+    """
+    room_occupancy.clear()
+    yield
+    room_occupancy.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_recent_event_ids() -> Generator[None, None, None]:
+    """
+    Clears the process-wide set of seen webhook event IDs around every test.
+    """
+    get_recent_event_ids().clear()
+    yield
+    get_recent_event_ids().clear()
+
+
 @pytest.fixture(scope="function")
 def db_session() -> Generator[Session, None, None]:
     """
@@ -45,6 +101,34 @@ def db_session() -> Generator[Session, None, None]:
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(scope="function")
+def session_factory(db_session: Session) -> sessionmaker:
+    """
+    Pytest fixture providing the test session factory, for components that open
+    their own sessions (e.g. background writers). Tables exist for the test's duration.
+    """
+    return TestingSessionLocal
+
+
+@pytest_asyncio.fixture(scope="function")
+async def async_db_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Pytest fixture providing an AsyncSession backed by an in-memory aiosqlite database.
+    The engine is created per test so it is bound to the test's event loop.
+    """
+    async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, poolclass=StaticPool)
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    AsyncTestingSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+    async with AsyncTestingSessionLocal() as db:
+        yield db
+
+    await async_engine.dispose()
+
+
 @pytest.fixture(scope="function")
 def client(db_session: Session) -> Generator[TestClient, None, None]:
     """
@@ -61,8 +145,10 @@ def client(db_session: Session) -> Generator[TestClient, None, None]:
         finally:
             db_session.close()
 
-    # Apply the dependency override
+    # Apply the dependency overrides
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
 
     # Yield the TestClient
     with TestClient(app) as c:
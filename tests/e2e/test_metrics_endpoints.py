@@ -0,0 +1,38 @@
+from fastapi import status
+from fastapi.testclient import TestClient
+
+def test_metrics_endpoint_exposes_route_latency(client: TestClient):
+    """
+    Test that requests are recorded under their route template and exposed in the Prometheus format.
+    """
+    # Arrange
+    client.post("/v1/rooms/no-such-room/token", json={"identity": "user-1", "name": "User One"})
+
+    # Act
+    response = client.get("/v1/metrics")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert (
+        'http_request_duration_seconds_count{method="POST",route="/v1/rooms/{room_name}/token",status="404"}'
+        in body
+    )
+    assert "no-such-room" not in body
+    assert "room_cache_misses" in body
+    assert "webhook_queue_depth" in body
+    assert "room_occupancy_participants" in body
+
+def test_admin_pool_endpoint_reports_pool_stats(client: TestClient):
+    """
+    Test that the admin endpoint reports the statistics of the application's connection pool.
+    """
+    # Act
+    response = client.get("/v1/admin/pool")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    pools = response.json()["pools"]
+    assert "sync" in pools
+    assert pools["sync"]["checkouts"] >= 0
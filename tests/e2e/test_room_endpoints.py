@@ -1,10 +1,16 @@
+import json
 import pytest
 from unittest.mock import patch, AsyncMock, MagicMock
 from fastapi import status
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
+from src.config import settings
 from src.entities.room_entity import Room as RoomEntity
+from src.features.rooms.occupancy import room_occupancy
+from src.features.rooms.balance_providers import StaticBalanceProvider
+from src.features.rooms.gating import BalanceGate
+from src.features.analytics.rollups import RollupUpdater, UsageEvent
 
 # The service functions are mocked to isolate the controller and test its behavior.
 # This prevents actual calls to the LiveKit API during E2E tests of the controller.
@@ -123,4 +129,289 @@ def test_create_join_token_endpoint_room_not_found(client: TestClient):
 
     # Assert
     assert response.status_code == status.HTTP_404_NOT_FOUND
-    assert response.json()["detail"] == "Room 'non-existent-room' not found."
\ No newline at end of file
+    assert response.json()["detail"] == "Room 'non-existent-room' not found."
+
+def test_create_join_tokens_batch_endpoint_success(client: TestClient, db_session: Session):
+    """
+    Test the POST /v1/rooms/{room_name}/tokens endpoint for a batch of identities.
+    """
+    # Arrange
+    room = RoomEntity(name="batch-room-e2e", livekit_sid="RM_dummy", access_type="public")
+    db_session.add(room)
+    db_session.commit()
+
+    batch = [
+        {"identity": "user-a", "name": "User A"},
+        {"identity": "user-b", "name": "User B"},
+    ]
+
+    # Act
+    response = client.post("/v1/rooms/batch-room-e2e/tokens", json=batch)
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()["results"]
+    assert [result["identity"] for result in results] == ["user-a", "user-b"]
+    assert all(isinstance(result["token"], str) for result in results)
+
+def test_create_join_tokens_batch_endpoint_room_not_found(client: TestClient):
+    """
+    Test the batch token endpoint for a room that does not exist.
+    """
+    # Act
+    response = client.post("/v1/rooms/non-existent-room/tokens", json=[{"identity": "a", "name": "A"}])
+
+    # Assert
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+def test_create_join_token_endpoint_token_gated_room(client: TestClient, db_session: Session):
+    """
+    Test that a token-gated room only issues tokens to wallets holding the required amount.
+    """
+    # Arrange
+    token_address = "0x" + "a" * 40
+    holder, non_holder = "0x" + "1" * 40, "0x" + "2" * 40
+    room = RoomEntity(
+        name="gated-room-e2e", livekit_sid="RM_dummy", access_type="token",
+        token_address=token_address, token_amount="100"
+    )
+    db_session.add(room)
+    db_session.commit()
+    provider = StaticBalanceProvider({(holder, token_address): 100, (non_holder, token_address): 99})
+    gate = BalanceGate(provider, positive_ttl_seconds=300, negative_ttl_seconds=15)
+
+    # Act
+    with patch.object(settings, "GATING_ENABLED", True), \
+            patch("src.features.rooms.gating.get_balance_gate", return_value=gate):
+        allowed = client.post("/v1/rooms/gated-room-e2e/token", json={"identity": holder, "name": "Holder"})
+        denied = client.post("/v1/rooms/gated-room-e2e/token", json={"identity": non_holder, "name": "Other"})
+        batch = client.post("/v1/rooms/gated-room-e2e/tokens", json=[
+            {"identity": holder, "name": "Holder"},
+            {"identity": non_holder, "name": "Other"},
+        ])
+
+    # Assert
+    assert allowed.status_code == status.HTTP_200_OK
+    assert denied.status_code == status.HTTP_403_FORBIDDEN
+    results = batch.json()["results"]
+    assert isinstance(results[0]["token"], str)
+    assert results[1]["token"] is None and "access requirement" in results[1]["error"]
+    # Both wallets were cached by the single-token requests.
+    assert provider.calls == 2
+
+def test_get_room_participants_endpoint(client: TestClient):
+    """
+    Test the GET /v1/rooms/{room_name}/participants endpoint served from the occupancy view.
+    """
+    # Arrange
+    room_occupancy.participant_joined("live-room-e2e", "RM_live", "0xabc", 1_700_000_000)
+
+    # Act
+    response = client.get("/v1/rooms/live-room-e2e/participants")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["participant_count"] == 1
+    assert data["participants"][0]["identity"] == "0xabc"
+
+def test_get_occupancy_endpoint(client: TestClient):
+    """
+    Test the GET /v1/rooms/occupancy endpoint.
+    """
+    # Arrange
+    room_occupancy.participant_joined("room-one", "RM_1", "alice", 1_700_000_000)
+    room_occupancy.participant_joined("room-two", "RM_2", "bob", 1_700_000_000)
+    room_occupancy.participant_joined("room-two", "RM_2", "carol", 1_700_000_000)
+
+    # Act
+    response = client.get("/v1/rooms/occupancy")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["total_participants"] == 3
+    assert {room["room_name"]: room["participant_count"] for room in data["rooms"]} == {"room-one": 1, "room-two": 2}
+
+@patch('src.features.rooms.service.create_room_in_livekit', new_callable=AsyncMock)
+def test_create_rooms_bulk_endpoint(mock_create_livekit, client: TestClient, db_session: Session):
+    """
+    Test the POST /v1/rooms/bulk endpoint.
+    """
+    # Arrange
+    mock_livekit_room = MagicMock()
+    mock_livekit_room.sid = "RM_bulk"
+    mock_create_livekit.return_value = mock_livekit_room
+    rooms = [
+        {"name": "breakout-a", "access_type": "public"},
+        {"name": "breakout-b", "access_type": "public"},
+    ]
+
+    # Act
+    response = client.post("/v1/rooms/bulk", json=rooms)
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == ["created", "created"]
+    assert results[1]["room"]["name"] == "breakout-b"
+    assert db_session.query(RoomEntity).count() == 2
+
+def test_list_rooms_endpoint_paginates(client: TestClient, db_session: Session):
+    """
+    Test the GET /v1/rooms endpoint with keyset pagination.
+    """
+    # Arrange
+    for i in range(3):
+        db_session.add(RoomEntity(name=f"listed-{i}", livekit_sid="RM_dummy", access_type="public"))
+    db_session.commit()
+
+    # Act
+    first_page = client.get("/v1/rooms/", params={"limit": 2})
+    second_page = client.get("/v1/rooms/", params={"limit": 2, "cursor": first_page.json()["next_cursor"]})
+
+    # Assert
+    assert first_page.status_code == status.HTTP_200_OK
+    assert [room["name"] for room in first_page.json()["items"]] == ["listed-0", "listed-1"]
+    assert [room["name"] for room in second_page.json()["items"]] == ["listed-2"]
+    assert second_page.json()["next_cursor"] is None
+
+def test_list_rooms_endpoint_streams_ndjson(client: TestClient, db_session: Session):
+    """
+    Test the NDJSON streaming mode of the GET /v1/rooms endpoint.
+    """
+    # Arrange
+    db_session.add(RoomEntity(name="streamed-a", livekit_sid="RM_dummy", access_type="public"))
+    db_session.add(RoomEntity(name="streamed-b", livekit_sid="RM_dummy", access_type="nft"))
+    db_session.commit()
+
+    # Act
+    response = client.get("/v1/rooms/", params={"format": "ndjson", "access_type": "nft"})
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = response.text.splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])["name"] == "streamed-b"
+
+def test_list_rooms_endpoint_invalid_cursor(client: TestClient):
+    """
+    Test that an invalid cursor is rejected with 400.
+    """
+    response = client.get("/v1/rooms/", params={"cursor": "garbage"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+@pytest.mark.parametrize("path", ["/v1/rooms/?limit=10", "/v1/rooms/?format=ndjson", "/v1/rooms/fast-room/token"])
+def test_fast_serialization_returns_same_payloads(path: str, client: TestClient, db_session: Session):
+    """
+    Test that enabling fast serialization leaves listing and token responses unchanged,
+    apart from the signed token itself.
+    """
+    # Arrange
+    db_session.add(RoomEntity(name="fast-room", livekit_sid="RM_fast", access_type="public"))
+    db_session.commit()
+    body = {"identity": "user-1", "name": "User One"}
+
+    def call():
+        if path.endswith("/token"):
+            return client.post(path, json=body)
+        return client.get(path)
+
+    # Act
+    slow = call()
+    with patch.object(settings, "FAST_SERIALIZATION_ENABLED", True):
+        fast = call()
+
+    # Assert
+    assert slow.status_code == fast.status_code == status.HTTP_200_OK
+    if path.endswith("/token"):
+        assert fast.json().keys() == slow.json().keys()
+    else:
+        assert fast.content == slow.content
+
+def test_fast_serialization_keeps_openapi_schema(client: TestClient):
+    """
+    Test that the documented response models are unchanged by the fast serialization path.
+    """
+    # Act
+    schema = client.get("/openapi.json").json()
+
+    # Assert
+    token_response = schema["paths"]["/v1/rooms/{room_name}/token"]["post"]["responses"]["200"]
+    create_response = schema["paths"]["/v1/rooms/"]["post"]["responses"]["201"]
+    assert token_response["content"]["application/json"]["schema"]["$ref"].endswith("/JoinTokenResponse")
+    assert create_response["content"]["application/json"]["schema"]["$ref"].endswith("/RoomResponse")
+
+def test_delete_room_endpoint_with_outbox_returns_accepted(client: TestClient, db_session: Session):
+    """
+    Test that with the LiveKit outbox enabled, DELETE /v1/rooms/{room_name} removes the record,
+    queues a LiveKit job and answers 202 without calling LiveKit.
+    """
+    # Arrange
+    db_session.add(RoomEntity(name="leaving-room-e2e", livekit_sid="RM_dummy", access_type="public"))
+    db_session.commit()
+
+    # Act
+    with patch.object(settings, "LIVEKIT_OUTBOX_ENABLED", True), \
+            patch("src.features.rooms.service.get_livekit_api") as mock_get_livekit_api:
+        response = client.delete("/v1/rooms/leaving-room-e2e")
+    job_response = client.get(response.headers["location"])
+
+    # Assert
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.json()["status"] == "pending"
+    mock_get_livekit_api.assert_not_called()
+    assert db_session.query(RoomEntity).filter(RoomEntity.name == "leaving-room-e2e").first() is None
+    assert job_response.status_code == status.HTTP_200_OK
+    assert job_response.json()["operation"] == "delete_room"
+    assert job_response.json()["room_name"] == "leaving-room-e2e"
+
+def test_get_room_stats_endpoint(client: TestClient, db_session: Session):
+    """
+    Test GET /v1/rooms/{room_name}/stats and GET /v1/analytics/usage served from the rollups.
+    """
+    # Arrange
+    updater = RollupUpdater(db_session, bucket_seconds=3600)
+    updater.apply(UsageEvent("participant_joined", "RM_e2e", "stats-room-e2e", 1_700_000_000, "alice"))
+    updater.apply(UsageEvent("room_finished", "RM_e2e", "stats-room-e2e", 1_700_000_300, room_duration=300))
+    db_session.commit()
+
+    # Act
+    response = client.get("/v1/rooms/stats-room-e2e/stats")
+    missing = client.get("/v1/rooms/never-used-room/stats")
+    usage = client.get("/v1/analytics/usage", params={
+        "start": "2023-11-14T00:00:00Z", "end": "2023-11-15T00:00:00Z", "interval": "day"
+    })
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["sessions"] == 1
+    assert data["total_duration_seconds"] == 300
+    assert data["participant_minutes"] == 5.0
+    assert missing.status_code == status.HTTP_404_NOT_FOUND
+    assert usage.status_code == status.HTTP_200_OK
+    assert usage.json()["buckets"][0]["participant_minutes"] == 5.0
+
+def test_usage_endpoint_reads_times_without_offset_as_utc(client: TestClient, db_session: Session):
+    """
+    Test that GET /v1/analytics/usage accepts start and end without a UTC offset and
+    reads them as UTC, including a start alone with the default end.
+    """
+    # Arrange
+    updater = RollupUpdater(db_session, bucket_seconds=3600)
+    updater.apply(UsageEvent("participant_joined", "RM_naive", "naive-room-e2e", 1_700_000_000, "alice"))
+    updater.apply(UsageEvent("participant_left", "RM_naive", "naive-room-e2e", 1_700_000_300, "alice"))
+    db_session.commit()
+
+    # Act
+    bounded = client.get("/v1/analytics/usage", params={
+        "start": "2023-11-14T00:00:00", "end": "2023-11-15T00:00:00", "interval": "day"
+    })
+    open_ended = client.get("/v1/analytics/usage", params={"start": "2023-11-14T00:00:00", "interval": "day"})
+
+    # Assert
+    assert bounded.status_code == status.HTTP_200_OK
+    assert bounded.json()["buckets"][0]["participant_minutes"] == 5.0
+    assert open_ended.status_code == status.HTTP_200_OK
@@ -1,8 +1,17 @@
+import base64
+import hashlib
+
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, AsyncMock, MagicMock
 from fastapi import status
 from fastapi.testclient import TestClient
+from google.protobuf.json_format import MessageToJson
+from livekit import api
 
+from src.config import settings
+from src.exceptions import WebhookQueueFullException
+from src.features.rooms.occupancy import room_occupancy
+from src.features.webhooks import service as webhook_service
 from src.features.webhooks.models import WebhookConfirmation
 
 # Mock the entire service module to prevent actual processing logic during E2E tests
@@ -25,7 +34,7 @@ def test_handle_webhook_endpoint_success(mock_service, client: TestClient):
     assert response.json() == WebhookConfirmation().model_dump()
     
     mock_service.process_webhook_event.assert_called_once_with(
-        body=webhook_body,
+        body=webhook_body.encode(),
         authorization=headers["Authorization"]
     )
     mock_service.handle_event_logic.assert_called_once()
@@ -64,4 +73,113 @@ def test_handle_webhook_endpoint_validation_fails(mock_service, client: TestClie
     assert response.json()["detail"] == f"Webhook validation or processing failed: {error_message}"
     
     mock_service.process_webhook_event.assert_called_once()
-    mock_service.handle_event_logic.assert_not_called()
\ No newline at end of file
+    mock_service.handle_event_logic.assert_not_called()
+
+@patch('src.features.webhooks.controller.get_webhook_queue')
+@patch('src.features.webhooks.controller.webhook_service')
+def test_handle_webhook_endpoint_enqueues_when_queue_enabled(mock_service, mock_get_queue, client: TestClient):
+    """
+    Test that with the queue enabled the endpoint enqueues the event instead of processing it inline.
+    """
+    # Arrange
+    mock_event = MagicMock()
+    mock_service.process_webhook_event.return_value = mock_event
+    mock_queue = mock_get_queue.return_value
+    mock_queue.enqueue = AsyncMock(return_value=True)
+    headers = {"Authorization": "Bearer valid-jwt"}
+
+    # Act
+    with patch.object(settings, "WEBHOOK_QUEUE_ENABLED", True):
+        response = client.post("/v1/livekit/webhook", content='{"event": "test_event"}', headers=headers)
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    mock_queue.enqueue.assert_awaited_once_with(mock_event)
+    mock_service.handle_event_logic.assert_not_called()
+
+@patch('src.features.webhooks.controller.get_webhook_queue')
+@patch('src.features.webhooks.controller.webhook_service')
+def test_handle_webhook_endpoint_queue_full(mock_service, mock_get_queue, client: TestClient):
+    """
+    Test that a full queue answers 503 so LiveKit retries the delivery.
+    """
+    # Arrange
+    mock_get_queue.return_value.enqueue = AsyncMock(side_effect=WebhookQueueFullException())
+    headers = {"Authorization": "Bearer valid-jwt"}
+
+    # Act
+    with patch.object(settings, "WEBHOOK_QUEUE_ENABLED", True):
+        response = client.post("/v1/livekit/webhook", content='{"event": "test_event"}', headers=headers)
+
+    # Assert
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+@patch('src.features.webhooks.controller.get_webhook_queue')
+@patch('src.features.webhooks.controller.webhook_service.process_webhook_event')
+def test_handle_webhook_endpoint_queue_full_releases_claim(mock_process, mock_get_queue, client: TestClient):
+    """
+    Test that an event rejected by a full queue is queued when LiveKit redelivers it.
+    """
+    # Arrange
+    event = api.WebhookEvent(id="EV_rejected_once", event="participant_joined")
+    mock_process.return_value = event
+    mock_get_queue.return_value.enqueue = AsyncMock(side_effect=[WebhookQueueFullException(), None])
+    headers = {"Authorization": "Bearer valid-jwt"}
+
+    # Act
+    with patch.object(settings, "WEBHOOK_QUEUE_ENABLED", True):
+        first = client.post("/v1/livekit/webhook", content='{"event": "participant_joined"}', headers=headers)
+        second = client.post("/v1/livekit/webhook", content='{"event": "participant_joined"}', headers=headers)
+
+    # Assert
+    assert first.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert second.status_code == status.HTTP_200_OK
+    assert mock_get_queue.return_value.enqueue.await_count == 2
+
+@patch('src.features.webhooks.controller.webhook_service.handle_event_logic')
+@patch('src.features.webhooks.controller.webhook_service.process_webhook_event')
+def test_handle_webhook_endpoint_duplicate_is_acknowledged_once(mock_process, mock_handle, client: TestClient):
+    """
+    Test that a redelivered event returns 200 without running the handlers again.
+    """
+    # Arrange
+    mock_process.return_value = api.WebhookEvent(id="EV_redelivered", event="participant_joined")
+    headers = {"Authorization": "Bearer valid-jwt"}
+
+    # Act
+    first = client.post("/v1/livekit/webhook", content='{"event": "participant_joined"}', headers=headers)
+    second = client.post("/v1/livekit/webhook", content='{"event": "participant_joined"}', headers=headers)
+
+    # Assert
+    assert first.status_code == status.HTTP_200_OK
+    assert second.status_code == status.HTTP_200_OK
+    mock_handle.assert_called_once()
+
+def test_handle_webhook_endpoint_verifies_large_payload_off_loop(client: TestClient):
+    """
+    Test that a signed webhook above the offload threshold is verified on the worker pool
+    and its handlers run.
+    """
+    # Arrange
+    event = api.WebhookEvent(
+        id="EV_offloaded",
+        event="participant_joined",
+        room=api.Room(name="offload-room", sid="RM_offload"),
+        participant=api.ParticipantInfo(identity="user-1", joined_at=1700000000),
+    )
+    body = MessageToJson(event).encode()
+    digest = base64.b64encode(hashlib.sha256(body).digest()).decode()
+    token = api.AccessToken(
+        api_key=settings.LIVEKIT_API_KEY, api_secret=settings.LIVEKIT_API_SECRET
+    ).with_sha256(digest).to_jwt()
+
+    # Act
+    with patch.object(settings, "WEBHOOK_VERIFY_OFFLOAD_BYTES", 0), \
+         patch.object(webhook_service.get_webhook_verify_executor(), 'submit',
+                      wraps=webhook_service.get_webhook_verify_executor().submit) as mock_submit:
+        response = client.post("/v1/livekit/webhook", content=body, headers={"Authorization": token})
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    mock_submit.assert_called_once()
+    assert room_occupancy.get("offload-room")[1] == {"user-1": 1700000000}
@@ -0,0 +1,100 @@
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from src.database.pool import (
+    MonitoredQueuePool,
+    PoolMonitor,
+    enable_sqlite_wal,
+    is_sqlite_memory_url,
+    pool_monitor,
+)
+
+class ProbeQueuePool(MonitoredQueuePool):
+    monitor_name = "probe"
+
+def make_engine(tmp_path, **pool_kwargs):
+    return create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=ProbeQueuePool,
+        connect_args={"check_same_thread": False},
+        **pool_kwargs,
+    )
+
+def test_pool_stats_report_checkouts_and_timeouts(tmp_path):
+    """
+    Test that checkouts, overflow and acquire timeouts are counted for a monitored pool.
+    """
+    # Arrange
+    engine = make_engine(tmp_path, pool_size=1, max_overflow=0, pool_timeout=0.05)
+    pool_monitor.attach("probe", engine, max_overflow=0)
+    before = pool_monitor.stats()["probe"]
+
+    # Act
+    with engine.connect():
+        busy = pool_monitor.stats()["probe"]
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+    after = pool_monitor.stats()["probe"]
+
+    # Assert
+    assert busy["checked_out"] == 1
+    assert busy["size"] == 1
+    assert busy["max_overflow"] == 0
+    assert after["checked_out"] == 0
+    assert after["checkouts"] == before["checkouts"] + 1
+    assert after["timeouts"] == before["timeouts"] + 1
+    assert after["max_acquire_seconds"] >= 0.05
+    engine.dispose()
+
+def test_idle_pre_ping_only_checks_idle_connections(tmp_path):
+    """
+    Test that the "idle" pre-ping mode pings a connection only after it sat idle past the threshold.
+    """
+    # Arrange
+    monitor = PoolMonitor()
+    engine = make_engine(tmp_path, pool_size=1)
+    monitor.attach("test", engine, pre_ping="idle", idle_seconds=0)
+    fresh_monitor = PoolMonitor()
+    fresh_engine = make_engine(tmp_path, pool_size=1)
+    fresh_monitor.attach("test", fresh_engine, pre_ping="idle", idle_seconds=3600)
+
+    # Act
+    for _ in range(3):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        with fresh_engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    # Assert
+    assert monitor.stats()["test"]["pings"] == 2
+    assert fresh_monitor.stats()["test"]["pings"] == 0
+    engine.dispose()
+    fresh_engine.dispose()
+
+def test_sqlite_connections_use_wal(tmp_path):
+    """
+    Test that new SQLite connections are switched to WAL with synchronous=NORMAL.
+    """
+    # Arrange
+    engine = make_engine(tmp_path)
+    enable_sqlite_wal(engine)
+
+    # Act
+    with engine.connect() as connection:
+        journal_mode = connection.execute(text("PRAGMA journal_mode")).scalar()
+        synchronous = connection.execute(text("PRAGMA synchronous")).scalar()
+
+    # Assert
+    assert journal_mode == "wal"
+    assert synchronous == 1  # NORMAL
+    engine.dispose()
+
+def test_is_sqlite_memory_url():
+    """
+    Test that in-memory SQLite URLs are told apart from file databases and other backends.
+    """
+    # Assert
+    assert is_sqlite_memory_url("sqlite://")
+    assert is_sqlite_memory_url("sqlite:///:memory:")
+    assert not is_sqlite_memory_url("sqlite:///./app.db")
+    assert not is_sqlite_memory_url("postgresql://user:pw@db/app")
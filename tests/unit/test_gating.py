@@ -0,0 +1,165 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from src.features.rooms.balance_providers import (
+    BalanceLookupError,
+    JsonRpcBalanceProvider,
+    StaticBalanceProvider,
+)
+from src.features.rooms.cache import CachedRoom
+from src.features.rooms.gating import AccessRequirement, BalanceGate, requirement_for
+
+TOKEN = "0x" + "a" * 40
+HOLDER = "0x" + "1" * 40
+NON_HOLDER = "0x" + "2" * 40
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+class SlowProvider(StaticBalanceProvider):
+    """A static provider that holds each lookup until released."""
+
+    def __init__(self, balances=None):
+        super().__init__(balances)
+        self.release = asyncio.Event()
+
+    async def get_balances(self, keys):
+        await self.release.wait()
+        return await super().get_balances(keys)
+
+def make_room(access_type: str, **fields) -> CachedRoom:
+    return CachedRoom(
+        id=1, name="gated-room", livekit_sid="RM_sid", access_type=access_type,
+        token_address=fields.get("token_address"), token_amount=fields.get("token_amount"),
+        nft_address=fields.get("nft_address"), created_at=None,
+    )
+
+def test_requirement_for_room_access_types():
+    """
+    Test that token rooms require token_amount, NFT rooms require one item and public rooms are open.
+    """
+    # Act
+    token_requirement = requirement_for(make_room("token", token_address=TOKEN, token_amount="500"))
+    nft_requirement = requirement_for(make_room("nft", nft_address=TOKEN))
+    public_requirement = requirement_for(make_room("public"))
+
+    # Assert
+    assert token_requirement == AccessRequirement(contract=TOKEN, minimum=500)
+    assert nft_requirement == AccessRequirement(contract=TOKEN, minimum=1)
+    assert public_requirement is None
+
+@pytest.mark.asyncio
+async def test_gate_batches_misses_into_one_provider_call():
+    """
+    Test that a check for many wallets makes one provider call and applies the minimum.
+    """
+    # Arrange
+    provider = StaticBalanceProvider({(HOLDER, TOKEN): 10, (NON_HOLDER, TOKEN): 2})
+    gate = BalanceGate(provider, positive_ttl_seconds=300, negative_ttl_seconds=15)
+
+    # Act
+    results = await gate.check([HOLDER, NON_HOLDER, "not-a-wallet"], AccessRequirement(TOKEN, 5))
+
+    # Assert
+    assert results == {HOLDER: True, NON_HOLDER: False, "not-a-wallet": False}
+    assert provider.calls == 1
+
+@pytest.mark.asyncio
+async def test_gate_uses_separate_positive_and_negative_ttls():
+    """
+    Test that denials expire after the negative TTL while grants stay cached for the positive TTL.
+    """
+    # Arrange
+    clock = FakeClock()
+    provider = StaticBalanceProvider({(HOLDER, TOKEN): 1})
+    gate = BalanceGate(provider, positive_ttl_seconds=300, negative_ttl_seconds=15, clock=clock)
+    requirement = AccessRequirement(TOKEN, 1)
+    await gate.check([HOLDER, NON_HOLDER], requirement)
+
+    # Act
+    clock.now = 20
+    provider.set_balance(NON_HOLDER, TOKEN, 1)
+    results = await gate.check([HOLDER, NON_HOLDER], requirement)
+
+    # Assert
+    assert results == {HOLDER: True, NON_HOLDER: True}
+    assert provider.calls == 2
+    assert gate.stats()["hits"] == 1
+
+@pytest.mark.asyncio
+async def test_gate_coalesces_concurrent_lookups():
+    """
+    Test that concurrent checks for the same wallet and contract share one provider call.
+    """
+    # Arrange
+    provider = SlowProvider({(HOLDER, TOKEN): 1})
+    gate = BalanceGate(provider, positive_ttl_seconds=300, negative_ttl_seconds=15)
+    requirement = AccessRequirement(TOKEN, 1)
+
+    # Act
+    checks = [asyncio.create_task(gate.check([HOLDER], requirement)) for _ in range(5)]
+    await asyncio.sleep(0)
+    provider.release.set()
+    results = await asyncio.gather(*checks)
+
+    # Assert
+    assert all(result == {HOLDER: True} for result in results)
+    assert provider.calls == 1
+    assert gate.stats()["coalesced"] == 4
+    assert gate.stats()["inflight"] == 0
+
+@pytest.mark.asyncio
+async def test_gate_propagates_provider_errors_to_waiters():
+    """
+    Test that a failed lookup raises BalanceLookupError and is not cached.
+    """
+    # Arrange
+    class FailingProvider(StaticBalanceProvider):
+        async def get_balances(self, keys):
+            self.calls += 1
+            raise BalanceLookupError("rpc down")
+
+    provider = FailingProvider()
+    gate = BalanceGate(provider, positive_ttl_seconds=300, negative_ttl_seconds=15)
+
+    # Act / Assert
+    with pytest.raises(BalanceLookupError):
+        await gate.check([HOLDER], AccessRequirement(TOKEN, 1))
+    with pytest.raises(BalanceLookupError):
+        await gate.check([HOLDER], AccessRequirement(TOKEN, 1))
+    assert provider.calls == 2
+    assert gate.stats()["size"] == 0
+
+@pytest.mark.asyncio
+async def test_json_rpc_provider_sends_one_batch():
+    """
+    Test that the JSON-RPC provider sends every key as one batch of balanceOf calls.
+    """
+    # Arrange
+    batches = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        batch = json.loads(request.content)
+        batches.append(batch)
+        return httpx.Response(200, json=[
+            {"jsonrpc": "2.0", "id": call["id"], "result": hex(call["id"] + 7)} for call in reversed(batch)
+        ])
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    provider = JsonRpcBalanceProvider("http://rpc.local", client=client)
+
+    # Act
+    balances = await provider.get_balances([(HOLDER, TOKEN), (NON_HOLDER, TOKEN)])
+    await provider.aclose()
+
+    # Assert
+    assert len(batches) == 1
+    assert batches[0][0]["params"][0] == {"to": TOKEN, "data": "0x70a08231" + HOLDER[2:].rjust(64, "0")}
+    assert balances == {(HOLDER, TOKEN): 7, (NON_HOLDER, TOKEN): 8}
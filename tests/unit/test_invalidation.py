@@ -0,0 +1,248 @@
+import asyncio
+import os
+import socket
+import time
+
+import pytest
+
+from src.invalidation import InvalidationBus, PostgresNotifyBackend, UnixSocketBackend, build_backend
+
+async def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+class FakeConnection:
+    """Records the NOTIFYs of an asyncpg connection and lets tests deliver or drop them."""
+
+    def __init__(self):
+        self.listeners = {}
+        self.termination_listeners = []
+        self.notified = []
+        self.closed = False
+
+    async def add_listener(self, channel, callback):
+        self.listeners[channel] = callback
+
+    def add_termination_listener(self, callback):
+        self.termination_listeners.append(callback)
+
+    async def execute(self, query, channel, payload):
+        self.notified.append((channel, payload))
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+    def terminate(self):
+        self.closed = True
+        for callback in self.termination_listeners:
+            callback(self)
+
+def test_publish_invalidates_local_subscribers_and_ignores_its_own_echo():
+    """
+    Test that publishing calls this process's subscribers right away, and that the same
+    message coming back through the backend is not applied twice.
+    """
+    # Arrange
+    bus = InvalidationBus()
+    invalidated = []
+    bus.subscribe("room", invalidated.append)
+    sent = []
+    bus.backend.send = sent.append
+
+    # Act
+    bus.publish("room", "room-a")
+    bus._receive(sent[0])
+
+    # Assert
+    assert invalidated == ["room-a"]
+    assert bus.stats()["published"] == 1
+    assert bus.stats()["received"] == 0
+
+def test_failing_subscriber_does_not_block_the_others():
+    """
+    Test that an exception in one subscriber is counted and the next one still runs.
+    """
+    # Arrange
+    bus = InvalidationBus()
+    invalidated = []
+
+    def broken(key):
+        raise RuntimeError("boom")
+
+    bus.subscribe("room", broken)
+    bus.subscribe("room", invalidated.append)
+
+    # Act
+    bus.publish("room", "room-a")
+
+    # Assert
+    assert invalidated == ["room-a"]
+    assert bus.stats()["handler_errors"] == 1
+
+@pytest.mark.asyncio
+async def test_unix_socket_backend_reaches_other_workers(tmp_path):
+    """
+    Test that an invalidation published by one worker reaches another worker bound to
+    the same socket directory, and that sockets of exited workers are cleaned up.
+    """
+    # Arrange
+    directory = str(tmp_path)
+    publisher, subscriber = InvalidationBus(), InvalidationBus()
+    received = []
+    subscriber.subscribe("room", received.append)
+    await publisher.start(UnixSocketBackend(directory))
+    await subscriber.start(UnixSocketBackend(directory))
+    stale = os.path.join(directory, "999999-dead.sock")
+    dead = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    dead.bind(stale)
+    dead.close()
+
+    try:
+        # Act
+        publisher.publish("room", "room-a")
+        await wait_for(lambda: received)
+
+        # Assert
+        assert received == ["room-a"]
+        assert subscriber.stats()["received"] == 1
+        assert not os.path.exists(stale)
+    finally:
+        await publisher.stop()
+        await subscriber.stop()
+
+    assert os.listdir(directory) == []
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_workers_forked_after_import_receive_each_others_invalidations(tmp_path):
+    """
+    Test that a bus created before forking, as with a preloaded app, gets a distinct
+    origin in each worker, so the workers do not drop each other's messages.
+    """
+    # Arrange
+    directory = str(tmp_path)
+    bus = InvalidationBus()
+    received = []
+    bus.subscribe("room", received.append)
+    read_end, write_end = os.pipe()
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.close(read_end)
+
+            async def child():
+                await bus.start(UnixSocketBackend(directory))
+                try:
+                    await wait_for(lambda: received)
+                finally:
+                    await bus.stop()
+
+            asyncio.run(child())
+            os.write(write_end, ",".join(received).encode())
+        finally:
+            os._exit(0)
+
+    os.close(write_end)
+
+    async def parent():
+        await wait_for(lambda: len(os.listdir(directory)) == 1)
+        await bus.start(UnixSocketBackend(directory))
+        try:
+            # Act
+            bus.publish("room", "room-x")
+            return await asyncio.to_thread(os.read, read_end, 1024)
+        finally:
+            await bus.stop()
+
+    child_received = asyncio.run(parent())
+    os.waitpid(pid, 0)
+    os.close(read_end)
+
+    # Assert
+    assert child_received == b"room-x"
+
+@pytest.mark.asyncio
+async def test_postgres_backend_notifies_and_resets_after_reconnect():
+    """
+    Test that publishes are sent with pg_notify, that notifications from other workers
+    are applied, and that subscribers are reset when the connection is re-established.
+    """
+    # Arrange
+    connections = []
+
+    async def connect(dsn):
+        connections.append(FakeConnection())
+        return connections[-1]
+
+    bus, other = InvalidationBus(), InvalidationBus()
+    received, resets = [], []
+    bus.subscribe("room", received.append, on_reset=lambda: resets.append(1))
+    await bus.start(PostgresNotifyBackend("postgresql://db/app", "invalidations", connect=connect, reconnect_delay_seconds=0))
+
+    try:
+        # Act
+        bus.publish("room", "room-a")
+        await wait_for(lambda: connections[0].notified)
+        other.backend.send = lambda payload: connections[0].listeners["invalidations"](None, 1, "invalidations", payload.decode())
+        other.publish("room", "room-b")
+        connections[0].terminate()
+        bus.publish("room", "room-c")
+        await wait_for(lambda: len(connections) == 2 and connections[1].notified)
+
+        # Assert
+        assert connections[0].notified[0][0] == "invalidations"
+        assert received == ["room-a", "room-b", "room-c"]
+        assert resets == [1]
+        assert bus.stats()["reconnects"] == 1
+    finally:
+        await bus.stop()
+
+    assert connections[1].closed
+
+@pytest.mark.asyncio
+async def test_postgres_backend_reconnects_a_listening_worker_without_publishing():
+    """
+    Test that a worker that only listens re-establishes LISTEN and resets its
+    subscribers as soon as the connection drops.
+    """
+    # Arrange
+    connections = []
+
+    async def connect(dsn):
+        connections.append(FakeConnection())
+        return connections[-1]
+
+    bus = InvalidationBus()
+    resets = []
+    bus.subscribe("room", lambda key: None, on_reset=lambda: resets.append(1))
+    await bus.start(PostgresNotifyBackend("postgresql://db/app", "invalidations", connect=connect, reconnect_delay_seconds=0))
+
+    try:
+        # Act
+        connections[0].terminate()
+        await wait_for(lambda: resets)
+
+        # Assert
+        assert len(connections) == 2
+        assert "invalidations" in connections[1].listeners
+        assert bus.stats()["reconnects"] == 1
+    finally:
+        await bus.stop()
+
+def test_build_backend_requires_postgres_for_listen_notify():
+    """
+    Test that the postgres backend is rejected for a non-PostgreSQL database and gets an
+    asyncpg DSN otherwise.
+    """
+    # Act
+    backend = build_backend("postgres", "postgresql+psycopg2://user:pw@db:5432/app", "/tmp", "invalidations")
+
+    # Assert
+    assert backend.dsn == "postgresql://user:pw@db:5432/app"
+    with pytest.raises(ValueError):
+        build_backend("postgres", "sqlite:///./app.db", "/tmp", "invalidations")
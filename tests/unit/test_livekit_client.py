@@ -0,0 +1,171 @@
+import asyncio
+
+import pytest
+from unittest.mock import patch
+from livekit.api import ServerError
+
+from src.exceptions import LiveKitServiceException
+from src.features.rooms import service as room_service
+from src.features.rooms.livekit_client import (
+    CallPolicy,
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientRoomClient,
+)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+class ScriptedRoomService:
+    """A room service whose calls fail or answer according to a script of outcomes."""
+
+    def __init__(self, *outcomes, delays=()):
+        self.outcomes = list(outcomes)
+        self.delays = list(delays)
+        self.calls = 0
+
+    async def list_rooms(self, request):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if self.delays:
+            await asyncio.sleep(self.delays.pop(0))
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    create_room = delete_room = list_participants = list_rooms
+
+def unavailable() -> ServerError:
+    return ServerError("unavailable", "node draining", status=503)
+
+def make_client(service, policy: CallPolicy, breaker: CircuitBreaker = None) -> ResilientRoomClient:
+    policies = {name: policy for name in ("create_room", "delete_room", "list_rooms", "list_participants")}
+    return ResilientRoomClient(
+        lambda: service, policies, breaker=breaker, retry_base_delay_seconds=0.001, rng=lambda: 1.0
+    )
+
+@pytest.mark.asyncio
+async def test_client_retries_transient_errors_only():
+    """
+    Test that transient failures are retried until success and client errors are not retried.
+    """
+    # Arrange
+    flaky = ScriptedRoomService(unavailable(), unavailable(), "rooms")
+    rejecting = ScriptedRoomService(ServerError("not_found", "no such room", status=404))
+
+    # Act
+    result = await make_client(flaky, CallPolicy(timeout_seconds=1, attempts=3)).list_rooms(None)
+    with pytest.raises(ServerError):
+        await make_client(rejecting, CallPolicy(timeout_seconds=1, attempts=3)).list_rooms(None)
+
+    # Assert
+    assert result == "rooms"
+    assert flaky.calls == 3
+    assert rejecting.calls == 1
+
+@pytest.mark.asyncio
+async def test_client_enforces_deadline_across_attempts():
+    """
+    Test that a call which keeps hanging fails once its deadline is spent.
+    """
+    # Arrange
+    service = ScriptedRoomService("late", "late", delays=[1, 1])
+    client = make_client(service, CallPolicy(timeout_seconds=0.05, attempts=2))
+
+    # Act / Assert
+    with pytest.raises(asyncio.TimeoutError):
+        await client.list_rooms(None)
+    assert client.deadline_exceeded == 1
+
+@pytest.mark.asyncio
+async def test_breaker_opens_fails_fast_and_recovers_through_probe():
+    """
+    Test that consecutive failures open the breaker, calls are rejected without reaching
+    LiveKit while it is open, and a successful probe closes it again.
+    """
+    # Arrange
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_seconds=10, clock=clock)
+    service = ScriptedRoomService(unavailable(), unavailable(), "rooms")
+    client = make_client(service, CallPolicy(timeout_seconds=1, attempts=1), breaker)
+    for _ in range(2):
+        with pytest.raises(ServerError):
+            await client.list_rooms(None)
+
+    # Act
+    with pytest.raises(CircuitOpenError):
+        await client.list_rooms(None)
+    open_stats = breaker.stats()
+    clock.now = 11
+    result = await client.list_rooms(None)
+
+    # Assert
+    assert open_stats["state"] == CircuitBreaker.STATE_CODES[CircuitBreaker.OPEN]
+    assert open_stats["rejected"] == 1
+    assert service.calls == 3
+    assert result == "rooms"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+@pytest.mark.asyncio
+async def test_hedged_call_returns_first_answer():
+    """
+    Test that a slow list call is hedged and the faster second request wins.
+    """
+    # Arrange
+    service = ScriptedRoomService("slow", "fast", delays=[1, 0])
+    client = make_client(service, CallPolicy(timeout_seconds=2, hedge_after_seconds=0.01))
+
+    # Act
+    result = await client.list_rooms(None)
+
+    # Assert
+    assert result == "fast"
+    assert client.hedges == 1
+
+@pytest.mark.asyncio
+async def test_deadline_before_the_hedge_cancels_the_pending_request():
+    """
+    Test that a call whose deadline expires before the hedge delay does not leave its
+    request running in the background.
+    """
+    # Arrange
+    cancelled = asyncio.Event()
+
+    class HangingRoomService:
+        async def list_rooms(self, request):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+    client = make_client(HangingRoomService(), CallPolicy(timeout_seconds=0.05, hedge_after_seconds=1))
+
+    # Act
+    with pytest.raises(asyncio.TimeoutError):
+        await client.list_rooms(None)
+    await asyncio.wait_for(cancelled.wait(), 1)
+
+    # Assert
+    assert cancelled.is_set()
+    assert client.hedges == 0
+
+@pytest.mark.asyncio
+async def test_create_room_in_livekit_fails_fast_when_breaker_open():
+    """
+    Test that an open breaker surfaces as LiveKitServiceException without calling LiveKit.
+    """
+    # Arrange
+    breaker = room_service.get_livekit_rooms().breaker
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+    # Act / Assert
+    with patch("src.features.rooms.service.get_livekit_api") as mock_get_livekit_api:
+        with pytest.raises(LiveKitServiceException):
+            await room_service.create_room_in_livekit(name="room", empty_timeout=60, max_participants=5)
+    mock_get_livekit_api.assert_not_called()
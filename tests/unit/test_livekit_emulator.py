@@ -0,0 +1,75 @@
+import random
+
+import pytest
+from livekit import api
+from starlette.testclient import TestClient
+
+from benchmarks.livekit_emulator import FaultProfile, LatencyModel, LiveKitEmulator
+
+API_KEY = "emulator-key"
+API_SECRET = "emulator-secret-emulator-secret-emulator"
+
+def twirp(client: TestClient, method: str, message, secret: str = API_SECRET):
+    token = api.AccessToken(api_key=API_KEY, api_secret=secret).with_grants(api.VideoGrants(room_create=True)).to_jwt()
+    return client.post(
+        f"/twirp/livekit.RoomService/{method}",
+        content=message.SerializeToString(),
+        headers={"Authorization": f"Bearer {token}", "Content-Type": "application/protobuf"},
+    )
+
+def test_latency_model_parses_and_samples_specs():
+    """
+    Test that latency specs are parsed and sampled in seconds, and invalid specs are rejected.
+    """
+    # Arrange
+    rng = random.Random(1)
+
+    # Act
+    fixed = LatencyModel.parse("fixed:5").sample(rng)
+    uniform = LatencyModel.parse("uniform:2,4").sample(rng)
+
+    # Assert
+    assert fixed == pytest.approx(0.005)
+    assert 0.002 <= uniform <= 0.004
+    with pytest.raises(ValueError):
+        LatencyModel.parse("uniform:2")
+
+def test_emulator_serves_room_lifecycle_over_twirp():
+    """
+    Test that rooms can be created, listed and deleted with protobuf Twirp calls.
+    """
+    # Arrange
+    emulator = LiveKitEmulator(API_KEY, API_SECRET)
+    client = TestClient(emulator.app)
+
+    # Act
+    created = api.Room.FromString(twirp(client, "CreateRoom", api.CreateRoomRequest(name="room-a")).content)
+    listed = api.ListRoomsResponse.FromString(twirp(client, "ListRooms", api.ListRoomsRequest()).content)
+    deleted = twirp(client, "DeleteRoom", api.DeleteRoomRequest(room="room-a"))
+    missing = twirp(client, "DeleteRoom", api.DeleteRoomRequest(room="room-a"))
+
+    # Assert
+    assert created.name == "room-a" and created.sid.startswith("RM_")
+    assert [room.name for room in listed.rooms] == ["room-a"]
+    assert deleted.status_code == 200
+    assert missing.status_code == 404
+    assert missing.json()["code"] == "not_found"
+
+def test_emulator_rejects_bad_tokens_and_injects_errors():
+    """
+    Test that calls signed with the wrong secret are rejected and configured errors are injected.
+    """
+    # Arrange
+    emulator = LiveKitEmulator(API_KEY, API_SECRET, faults=FaultProfile(method_error_rate={"CreateRoom": 1.0}))
+    client = TestClient(emulator.app)
+
+    # Act
+    unauthenticated = twirp(client, "ListRooms", api.ListRoomsRequest(), secret="wrong-secret-wrong-secret-wrong-secret")
+    failed = twirp(client, "CreateRoom", api.CreateRoomRequest(name="room-a"))
+
+    # Assert
+    assert unauthenticated.status_code == 401
+    assert failed.status_code == 503
+    assert failed.json()["code"] == "unavailable"
+    assert emulator.injected_errors == {"CreateRoom": 1}
+    assert emulator.rooms == {}
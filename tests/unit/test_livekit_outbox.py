@@ -0,0 +1,124 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from src.entities.livekit_job_entity import LiveKitJob
+from src.features.rooms.outbox import (
+    JOB_FAILED,
+    JOB_PENDING,
+    JOB_RUNNING,
+    JOB_SUCCEEDED,
+    LiveKitOutbox,
+    new_job,
+    utcnow,
+)
+
+def add_jobs(db: Session, *jobs: LiveKitJob):
+    db.add_all(jobs)
+    db.commit()
+
+def test_claim_leases_due_jobs_once(db_session: Session):
+    """
+    Test that due jobs are claimed oldest first, only once, and that future jobs are left alone.
+    """
+    # Arrange
+    outbox = LiveKitOutbox(handlers={})
+    later = new_job("delete_room", "later-room")
+    later.next_attempt_at = utcnow() + timedelta(minutes=5)
+    add_jobs(db_session, new_job("delete_room", "room-a"), new_job("delete_room", "room-b"), later)
+
+    # Act
+    first = outbox.claim(db_session, limit=10)
+    second = outbox.claim(db_session, limit=10)
+
+    # Assert
+    assert [job.room_name for job in first] == ["room-a", "room-b"]
+    assert all(job.attempts == 1 for job in first)
+    assert second == []
+    statuses = {job.room_name: job.status for job in db_session.query(LiveKitJob)}
+    assert statuses == {"room-a": JOB_RUNNING, "room-b": JOB_RUNNING, "later-room": JOB_PENDING}
+
+def test_claim_reclaims_jobs_with_expired_lease(db_session: Session):
+    """
+    Test that a running job whose worker died is claimed again once its lease expires.
+    """
+    # Arrange
+    outbox = LiveKitOutbox(handlers={}, lease_seconds=-1)
+    add_jobs(db_session, new_job("delete_room", "room-a"))
+    outbox.claim(db_session, limit=10)
+
+    # Act
+    reclaimed = outbox.claim(db_session, limit=10)
+
+    # Assert
+    assert [job.attempts for job in reclaimed] == [2]
+
+@pytest.mark.asyncio
+async def test_run_once_records_success_retry_and_final_failure(session_factory):
+    """
+    Test that successful jobs are marked succeeded, failing jobs are rescheduled with
+    backoff, and a job out of attempts is marked failed with its last error.
+    """
+    # Arrange
+    handled = []
+
+    async def delete_room(job):
+        handled.append(job.room_name)
+        if job.room_name != "good-room":
+            raise RuntimeError("livekit down")
+
+    outbox = LiveKitOutbox(handlers={"delete_room": delete_room}, max_attempts=2, backoff_base_seconds=0)
+    with session_factory() as db:
+        add_jobs(db, new_job("delete_room", "good-room"), new_job("delete_room", "bad-room"))
+
+    # Act
+    first_batch = await outbox.run_once(session_factory)
+    second_batch = await outbox.run_once(session_factory)
+
+    # Assert
+    assert (first_batch, second_batch) == (2, 1)
+    assert handled == ["good-room", "bad-room", "bad-room"]
+    with session_factory() as db:
+        jobs = {job.room_name: job for job in db.query(LiveKitJob)}
+        assert jobs["good-room"].status == JOB_SUCCEEDED
+        assert jobs["good-room"].completed_at is not None
+        assert jobs["bad-room"].status == JOB_FAILED
+        assert jobs["bad-room"].attempts == 2
+        assert "livekit down" in jobs["bad-room"].last_error
+    assert outbox.stats()["retried"] == 1
+
+def test_backoff_grows_exponentially_with_jitter():
+    """
+    Test that the retry delay doubles per attempt, stays within the jitter band and is capped.
+    """
+    # Arrange
+    outbox = LiveKitOutbox(handlers={}, backoff_base_seconds=1, backoff_max_seconds=10, rng=lambda: 1.0)
+
+    # Act
+    delays = [outbox.backoff_seconds(attempts) for attempts in (1, 2, 3, 10)]
+
+    # Assert
+    assert delays == [1, 2, 4, 10]
+
+def test_prune_deletes_finished_jobs_past_the_retention(db_session: Session):
+    """
+    Test that succeeded and failed jobs older than the retention are deleted, and that
+    recent and unfinished jobs are kept.
+    """
+    # Arrange
+    outbox = LiveKitOutbox(handlers={}, retention_seconds=3600)
+    long_ago = utcnow() - timedelta(hours=2)
+    jobs = {name: new_job("delete_room", name) for name in ("old-done", "old-failed", "recent-done", "pending")}
+    jobs["old-done"].status, jobs["old-done"].completed_at = JOB_SUCCEEDED, long_ago
+    jobs["old-failed"].status, jobs["old-failed"].completed_at = JOB_FAILED, long_ago
+    jobs["recent-done"].status, jobs["recent-done"].completed_at = JOB_SUCCEEDED, utcnow()
+    add_jobs(db_session, *jobs.values())
+
+    # Act
+    pruned = outbox.prune(db_session)
+
+    # Assert
+    assert pruned == 2
+    assert sorted(job.room_name for job in db_session.query(LiveKitJob)) == ["pending", "recent-done"]
+    assert outbox.stats()["pruned"] == 2
@@ -0,0 +1,117 @@
+import pytest
+
+from sqlalchemy import create_engine, text
+
+from src.metrics import Counter, Histogram, MetricsRegistry, instrument_engine, route_template, time_livekit_call
+
+def test_counter_increments_per_label_set():
+    """
+    Test that a counter keeps a separate value for each set of label values.
+    """
+    # Arrange
+    counter = Counter("events_total", "Events.", ("event_type",))
+
+    # Act
+    counter.inc("room_started")
+    counter.inc("room_started")
+    counter.inc("room_finished", amount=3)
+
+    # Assert
+    assert counter.value("room_started") == 2
+    assert counter.value("room_finished") == 3
+    assert counter.value("participant_joined") == 0
+
+def test_histogram_renders_cumulative_buckets():
+    """
+    Test that histogram buckets are rendered cumulatively with +Inf, _sum and _count lines.
+    """
+    # Arrange
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+
+    # Act
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(5.0, "/a")
+    lines = histogram.render()
+
+    # Assert
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{route="/a"} 3' in lines
+    assert 'latency_seconds_sum{route="/a"} 5.55' in lines
+
+def test_registry_exports_numeric_stats_as_gauges():
+    """
+    Test that registered stats callbacks are read at render time and non-numeric values are skipped.
+    """
+    # Arrange
+    registry = MetricsRegistry()
+    stats = {"size": 1, "running": True, "policy": "reject"}
+    registry.register_stats("component", "Component stats", lambda: stats)
+    stats["size"] = 7
+
+    # Act
+    output = registry.render()
+
+    # Assert
+    assert "# TYPE component_size gauge" in output
+    assert "component_size 7" in output
+    assert "component_running" not in output
+    assert "component_policy" not in output
+
+@pytest.mark.asyncio
+async def test_time_livekit_call_counts_errors():
+    """
+    Test that a failing LiveKit call is timed and counted as an error.
+    """
+    # Arrange
+    from src.metrics import livekit_call_duration, livekit_call_errors
+    errors_before = livekit_call_errors.value("test_operation")
+    calls_before = livekit_call_duration.count("test_operation")
+
+    # Act
+    with pytest.raises(RuntimeError):
+        async with time_livekit_call("test_operation"):
+            raise RuntimeError("boom")
+
+    # Assert
+    assert livekit_call_errors.value("test_operation") == errors_before + 1
+    assert livekit_call_duration.count("test_operation") == calls_before + 1
+
+def test_instrument_engine_times_statements_by_type():
+    """
+    Test that SQL statements run on an instrumented engine are timed by statement type.
+    """
+    # Arrange
+    from src.metrics import db_query_duration, db_query_errors
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    selects_before = db_query_duration.count("SELECT")
+    errors_before = db_query_errors.value("SELECT")
+
+    # Act
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        with pytest.raises(Exception):
+            connection.execute(text("SELECT * FROM missing_table"))
+
+    # Assert
+    assert db_query_duration.count("SELECT") == selects_before + 1
+    assert db_query_errors.value("SELECT") == errors_before + 1
+
+def test_route_template_restores_router_prefix():
+    """
+    Test that a route template missing its router prefix is completed from the request path.
+    """
+    # Arrange
+    class FakeRoute:
+        path = "/rooms/{room_name}/token"
+
+    # Act
+    nested = route_template({"route": FakeRoute(), "path": "/v1/rooms/room-a/token"})
+    unmatched = route_template({"path": "/nowhere"})
+
+    # Assert
+    assert nested == "/v1/rooms/{room_name}/token"
+    assert unmatched == "unmatched"
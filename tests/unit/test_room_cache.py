@@ -0,0 +1,110 @@
+import pytest
+from unittest.mock import patch, MagicMock
+
+from sqlalchemy.orm import Session
+
+from src.features.rooms import service as room_service
+from src.features.rooms.cache import CachedRoom, RoomCache
+from src.features.webhooks import service as webhook_service
+from src.entities.room_entity import Room as RoomEntity
+
+def make_cached_room(name: str) -> CachedRoom:
+    return CachedRoom(
+        id=1, name=name, livekit_sid="RM_sid", access_type="public",
+        token_address=None, token_amount=None, nft_address=None, created_at=None,
+    )
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def test_room_cache_hit_and_miss_counters():
+    """
+    Test that lookups update the hit and miss counters.
+    """
+    # Arrange
+    cache = RoomCache(max_size=10, ttl_seconds=60)
+    cache.set(make_cached_room("room-a"))
+
+    # Act
+    hit = cache.get("room-a")
+    miss = cache.get("room-b")
+
+    # Assert
+    assert hit.name == "room-a"
+    assert miss is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_room_cache_evicts_least_recently_used():
+    """
+    Test that the least recently used entry is evicted when the cache is full.
+    """
+    # Arrange
+    cache = RoomCache(max_size=2, ttl_seconds=60)
+    cache.set(make_cached_room("room-a"))
+    cache.set(make_cached_room("room-b"))
+    cache.get("room-a")  # room-b is now the least recently used
+
+    # Act
+    cache.set(make_cached_room("room-c"))
+
+    # Assert
+    assert cache.get("room-b") is None
+    assert cache.get("room-a") is not None
+    assert cache.get("room-c") is not None
+    assert cache.stats()["evictions"] == 1
+
+def test_room_cache_entries_expire():
+    """
+    Test that entries older than the TTL are treated as misses.
+    """
+    # Arrange
+    clock = FakeClock()
+    cache = RoomCache(max_size=10, ttl_seconds=5, clock=clock)
+    cache.set(make_cached_room("room-a"))
+
+    # Act
+    clock.now = 6
+
+    # Assert
+    assert cache.get("room-a") is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["size"] == 0
+
+def test_get_cached_room_by_name_fills_on_miss(db_session: Session):
+    """
+    Test that the first lookup reads the database and the second is served from cache.
+    """
+    # Arrange
+    db_session.add(RoomEntity(name="cached-room", livekit_sid="RM_cached", access_type="public"))
+    db_session.commit()
+
+    # Act
+    with patch('src.features.rooms.service.get_room_by_name', wraps=room_service.get_room_by_name) as spy:
+        first = room_service.get_cached_room_by_name(db_session, "cached-room")
+        second = room_service.get_cached_room_by_name(db_session, "cached-room")
+
+    # Assert
+    assert first == second
+    assert first.livekit_sid == "RM_cached"
+    spy.assert_called_once()
+
+def test_room_finished_webhook_invalidates_cache():
+    """
+    Test that a room_finished webhook drops the room from the cache.
+    """
+    # Arrange
+    room_service.get_room_cache().set(make_cached_room("finished-room"))
+    event = MagicMock()
+    event.event = "room_finished"
+    event.room.name = "finished-room"
+
+    # Act
+    webhook_service.handle_event_logic(event)
+
+    # Assert
+    assert room_service.get_room_cache().get("finished-room") is None
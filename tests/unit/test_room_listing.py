@@ -0,0 +1,76 @@
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.entities.room_entity import Room as RoomEntity
+from src.exceptions import InvalidCursorException
+from src.features.rooms import listing as room_listing
+
+def seed_rooms(db_session: Session):
+    # Several rooms share a timestamp so the id tie-breaker is exercised, and some
+    # rely on the server default so both SQLite timestamp formats are mixed.
+    same_second = datetime(2024, 1, 1, 12, 0, 0)
+    for i in range(4):
+        db_session.add(RoomEntity(name=f"tied-{i}", livekit_sid="RM", access_type="public", created_at=same_second))
+    db_session.add(RoomEntity(name="gated", livekit_sid="RM", access_type="token", created_at=datetime(2024, 1, 2)))
+    for i in range(3):
+        db_session.add(RoomEntity(name=f"now-{i}", livekit_sid="RM", access_type="public"))
+    db_session.commit()
+
+def test_list_rooms_page_walks_every_room_once(db_session: Session):
+    """
+    Test that following next_cursor visits every room exactly once, in (created_at, id) order.
+    """
+    # Arrange
+    seed_rooms(db_session)
+    seen = []
+    cursor = None
+
+    # Act
+    while True:
+        rooms, cursor = room_listing.list_rooms_page(db_session, limit=3, cursor=cursor)
+        seen.extend(room.name for room in rooms)
+        if cursor is None:
+            break
+
+    # Assert
+    assert seen == ["tied-0", "tied-1", "tied-2", "tied-3", "gated", "now-0", "now-1", "now-2"]
+
+def test_list_rooms_page_filters_by_access_type(db_session: Session):
+    """
+    Test that the access_type filter applies to every page.
+    """
+    # Arrange
+    seed_rooms(db_session)
+
+    # Act
+    rooms, cursor = room_listing.list_rooms_page(db_session, limit=10, access_type="token")
+
+    # Assert
+    assert [room.name for room in rooms] == ["gated"]
+    assert cursor is None
+
+def test_decode_cursor_rejects_garbage():
+    """
+    Test that an undecodable cursor raises InvalidCursorException.
+    """
+    with pytest.raises(InvalidCursorException):
+        room_listing.decode_cursor("not-a-cursor")
+
+def test_stream_rooms_ndjson_yields_all_rooms(session_factory: sessionmaker, db_session: Session):
+    """
+    Test that the NDJSON stream yields one JSON document per room across batches.
+    """
+    # Arrange
+    seed_rooms(db_session)
+
+    # Act
+    chunks = list(room_listing.stream_rooms_ndjson(session_factory, batch_size=3))
+
+    # Assert
+    lines = "".join(chunks).splitlines()
+    assert len(chunks) == 3
+    assert [json.loads(line)["name"] for line in lines][:2] == ["tied-0", "tied-1"]
+    assert len(lines) == 8
@@ -0,0 +1,115 @@
+import json
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from livekit import api
+
+from src.features.rooms.occupancy import RoomOccupancy, room_occupancy
+from src.invalidation import invalidation_bus
+from src.features.webhooks import service as webhook_service
+
+def make_event(event_type: str, room_name: str, identity: str = "", room_sid: str = "RM_1") -> api.WebhookEvent:
+    event = api.WebhookEvent(id=f"{event_type}-{identity}", event=event_type, created_at=1_700_000_000)
+    event.room.name = room_name
+    event.room.sid = room_sid
+    event.participant.identity = identity
+    return event
+
+def test_occupancy_tracks_joins_and_leaves():
+    """
+    Test that joins and leaves update the participants and counts of a room.
+    """
+    # Arrange
+    occupancy = RoomOccupancy()
+
+    # Act
+    occupancy.participant_joined("room-a", "RM_a", "alice", 100)
+    occupancy.participant_joined("room-a", "RM_a", "bob", 101)
+    occupancy.participant_joined("room-a", "RM_a", "alice", 100)  # reconnect
+    occupancy.participant_left("room-a", "bob")
+
+    # Assert
+    room_sid, participants = occupancy.get("room-a")
+    assert room_sid == "RM_a"
+    assert participants == {"alice": 100}
+    assert occupancy.counts() == {"room-a": 1}
+    assert occupancy.total_participants == 1
+
+def test_occupancy_room_finished_clears_room():
+    """
+    Test that room_finished removes a room and its participants from the totals.
+    """
+    # Arrange
+    occupancy = RoomOccupancy()
+    occupancy.participant_joined("room-a", "RM_a", "alice", 100)
+    occupancy.participant_joined("room-b", "RM_b", "bob", 100)
+
+    # Act
+    occupancy.room_finished("room-a")
+
+    # Assert
+    assert occupancy.get("room-a") == (None, {})
+    assert occupancy.counts() == {"room-b": 1}
+    assert occupancy.total_participants == 1
+
+def test_handle_event_logic_maintains_occupancy():
+    """
+    Test that participant webhooks feed the shared occupancy view.
+    """
+    # Act
+    webhook_service.handle_event_logic(make_event("participant_joined", "hooked-room", "alice"))
+    webhook_service.handle_event_logic(make_event("participant_joined", "hooked-room", "bob"))
+    webhook_service.handle_event_logic(make_event("participant_left", "hooked-room", "alice"))
+
+    # Assert
+    _, participants = room_occupancy.get("hooked-room")
+    assert list(participants) == ["bob"]
+
+def test_participant_webhooks_handled_by_another_worker_update_this_view(monkeypatch):
+    """
+    Test that joins and leaves received by another worker reach this worker's view
+    through the invalidation bus.
+    """
+    # Arrange
+    sent = []
+    monkeypatch.setattr(invalidation_bus.backend, "send", sent.append)
+    webhook_service.handle_event_logic(make_event("participant_joined", "shared-room", "alice", room_sid="RM_s"))
+    webhook_service.handle_event_logic(make_event("participant_joined", "shared-room", "bob", room_sid="RM_s"))
+    webhook_service.handle_event_logic(make_event("participant_left", "shared-room", "alice", room_sid="RM_s"))
+    room_occupancy.clear()  # this worker has not seen the webhooks
+
+    # Act
+    for payload in sent:
+        message = json.loads(payload)
+        message["o"] = "another-worker"
+        invalidation_bus._receive(json.dumps(message).encode())
+
+    # Assert
+    assert room_occupancy.get("shared-room") == ("RM_s", {"bob": 1_700_000_000})
+
+@pytest.mark.asyncio
+async def test_resync_corrects_drift():
+    """
+    Test that a resync replaces drifted rooms and drops rooms LiveKit no longer reports.
+    """
+    # Arrange
+    occupancy = RoomOccupancy()
+    occupancy.participant_joined("stale-room", "RM_stale", "ghost", 100)
+    occupancy.participant_joined("live-room", "RM_live", "missed-leave", 100)
+    time.sleep(0.001)
+
+    live_room = api.Room(name="live-room", sid="RM_live")
+    room_client = MagicMock()
+    room_client.list_rooms = AsyncMock(return_value=api.ListRoomsResponse(rooms=[live_room]))
+    room_client.list_participants = AsyncMock(return_value=api.ListParticipantsResponse(
+        participants=[api.ParticipantInfo(identity="carol", joined_at=200)]
+    ))
+
+    # Act
+    await occupancy.resync(room_client)
+
+    # Assert
+    assert occupancy.counts() == {"live-room": 1}
+    assert occupancy.get("live-room") == ("RM_live", {"carol": 200})
+    assert occupancy.total_participants == 1
@@ -0,0 +1,162 @@
+from datetime import datetime, timezone
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from livekit import api
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.entities.room_entity import Room as RoomEntity
+from src.features.rooms import reconciler as reconciler_module
+from src.features.rooms.reconciler import RoomReconciler
+
+NOW = 1_700_000_000
+OLD = datetime.fromtimestamp(NOW - 3600, tz=timezone.utc)
+
+def make_room_client(rooms):
+    room_client = MagicMock()
+    room_client.list_rooms = AsyncMock(side_effect=lambda request: api.ListRoomsResponse(rooms=list(rooms)))
+    room_client.delete_room = AsyncMock()
+    return room_client
+
+def make_reconciler(room_client, session_factory, **kwargs) -> RoomReconciler:
+    return RoomReconciler(
+        room_client=room_client,
+        session_factory=session_factory,
+        batch_size=2,
+        grace_seconds=60,
+        clock=lambda: NOW,
+        **kwargs,
+    )
+
+@pytest.mark.asyncio
+async def test_full_sweep_fixes_every_kind_of_drift(session_factory: sessionmaker, db_session: Session):
+    """
+    Test that a full sweep deletes stale rows, updates SIDs and deletes LiveKit orphans.
+    """
+    # Arrange
+    db_session.add_all([
+        RoomEntity(name="in-sync", livekit_sid="RM_1", access_type="public", created_at=OLD),
+        RoomEntity(name="closed", livekit_sid="RM_2", access_type="public", created_at=OLD),
+        RoomEntity(name="recreated", livekit_sid="RM_old", access_type="public", created_at=OLD),
+        RoomEntity(name="just-created", livekit_sid="RM_4", access_type="public",
+                   created_at=datetime.fromtimestamp(NOW - 5, tz=timezone.utc)),
+    ])
+    db_session.commit()
+    room_client = make_room_client([
+        api.Room(name="in-sync", sid="RM_1", creation_time=NOW - 3600),
+        api.Room(name="recreated", sid="RM_new", creation_time=NOW - 3600),
+        api.Room(name="orphan", sid="RM_5", creation_time=NOW - 3600),
+        api.Room(name="young-orphan", sid="RM_6", creation_time=NOW - 5),
+    ])
+    reconciler = make_reconciler(room_client, session_factory)
+
+    # Act
+    report = await reconciler.run_once()
+
+    # Assert
+    assert report.full_sweep is True
+    assert report.db_rows_checked == 4
+    assert report.stale_rows_deleted == 1
+    assert report.sids_updated == 1
+    assert report.orphans_deleted == 1
+    db_session.expire_all()
+    names = {room.name: room.livekit_sid for room in db_session.query(RoomEntity).all()}
+    assert names == {"in-sync": "RM_1", "recreated": "RM_new", "just-created": "RM_4"}
+    room_client.delete_room.assert_awaited_once_with(api.DeleteRoomRequest(room="orphan"))
+
+@pytest.mark.asyncio
+async def test_incremental_pass_only_checks_changes(session_factory: sessionmaker, db_session: Session):
+    """
+    Test that after a full sweep, a pass only checks new rows and rooms that changed in LiveKit.
+    """
+    # Arrange
+    db_session.add_all([
+        RoomEntity(name=f"room-{i}", livekit_sid=f"RM_{i}", access_type="public", created_at=OLD)
+        for i in range(4)
+    ])
+    db_session.commit()
+    livekit_rooms = [api.Room(name=f"room-{i}", sid=f"RM_{i}", creation_time=NOW - 3600) for i in range(4)]
+    room_client = make_room_client(livekit_rooms)
+    reconciler = make_reconciler(room_client, session_factory)
+    await reconciler.run_once()
+
+    # room-2 closes in LiveKit and a new row is added.
+    del livekit_rooms[2]
+    db_session.add(RoomEntity(name="room-new", livekit_sid="RM_new", access_type="public", created_at=OLD))
+    db_session.commit()
+    livekit_rooms.append(api.Room(name="room-new", sid="RM_new", creation_time=NOW - 3600))
+
+    # Act
+    report = await reconciler.run_once()
+
+    # Assert
+    assert report.full_sweep is False
+    assert report.db_rows_checked == 2  # the new row and the room that disappeared
+    assert report.stale_rows_deleted == 1
+    db_session.expire_all()
+    assert db_session.query(RoomEntity).filter(RoomEntity.name == "room-2").first() is None
+    room_client.delete_room.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_rooms_within_the_grace_period_are_checked_on_the_next_pass(session_factory: sessionmaker, db_session: Session):
+    """
+    Test that a young orphan and a young row missing from LiveKit are fixed by the next
+    incremental pass once they are past the grace period, without a full sweep.
+    """
+    # Arrange
+    db_session.add(RoomEntity(name="young-row", livekit_sid="RM_1", access_type="public",
+                              created_at=datetime.fromtimestamp(NOW - 5, tz=timezone.utc)))
+    db_session.commit()
+    room_client = make_room_client([api.Room(name="young-orphan", sid="RM_2", creation_time=NOW - 5)])
+    clock = [NOW]
+    reconciler = RoomReconciler(
+        room_client=room_client, session_factory=session_factory, grace_seconds=60, clock=lambda: clock[0],
+    )
+    first = await reconciler.run_once()
+    clock[0] += 120
+
+    # Act
+    second = await reconciler.run_once()
+
+    # Assert
+    assert (first.stale_rows_deleted, first.orphans_deleted) == (0, 0)
+    assert second.full_sweep is False
+    assert (second.stale_rows_deleted, second.orphans_deleted) == (1, 1)
+    room_client.delete_room.assert_awaited_once_with(api.DeleteRoomRequest(room="young-orphan"))
+
+@pytest.mark.asyncio
+async def test_stale_row_recreated_during_the_pass_is_kept(session_factory: sessionmaker, db_session: Session, monkeypatch):
+    """
+    Test that a stale row is deleted by id, so a room recreated under the same name
+    while the pass runs is not deleted with it.
+    """
+    # Arrange
+    db_session.add_all([
+        RoomEntity(name="closed", livekit_sid="RM_1", access_type="public", created_at=OLD),
+        RoomEntity(name="open", livekit_sid="RM_3", access_type="public", created_at=OLD),
+    ])
+    db_session.commit()
+    list_rooms_page = reconciler_module.room_listing.list_rooms_page
+
+    def list_rooms_page_then_recreate(db, limit, cursor):
+        page = list_rooms_page(db, limit=limit, cursor=cursor)
+        if cursor is None:
+            db_session.query(RoomEntity).filter(RoomEntity.name == "closed").delete()
+            db_session.add(RoomEntity(name="closed", livekit_sid="RM_2", access_type="public",
+                                      created_at=datetime.fromtimestamp(NOW - 5, tz=timezone.utc)))
+            db_session.commit()
+        return page
+
+    monkeypatch.setattr(reconciler_module.room_listing, "list_rooms_page", list_rooms_page_then_recreate)
+    room_client = make_room_client([api.Room(name="open", sid="RM_3", creation_time=NOW - 3600)])
+    reconciler = make_reconciler(room_client, session_factory)
+
+    # Act
+    report = await reconciler.run_once()
+
+    # Assert
+    assert report.stale_rows_deleted == 1
+    db_session.expire_all()
+    names = {room.name: room.livekit_sid for room in db_session.query(RoomEntity).all()}
+    assert names == {"closed": "RM_2", "open": "RM_3"}
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from unittest.mock import patch, AsyncMock, MagicMock
 
@@ -7,7 +8,12 @@ from livekit import api
 from src.features.rooms import service as room_service
 from src.features.rooms import models as room_models
 from src.entities.room_entity import Room as RoomEntity
-from src.exceptions import RoomAlreadyExistsException, RoomNotFoundException, LiveKitServiceException
+from src.exceptions import (
+    RoomAlreadyExistsException,
+    RoomNotFoundException,
+    LiveKitServiceException,
+    TokenBatchTooLargeException
+)
 
 @pytest.mark.asyncio
 @patch('src.features.rooms.service.create_room_in_livekit', new_callable=AsyncMock)
@@ -85,6 +91,49 @@ async def test_create_room_service_livekit_fails(mock_get_room, mock_create_live
         await room_service.create_room_service(db_session, request)
     mock_create_livekit.assert_awaited_once()
 
+@pytest.mark.asyncio
+@patch('src.features.rooms.service.create_room_in_livekit', new_callable=AsyncMock)
+async def test_create_room_service_coalesces_concurrent_creates(mock_create_livekit, db_session: Session):
+    """
+    Test that concurrent creates of one name make a single LiveKit call, sharing the room
+    with identical requests and answering a differing request with a 409.
+    """
+    # Arrange
+    async def create_slowly(**kwargs):
+        await asyncio.sleep(0.01)
+        return MagicMock(sid="RM_shared")
+
+    mock_create_livekit.side_effect = create_slowly
+    request = room_models.RoomCreateRequest(name="viral-room", access_type="public")
+    other_request = room_models.RoomCreateRequest(name="viral-room", access_type="public", max_participants=5)
+
+    # Act
+    results = await asyncio.gather(
+        *(room_service.create_room_service(db_session, request) for _ in range(3)),
+        room_service.create_room_service(db_session, other_request),
+        return_exceptions=True,
+    )
+
+    # Assert
+    mock_create_livekit.assert_awaited_once()
+    assert {result.livekit_sid for result in results[:3]} == {"RM_shared"}
+    assert len({result.id for result in results[:3]}) == 1
+    assert isinstance(results[3], RoomAlreadyExistsException)
+
+def test_create_room_in_db_maps_integrity_error_to_conflict(db_session: Session):
+    """
+    Test that losing an insert race on the unique name raises RoomAlreadyExistsException.
+    """
+    # Arrange
+    db_session.add(RoomEntity(name="raced-room", livekit_sid="RM_first", access_type="public"))
+    db_session.commit()
+    request = room_models.RoomCreateRequest(name="raced-room", access_type="public")
+
+    # Act & Assert
+    with pytest.raises(RoomAlreadyExistsException):
+        room_service.create_room_in_db(db_session, request, "RM_second")
+    assert db_session.query(RoomEntity).filter(RoomEntity.name == "raced-room").count() == 1
+
 def test_create_join_token_service_success(db_session: Session):
     """
     Test successful creation of a join token when the room exists.
@@ -112,4 +161,192 @@ def test_create_join_token_service_room_not_found(db_session: Session):
 
     # Act & Assert
     with pytest.raises(RoomNotFoundException):
-        room_service.create_join_token_service(db_session, "non-existent-room", request)
\ No newline at end of file
+        room_service.create_join_token_service(db_session, "non-existent-room", request)
+# --- Async database layer ---
+
+@pytest.mark.asyncio
+async def test_create_room_in_db_async_and_lookup(async_db_session):
+    """
+    Test that a room saved through the AsyncSession path can be read back by name.
+    """
+    # Arrange
+    request = room_models.RoomCreateRequest(name="async-room", access_type="public")
+
+    # Act
+    created = await room_service.create_room_in_db_async(async_db_session, request, "RM_async")
+    fetched = await room_service.get_room_by_name_async(async_db_session, "async-room")
+
+    # Assert
+    assert created.id is not None
+    assert created.created_at is not None
+    assert fetched is not None
+    assert fetched.livekit_sid == "RM_async"
+    assert await room_service.get_room_by_name_async(async_db_session, "missing-room") is None
+
+@pytest.mark.asyncio
+@patch('src.features.rooms.service.create_room_in_livekit', new_callable=AsyncMock)
+async def test_create_room_service_with_async_session(mock_create_livekit, async_db_session):
+    """
+    Test that create_room_service uses the async helpers when given an AsyncSession.
+    """
+    # Arrange
+    mock_livekit_room = MagicMock(spec=api.Room)
+    mock_livekit_room.sid = "RM_async_sid"
+    mock_create_livekit.return_value = mock_livekit_room
+    request = room_models.RoomCreateRequest(name="async-created", access_type="public")
+
+    # Act
+    result = await room_service.create_room_service(async_db_session, request)
+
+    # Assert
+    assert result.livekit_sid == "RM_async_sid"
+    with pytest.raises(RoomAlreadyExistsException):
+        await room_service.create_room_service(async_db_session, request)
+    mock_create_livekit.assert_awaited_once()
+
+@pytest.mark.asyncio
+@patch('src.features.rooms.service.get_livekit_api')
+async def test_delete_room_service_with_async_session(mock_get_livekit_api, async_db_session):
+    """
+    Test that delete_room_service removes the record through the AsyncSession path.
+    """
+    # Arrange
+    mock_lkapi = mock_get_livekit_api.return_value
+    mock_lkapi.room.delete_room = AsyncMock()
+    request = room_models.RoomCreateRequest(name="async-doomed", access_type="public")
+    await room_service.create_room_in_db_async(async_db_session, request, "RM_doomed")
+
+    # Act
+    await room_service.delete_room_service(async_db_session, "async-doomed")
+
+    # Assert
+    mock_lkapi.room.delete_room.assert_awaited_once()
+    assert await room_service.get_room_by_name_async(async_db_session, "async-doomed") is None
+
+# --- Batch join tokens ---
+
+def test_create_join_tokens_batch_service_preserves_order(db_session: Session):
+    """
+    Test that batch results keep request order and report per-item failures.
+    """
+    # Arrange
+    db_session.add(RoomEntity(id=1, name="batch-room", livekit_sid="RM_batch"))
+    db_session.commit()
+    requests = [
+        room_models.JoinTokenRequest(identity="user-1", name="Alice"),
+        room_models.JoinTokenRequest(identity="", name="Nobody"),
+        room_models.JoinTokenRequest(identity="user-3", name="Carol"),
+    ]
+
+    # Act
+    results = room_service.create_join_tokens_batch_service(db_session, "batch-room", requests)
+
+    # Assert
+    assert [result.identity for result in results] == ["user-1", "", "user-3"]
+    assert results[0].token and results[2].token
+    assert results[1].token is None
+    assert results[1].error is not None
+
+@patch('src.features.rooms.service.get_room_by_name')
+def test_create_join_tokens_batch_service_uses_thread_pool(mock_get_room, db_session: Session):
+    """
+    Test that large batches are signed on the thread pool with a single room lookup.
+    """
+    # Arrange
+    mock_get_room.return_value = RoomEntity(id=1, name="big-room", livekit_sid="RM_big", access_type="public")
+    size = room_service.settings.TOKEN_BATCH_THREAD_THRESHOLD + 1
+    requests = [room_models.JoinTokenRequest(identity=f"user-{i}", name=f"User {i}") for i in range(size)]
+
+    # Act
+    with patch.object(room_service.get_token_signing_executor(), 'map', wraps=room_service.get_token_signing_executor().map) as spy:
+        results = room_service.create_join_tokens_batch_service(db_session, "big-room", requests)
+
+    # Assert
+    spy.assert_called_once()
+    mock_get_room.assert_called_once()
+    assert [result.identity for result in results] == [f"user-{i}" for i in range(size)]
+    assert all(result.token for result in results)
+
+def test_create_join_tokens_batch_service_rejects_oversized_batch(db_session: Session):
+    """
+    Test that batches above TOKEN_BATCH_MAX_SIZE are rejected before any lookup.
+    """
+    # Arrange
+    size = room_service.settings.TOKEN_BATCH_MAX_SIZE + 1
+    requests = [room_models.JoinTokenRequest(identity="user", name="User")] * size
+
+    # Act & Assert
+    with pytest.raises(TokenBatchTooLargeException):
+        room_service.create_join_tokens_batch_service(db_session, "any-room", requests)
+
+# --- Bulk room creation ---
+
+@pytest.mark.asyncio
+@patch('src.features.rooms.service.create_room_in_livekit', new_callable=AsyncMock)
+async def test_bulk_create_rooms_service_reports_each_outcome(mock_create_livekit, db_session: Session):
+    """
+    Test that bulk creation reports created, already existing and failed rooms in request order.
+    """
+    # Arrange
+    db_session.add(RoomEntity(name="taken-room", livekit_sid="RM_taken", access_type="public"))
+    db_session.commit()
+
+    async def fake_create(name, empty_timeout, max_participants):
+        if name == "broken-room":
+            raise LiveKitServiceException(detail="API error")
+        room = MagicMock(spec=api.Room)
+        room.sid = f"RM_{name}"
+        return room
+    mock_create_livekit.side_effect = fake_create
+
+    requests = [
+        room_models.RoomCreateRequest(name="breakout-1", access_type="public"),
+        room_models.RoomCreateRequest(name="taken-room", access_type="public"),
+        room_models.RoomCreateRequest(name="broken-room", access_type="public"),
+        room_models.RoomCreateRequest(name="breakout-1", access_type="public"),
+        room_models.RoomCreateRequest(name="breakout-2", access_type="public"),
+    ]
+
+    # Act
+    results = await room_service.bulk_create_rooms_service(db_session, requests)
+
+    # Assert
+    assert [result.status for result in results] == [
+        "created", "already_exists", "failed", "already_exists", "created"
+    ]
+    assert results[0].room.livekit_sid == "RM_breakout-1"
+    assert results[0].room.created_at is not None
+    assert "API error" in results[2].error
+    assert mock_create_livekit.await_count == 3
+    assert db_session.query(RoomEntity).count() == 3
+
+@pytest.mark.asyncio
+@patch('src.features.rooms.service.create_room_in_livekit', new_callable=AsyncMock)
+async def test_bulk_create_rooms_service_bounds_concurrency(mock_create_livekit, db_session: Session):
+    """
+    Test that no more than ROOM_BULK_LIVEKIT_CONCURRENCY LiveKit calls run at once.
+    """
+    # Arrange
+    in_flight = 0
+    peak = 0
+
+    async def fake_create(name, empty_timeout, max_participants):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        room = MagicMock(spec=api.Room)
+        room.sid = f"RM_{name}"
+        return room
+    mock_create_livekit.side_effect = fake_create
+
+    requests = [room_models.RoomCreateRequest(name=f"room-{i}", access_type="public") for i in range(12)]
+
+    # Act
+    with patch.object(room_service.settings, "ROOM_BULK_LIVEKIT_CONCURRENCY", 3):
+        results = await room_service.bulk_create_rooms_service(db_session, requests)
+
+    # Assert
+    assert all(result.status == "created" for result in results)
+    assert peak == 3
@@ -0,0 +1,47 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from src.entities.room_entity import Room as RoomEntity
+from src.features.rooms import models as room_models
+from src.features.rooms import serializers as room_serializers
+from src.serialization import dumps
+
+@pytest.mark.parametrize("created_at", [
+    datetime(2024, 1, 1, 12, 0, 0, 123456, tzinfo=timezone.utc),
+    datetime(2024, 1, 1, 12, 0, 0),
+])
+def test_room_to_dict_matches_pydantic_output(created_at):
+    """
+    Test that the fast room payload renders to exactly the bytes Pydantic produces.
+    """
+    # Arrange
+    room = RoomEntity(
+        id=7, name="fast-room", livekit_sid="RM_fast", access_type="token",
+        token_address="0xabc", token_amount="10", nft_address=None, created_at=created_at,
+    )
+
+    # Act
+    fast = dumps(room_serializers.room_to_dict(room))
+    validated = room_models.RoomResponse.model_validate(room).model_dump_json().encode()
+
+    # Assert
+    assert fast == validated
+
+def test_join_token_results_to_dict_matches_pydantic_output():
+    """
+    Test that the fast batch token payload matches the Pydantic model's JSON.
+    """
+    # Arrange
+    results = [
+        room_models.JoinTokenResult(identity="user-1", token="jwt-1"),
+        room_models.JoinTokenResult(identity="", error="identity is required"),
+    ]
+
+    # Act
+    fast = dumps(room_serializers.join_token_results_to_dict(results))
+    validated = room_models.BatchJoinTokenResponse(results=results).model_dump_json()
+
+    # Assert
+    assert json.loads(fast) == json.loads(validated)
@@ -0,0 +1,121 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+from unittest.mock import patch
+
+import httpx
+
+from src import server
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def test_parse_options_defaults_to_one_worker_per_cpu_and_the_fastest_loop():
+    """
+    Test that without options the server starts a worker per available CPU and picks
+    uvloop and httptools when they are installed.
+    """
+    # Arrange
+    with patch.object(server, "default_workers", return_value=6):
+
+        # Act
+        options = server.parse_options([])
+
+    # Assert
+    assert options.workers == 6
+    assert options.loop == ("uvloop" if server.installed("uvloop") else "asyncio")
+    assert options.http == ("httptools" if server.installed("httptools") else "h11")
+    assert options.preload is True
+
+def test_uvicorn_config_recycles_workers_and_keeps_connection_settings():
+    """
+    Test that the command line options are passed to uvicorn, and that recycling is
+    dropped for a single worker since nothing would restart it.
+    """
+    # Arrange
+    argv = ["--workers", "4", "--max-requests", "1000", "--max-requests-jitter", "100",
+            "--keep-alive", "15", "--backlog", "4096", "--loop", "asyncio", "--http", "h11"]
+
+    # Act
+    config = server.uvicorn_config(server.parse_options(argv))
+    single = server.uvicorn_config(server.parse_options(["--workers", "1", "--max-requests", "1000"]))
+
+    # Assert
+    assert config["workers"] == 4
+    assert config["limit_max_requests"] == 1000
+    assert config["limit_max_requests_jitter"] == 100
+    assert config["timeout_keep_alive"] == 15
+    assert config["backlog"] == 4096
+    assert (config["loop"], config["http"]) == ("asyncio", "h11")
+    assert single["limit_max_requests"] is None
+
+def test_gunicorn_config_preloads_the_app_with_uvicorn_workers():
+    """
+    Test that the gunicorn setup forks uvicorn workers from a preloaded app, and that the
+    workers use the event loop and HTTP parser chosen on the command line.
+    """
+    # Act
+    config = server.gunicorn_config(server.parse_options(
+        ["--workers", "3", "--max-requests", "500", "--port", "9000", "--loop", "asyncio", "--http", "h11"]
+    ))
+
+    # Assert
+    assert config["preload_app"] is True
+    assert config["workers"] == 3
+    assert config["max_requests"] == 500
+    assert config["bind"] == "0.0.0.0:9000"
+    assert config["worker_class"].__name__ == "UvicornWorker"
+    assert config["worker_class"].CONFIG_KWARGS["loop"] == "asyncio"
+    assert config["worker_class"].CONFIG_KWARGS["http"] == "h11"
+
+def test_reload_runs_a_single_worker_without_preloading():
+    """
+    Test that development reload mode runs one uvicorn worker.
+    """
+    # Act
+    options = server.parse_options(["--reload", "--workers", "8"])
+
+    # Assert
+    assert options.workers == 1
+    assert options.preload is False
+    assert server.uses_gunicorn(options) is False
+
+def test_server_serves_the_app_with_several_workers(tmp_path):
+    """
+    Test that the entry point starts worker processes that serve `src.main:app`.
+    """
+    # Arrange
+    port = free_port()
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{tmp_path / 'server.db'}",
+        "OCCUPANCY_RESYNC_INTERVAL_SECONDS": "0",
+        "RECONCILE_INTERVAL_SECONDS": "0",
+        "ROOM_ANALYTICS_ENABLED": "false",
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "src.server", "--host", "127.0.0.1", "--port", str(port), "--workers", "2"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+    try:
+        # Act
+        response = None
+        deadline = time.monotonic() + 30
+        while response is None and time.monotonic() < deadline and process.poll() is None:
+            try:
+                response = httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            except httpx.TransportError:
+                time.sleep(0.2)
+
+        # Assert
+        assert response is not None, "the server did not start"
+        assert response.status_code == 200
+        assert "Qari" in response.json()["message"]
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
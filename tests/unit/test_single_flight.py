@@ -0,0 +1,102 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.single_flight import AsyncSingleFlight, SingleFlight
+
+def test_single_flight_shares_one_call_across_threads():
+    """
+    Test that threads calling with the same key while a call runs share its result.
+    """
+    # Arrange
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "room"
+
+    # Act
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        leader = executor.submit(flight.do, "room-a", load)
+        started.wait(5)
+        followers = [executor.submit(flight.do, "room-a", load) for _ in range(3)]
+        while flight.stats()["followers"] < 3:
+            pass
+        release.set()
+        results = [leader.result()] + [follower.result() for follower in followers]
+
+    # Assert
+    assert len(calls) == 1
+    assert results[0] == ("room", False)
+    assert all(result == ("room", True) for result in results[1:])
+    assert flight.stats()["inflight"] == 0
+
+def test_single_flight_propagates_exception_and_forgets_key():
+    """
+    Test that a failed call raises for its caller and the next call runs again.
+    """
+    # Arrange
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("db down")
+
+    # Act / Assert
+    with pytest.raises(ValueError):
+        flight.do("room-a", fail)
+    assert flight.do("room-a", lambda: "room") == ("room", False)
+
+@pytest.mark.asyncio
+async def test_async_single_flight_shares_result_and_exception():
+    """
+    Test that concurrent coroutines share one call, including its exception.
+    """
+    # Arrange
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def create():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("livekit down")
+
+    # Act
+    results = await asyncio.gather(*(flight.do("room-a", create) for _ in range(4)), return_exceptions=True)
+
+    # Assert
+    assert len(calls) == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.stats() == {"inflight": 0, "leaders": 1, "followers": 3}
+
+@pytest.mark.asyncio
+async def test_async_single_flight_follower_takes_over_after_leader_cancelled():
+    """
+    Test that a waiting caller runs its own call when the leader is cancelled.
+    """
+    # Arrange
+    flight = AsyncSingleFlight()
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    async def fast():
+        return "room"
+
+    leader = asyncio.create_task(flight.do("room-a", slow))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.do("room-a", fast))
+    await asyncio.sleep(0)
+
+    # Act
+    leader.cancel()
+    result = await follower
+
+    # Assert
+    assert result == ("room", False)
+    assert flight.stats()["leaders"] == 2
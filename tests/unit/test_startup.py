@@ -0,0 +1,59 @@
+import pytest
+from unittest.mock import patch
+
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.routing import APIRoute
+
+from src import main
+from src.config import get_settings, settings
+from src.database import core
+from src.features.rooms import service as room_service
+
+def test_get_settings_returns_cached_instance():
+    """
+    Test that the settings are loaded once and shared by the lazy `settings` handle.
+    """
+    # Act
+    first = get_settings()
+    second = get_settings()
+
+    # Assert
+    assert first is second
+    assert settings.DATABASE_URL == first.DATABASE_URL
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("create_schema", [True, False])
+async def test_lifespan_creates_schema_only_when_enabled(create_schema):
+    """
+    Test that the lifespan creates tables only when DATABASE_CREATE_SCHEMA is set, and
+    that it creates the LiveKit client on startup and closes it on shutdown.
+    """
+    # Arrange
+    with patch.object(settings, "DATABASE_CREATE_SCHEMA", create_schema), \
+         patch.object(settings, "OCCUPANCY_RESYNC_INTERVAL_SECONDS", 0), \
+         patch.object(settings, "RECONCILE_INTERVAL_SECONDS", 0), \
+         patch.object(main.Base.metadata, "create_all") as mock_create_all:
+
+        # Act
+        async with main.lifespan(main.app):
+            client_during_startup = room_service._lkapi
+            engine_during_startup = core._engine
+
+    # Assert
+    assert mock_create_all.called is create_schema
+    assert client_during_startup is not None
+    assert engine_during_startup is not None
+    assert room_service._lkapi is None
+    assert core._engine is None
+
+def test_routes_keep_the_default_response_class_without_fast_serialization():
+    """
+    Test that with fast serialization off, routes keep FastAPI's default response class
+    placeholder, which is what enables its pydantic-core JSON serialization.
+    """
+    # Act
+    routes = [route for route in main.app.routes if isinstance(route, APIRoute)]
+
+    # Assert
+    assert routes
+    assert all(isinstance(route.response_class, DefaultPlaceholder) for route in routes)
@@ -0,0 +1,74 @@
+import jwt
+import pytest
+from livekit import api
+
+from src.features.rooms.token_minter import JoinTokenMinter
+
+API_KEY = "test-key"
+API_SECRET = "test-secret-test-secret-test-secret"
+
+def test_minted_token_verifies_with_token_verifier():
+    """
+    Test that a minted token is accepted by the LiveKit TokenVerifier.
+    """
+    # Arrange
+    minter = JoinTokenMinter(api_key=API_KEY, api_secret=API_SECRET)
+    verifier = api.TokenVerifier(api_key=API_KEY, api_secret=API_SECRET)
+
+    # Act
+    claims = verifier.verify(minter.mint("test-room", "0xabc", "Alice \"A\" Ünicode"))
+
+    # Assert
+    assert claims.identity == "0xabc"
+    assert claims.name == "Alice \"A\" Ünicode"
+    assert claims.video.room == "test-room"
+    assert claims.video.room_join is True
+
+def test_minted_token_matches_access_token_layout():
+    """
+    Test that the minted header and claims match what AccessToken.to_jwt() produces.
+    """
+    # Arrange
+    minter = JoinTokenMinter(api_key=API_KEY, api_secret=API_SECRET, clock=lambda: 1_700_000_000)
+    reference = (
+        api.AccessToken(api_key=API_KEY, api_secret=API_SECRET)
+        .with_identity("user123")
+        .with_name("Alice")
+        .with_grants(api.VideoGrants(room_join=True, room="test-room"))
+        .to_jwt()
+    )
+
+    # Act
+    token = minter.mint("test-room", "user123", "Alice")
+
+    # Assert
+    assert token.split(".")[0] == reference.split(".")[0]
+    minted_claims = jwt.decode(token, options={"verify_signature": False})
+    reference_claims = jwt.decode(reference, options={"verify_signature": False})
+    for timing_claim in ("nbf", "exp"):
+        minted_claims.pop(timing_claim)
+        reference_claims.pop(timing_claim)
+    assert list(minted_claims.items()) == list(reference_claims.items())
+
+def test_minted_token_expiry_uses_ttl():
+    """
+    Test that nbf and exp are derived from the injected clock and TTL.
+    """
+    # Arrange
+    minter = JoinTokenMinter(api_key=API_KEY, api_secret=API_SECRET, ttl_seconds=60, clock=lambda: 1000.7)
+
+    # Act
+    claims = jwt.decode(minter.mint("room", "user"), options={"verify_signature": False})
+
+    # Assert
+    assert claims["nbf"] == 1000
+    assert claims["exp"] == 1060
+    assert "name" not in claims
+
+def test_mint_requires_identity():
+    """
+    Test that an empty identity is rejected like AccessToken.to_jwt() does.
+    """
+    minter = JoinTokenMinter(api_key=API_KEY, api_secret=API_SECRET)
+    with pytest.raises(ValueError):
+        minter.mint("room", "")
@@ -0,0 +1,137 @@
+from datetime import datetime, timezone
+
+from livekit import api
+from sqlalchemy.orm import Session
+
+from src.entities.room_usage_entity import RoomSessionRollup, UsageBucket
+from src.features.analytics import service as analytics_service
+from src.features.analytics.rollups import RollupUpdater, UsageRollupWriter, usage_event_from
+
+# Thirty seconds before an hour boundary, so stays cross into the next bucket.
+T0 = 1_700_002_800 - 30
+
+def room_event(kind: str, at: int, identity: str = "") -> api.WebhookEvent:
+    return api.WebhookEvent(
+        id=f"EV_{kind}_{identity}_{at}",
+        event=kind,
+        created_at=at,
+        room=api.Room(name="stats-room", sid="RM_stats", creation_time=T0),
+        participant=api.ParticipantInfo(identity=identity, joined_at=at if kind == "participant_joined" else 0),
+    )
+
+def apply_events(db: Session, *events: api.WebhookEvent):
+    updater = RollupUpdater(db, bucket_seconds=3600)
+    for event in events:
+        updater.apply(usage_event_from(event))
+    db.commit()
+
+def test_writer_folds_a_session_into_rollups(session_factory):
+    """
+    Test that a session's events produce its duration, peak, unique participants and
+    participant time, with stays split across hourly buckets.
+    """
+    # Arrange
+    writer = UsageRollupWriter(bucket_seconds=3600, batch_size=100, flush_interval_ms=10, max_buffer=100)
+    writer.start(session_factory)
+    events = [
+        room_event("room_started", T0),
+        room_event("participant_joined", T0 + 10, "alice"),
+        room_event("participant_joined", T0 + 20, "bob"),
+        room_event("participant_left", T0 + 70, "alice"),
+        room_event("participant_joined", T0 + 100, "alice"),
+        room_event("track_published", T0 + 110, "alice"),
+        room_event("room_finished", T0 + 200),
+    ]
+
+    # Act
+    for event in events:
+        writer.add(event)
+    writer.stop()
+
+    # Assert
+    with session_factory() as db:
+        session = db.get(RoomSessionRollup, "RM_stats")
+        assert session.duration_seconds == 200
+        assert session.peak_participants == 2
+        assert session.unique_participants == 2
+        assert session.current_participants == 0
+        # alice: 60s + 100s, bob: 180s
+        assert session.participant_seconds == 340
+        buckets = db.query(UsageBucket).order_by(UsageBucket.bucket_start).all()
+        assert [bucket.participant_seconds for bucket in buckets] == [20 + 10, 40 + 170 + 100]
+        assert sum(bucket.sessions_finished for bucket in buckets) == 1
+    assert writer.stats()["written"] == 6
+
+def test_room_stats_count_live_participants_up_to_now(db_session: Session):
+    """
+    Test that a live session reports participant minutes and duration up to the request time.
+    """
+    # Arrange
+    apply_events(
+        db_session,
+        room_event("room_started", T0),
+        room_event("participant_joined", T0, "alice"),
+        room_event("participant_joined", T0 + 60, "bob"),
+    )
+
+    # Act
+    stats = analytics_service.get_room_stats_service(db_session, "stats-room", now=T0 + 120)
+
+    # Assert
+    assert stats.sessions == 1
+    assert stats.live_sessions == 1
+    assert stats.total_duration_seconds == 120
+    assert stats.unique_participants == 2
+    assert stats.participant_minutes == 3.0
+    assert stats.recent_sessions[0].current_participants == 2
+
+def test_usage_groups_hourly_buckets_by_day(db_session: Session):
+    """
+    Test that the org-wide report sums hourly buckets into the requested interval.
+    """
+    # Arrange
+    apply_events(
+        db_session,
+        room_event("participant_joined", T0, "alice"),
+        room_event("participant_left", T0 + 90, "alice"),
+    )
+    start = datetime.fromtimestamp(T0 - 86400, tz=timezone.utc)
+    end = datetime.fromtimestamp(T0 + 86400, tz=timezone.utc)
+
+    # Act
+    hourly = analytics_service.get_usage_service(db_session, start, end, "hour")
+    daily = analytics_service.get_usage_service(db_session, start, end, "day")
+
+    # Assert
+    assert [bucket.participant_minutes for bucket in hourly.buckets] == [0.5, 1.0]
+    assert len(daily.buckets) == 1
+    assert daily.buckets[0].participant_minutes == 1.5
+    assert daily.buckets[0].sessions_started == 1
+
+def test_sweep_closes_sessions_whose_room_finished_event_was_lost(session_factory):
+    """
+    Test that a session LiveKit still lists stays open, and that one it no longer lists
+    is finished at the listing time with its open stays closed.
+    """
+    # Arrange
+    writer = UsageRollupWriter(bucket_seconds=3600, batch_size=100, flush_interval_ms=10, max_buffer=100)
+    writer._session_factory = session_factory
+    writer.add(room_event("room_started", T0))
+    writer.add(room_event("participant_joined", T0 + 10, "alice"))
+
+    # Act
+    writer.close_sessions_except([api.Room(name="stats-room", sid="RM_stats")], T0 + 300)
+    writer.flush()
+    with session_factory() as db:
+        still_open = db.get(RoomSessionRollup, "RM_stats").ended_at is None
+    writer.close_sessions_except([api.Room(name="other-room", sid="RM_other")], T0 + 500)
+    writer.flush()
+
+    # Assert
+    assert still_open
+    with session_factory() as db:
+        session = db.get(RoomSessionRollup, "RM_stats")
+        assert session.ended_at == T0 + 500
+        assert session.duration_seconds == 500
+        assert session.current_participants == 0
+        assert session.participant_seconds == 490
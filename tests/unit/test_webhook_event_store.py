@@ -0,0 +1,134 @@
+import time
+
+from livekit import api
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.entities.webhook_event_entity import WebhookEventRecord
+from src.features.webhooks import event_store
+from src.features.webhooks.event_store import WebhookEventWriter, event_to_row
+
+def make_event(event_id: str, event_type: str = "participant_joined") -> api.WebhookEvent:
+    event = api.WebhookEvent(id=event_id, event=event_type, created_at=1_700_000_000)
+    event.room.name = "store-room"
+    event.room.sid = "RM_store"
+    event.participant.identity = "user-1"
+    return event
+
+def test_event_to_row_flattens_event():
+    """
+    Test that an event is flattened into the webhook_events columns.
+    """
+    # Act
+    row = event_to_row(make_event("EV_1"))
+
+    # Assert
+    assert row["event_id"] == "EV_1"
+    assert row["event_type"] == "participant_joined"
+    assert row["room_name"] == "store-room"
+    assert row["participant_identity"] == "user-1"
+    assert row["event_timestamp"].year == 2023
+    assert '"id": "EV_1"' in row["raw_payload"]
+
+def test_flush_writes_batch_and_skips_duplicates(session_factory: sessionmaker, db_session: Session):
+    """
+    Test that a flush stores a batch in one insert and ignores already stored event IDs.
+    """
+    # Arrange
+    writer = WebhookEventWriter(batch_size=10, flush_interval_ms=1000, max_buffer=100)
+    writer._session_factory = session_factory
+    for i in range(3):
+        writer.add(make_event(f"EV_{i}"))
+    writer.flush()
+
+    # Act
+    writer.add(make_event("EV_0"))  # a redelivery
+    writer.add(make_event("EV_3"))
+    writer.flush()
+
+    # Assert
+    stored = db_session.query(WebhookEventRecord).order_by(WebhookEventRecord.event_id).all()
+    assert [record.event_id for record in stored] == ["EV_0", "EV_1", "EV_2", "EV_3"]
+    assert writer.stats()["batches"] == 2
+
+def test_background_writer_flushes_on_batch_size(session_factory: sessionmaker, db_session: Session):
+    """
+    Test that the background thread flushes as soon as a full batch is buffered.
+    """
+    # Arrange
+    writer = WebhookEventWriter(batch_size=5, flush_interval_ms=60_000, max_buffer=100)
+    writer.start(session_factory)
+
+    # Act
+    for i in range(5):
+        writer.add(make_event(f"EV_{i}"))
+    deadline = time.monotonic() + 5
+    while writer.stats()["written"] < 5 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    writer.stop()
+
+    # Assert
+    assert db_session.query(WebhookEventRecord).count() == 5
+
+def test_stop_flushes_partial_batch(session_factory: sessionmaker, db_session: Session):
+    """
+    Test that stopping the writer stores events that have not filled a batch yet.
+    """
+    # Arrange
+    writer = WebhookEventWriter(batch_size=100, flush_interval_ms=60_000, max_buffer=1000)
+    writer.start(session_factory)
+    writer.add(make_event("EV_partial"))
+
+    # Act
+    writer.stop()
+
+    # Assert
+    assert db_session.query(WebhookEventRecord).count() == 1
+
+def test_buffer_is_bounded():
+    """
+    Test that the oldest events are dropped once the buffer is full.
+    """
+    # Arrange
+    writer = WebhookEventWriter(batch_size=2, flush_interval_ms=1000, max_buffer=2)
+
+    # Act
+    for i in range(3):
+        writer.add(make_event(f"EV_{i}"))
+
+    # Assert
+    assert writer.stats()["buffered"] == 2
+    assert writer.stats()["dropped"] == 1
+
+def test_failing_batch_falls_back_to_single_rows_and_dead_letters_the_rest(
+    session_factory: sessionmaker, db_session: Session, monkeypatch
+):
+    """
+    Test that a batch is retried up to max_attempts, then written row by row, and that
+    a row which still fails is dead-lettered instead of being retried forever.
+    """
+    # Arrange
+    build_bulk_insert = event_store.build_bulk_insert
+
+    def build_poisoned_insert(db, rows):
+        if any(row["event_id"] == "EV_bad" for row in rows):
+            raise ValueError("bad row")
+        return build_bulk_insert(db, rows)
+
+    monkeypatch.setattr(event_store, "build_bulk_insert", build_poisoned_insert)
+    writer = WebhookEventWriter(batch_size=10, flush_interval_ms=1000, max_buffer=100, max_attempts=2)
+    writer._session_factory = session_factory
+    for event_id in ("EV_0", "EV_bad", "EV_1"):
+        writer.add(make_event(event_id))
+
+    # Act
+    first = writer.flush()
+    second = writer.flush()
+    third = writer.flush()
+
+    # Assert
+    assert (first, second, third) == (0, 2, 0)
+    stored = db_session.query(WebhookEventRecord).order_by(WebhookEventRecord.event_id).all()
+    assert [record.event_id for record in stored] == ["EV_0", "EV_1"]
+    assert writer.stats()["failed_batches"] == 2
+    assert writer.stats()["dead_lettered"] == 1
+    assert writer.stats()["buffered"] == 0
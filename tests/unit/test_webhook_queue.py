@@ -0,0 +1,114 @@
+import asyncio
+import threading
+
+import pytest
+from livekit import api
+
+from src.exceptions import WebhookQueueFullException
+from src.features.webhooks.queue import WebhookQueue
+
+def make_event(event_id: str, room_sid: str, event_type: str = "participant_joined") -> api.WebhookEvent:
+    event = api.WebhookEvent(id=event_id, event=event_type)
+    event.room.sid = room_sid
+    event.room.name = f"room-{room_sid}"
+    return event
+
+@pytest.mark.asyncio
+async def test_webhook_queue_preserves_per_room_order():
+    """
+    Test that events of the same room are processed in the order they were queued.
+    """
+    # Arrange
+    processed = []
+    lock = threading.Lock()
+
+    def handler(event):
+        with lock:
+            processed.append((event.room.sid, event.id))
+
+    queue = WebhookQueue(handler=handler, num_workers=3, max_size=300)
+    await queue.start()
+    events = [make_event(f"evt-{i}", f"RM_{i % 4}") for i in range(40)]
+
+    # Act
+    for event in events:
+        await queue.enqueue(event)
+    await queue.stop()
+
+    # Assert
+    assert len(processed) == 40
+    for room_sid in {event.room.sid for event in events}:
+        expected = [event.id for event in events if event.room.sid == room_sid]
+        assert [event_id for sid, event_id in processed if sid == room_sid] == expected
+    assert queue.stats()["processed"] == 40
+
+@pytest.mark.asyncio
+async def test_webhook_queue_reject_policy_raises_when_full():
+    """
+    Test that the reject policy raises WebhookQueueFullException once the shard is full.
+    """
+    # Arrange
+    release = threading.Event()
+    queue = WebhookQueue(handler=lambda event: release.wait(5), num_workers=1, max_size=1, policy="reject")
+    await queue.start()
+    await queue.enqueue(make_event("evt-1", "RM_a"))
+    await asyncio.sleep(0.05)  # let the worker take evt-1 and block in the handler
+    await queue.enqueue(make_event("evt-2", "RM_a"))
+
+    # Act & Assert
+    with pytest.raises(WebhookQueueFullException):
+        await queue.enqueue(make_event("evt-3", "RM_a"))
+    assert queue.stats()["rejected"] == 1
+
+    release.set()
+    await queue.stop()
+
+@pytest.mark.asyncio
+async def test_webhook_queue_block_policy_waits_for_space():
+    """
+    Test that the block policy waits for a full shard to make room and keeps every event.
+    """
+    # Arrange
+    release = threading.Event()
+    processed = []
+
+    def handler(event):
+        release.wait(5)
+        processed.append(event.id)
+
+    queue = WebhookQueue(handler=handler, num_workers=1, max_size=1, policy="block", block_timeout_seconds=5)
+    await queue.start()
+    await queue.enqueue(make_event("evt-1", "RM_a"))
+    await asyncio.sleep(0.05)
+    await queue.enqueue(make_event("evt-2", "RM_a"))
+
+    # Act
+    asyncio.get_running_loop().call_later(0.05, release.set)
+    await queue.enqueue(make_event("evt-3", "RM_a"))
+    await queue.stop()
+
+    # Assert
+    assert processed == ["evt-1", "evt-2", "evt-3"]
+    assert queue.stats()["rejected"] == 0
+
+@pytest.mark.asyncio
+async def test_webhook_queue_counts_handler_failures():
+    """
+    Test that a failing handler is counted and does not stop the worker.
+    """
+    # Arrange
+    def handler(event):
+        if event.id == "bad":
+            raise ValueError("boom")
+
+    queue = WebhookQueue(handler=handler, num_workers=1, max_size=10)
+    await queue.start()
+
+    # Act
+    await queue.enqueue(make_event("bad", "RM_a"))
+    await queue.enqueue(make_event("good", "RM_a"))
+    await queue.stop()
+
+    # Assert
+    assert queue.stats()["failed"] == 1
+    assert queue.stats()["processed"] == 1
@@ -1,44 +1,50 @@
+import base64
+import hashlib
+from datetime import datetime, timedelta, timezone
+
 import pytest
 from unittest.mock import patch, MagicMock
 from livekit import api
 
+from src.config import settings
+from src.entities.webhook_receipt_entity import WebhookEventReceipt
+
 from src.features.webhooks import service as webhook_service
 
-@patch('src.features.webhooks.service.webhook_receiver')
-def test_process_webhook_event_success(mock_receiver):
+def sign(body: bytes, secret: str = settings.LIVEKIT_API_SECRET) -> str:
+    digest = base64.b64encode(hashlib.sha256(body).digest()).decode()
+    return api.AccessToken(api_key=settings.LIVEKIT_API_KEY, api_secret=secret).with_sha256(digest).to_jwt()
+
+def test_process_webhook_event_success():
     """
     Test that a valid webhook body and authorization header are correctly processed.
     """
     # Arrange
-    mock_event = MagicMock(spec=api.WebhookEvent)
-    mock_event.event = "test_event"
-    mock_receiver.receive.return_value = mock_event
-    
-    body = '{"event": "test_event"}'
-    auth_header = "Bearer valid_token"
-    
+    body = b'{"event": "participant_joined", "id": "EV_1", "room": {"name": "room-a"}, "unknownField": 1}'
+    auth_header = sign(body)
+
     # Act
     result = webhook_service.process_webhook_event(body, auth_header)
-    
+
     # Assert
-    mock_receiver.receive.assert_called_once_with(body, auth_header)
-    assert result == mock_event
+    assert result.event == "participant_joined"
+    assert result.id == "EV_1"
+    assert result.room.name == "room-a"
 
-@patch('src.features.webhooks.service.webhook_receiver')
-def test_process_webhook_event_validation_failure(mock_receiver):
+def test_process_webhook_event_validation_failure():
     """
-    Test that if the webhook receiver fails validation, it raises an exception.
+    Test that a body that does not match the signed hash, or a token signed with another
+    secret, is rejected.
     """
     # Arrange
-    mock_receiver.receive.side_effect = Exception("Invalid signature")
-    body = '{"event": "test_event"}'
-    auth_header = "Bearer invalid_token"
-    
+    body = b'{"event": "test_event"}'
+    tampered = b'{"event": "tampered"}'
+
     # Act & Assert
-    with pytest.raises(Exception, match="Invalid signature"):
-        webhook_service.process_webhook_event(body, auth_header)
-    
-    mock_receiver.receive.assert_called_once_with(body, auth_header)
+    with pytest.raises(Exception, match="hash mismatch"):
+        webhook_service.process_webhook_event(tampered, sign(body))
+    with pytest.raises(Exception):
+        webhook_service.process_webhook_event(body, sign(body, secret="another-secret-another-secret-another"))
 
 @patch('src.features.webhooks.service.logger')
 def test_handle_event_logic(mock_logger):
@@ -64,7 +70,8 @@ def test_handle_event_logic(mock_logger):
     room_finished_event.event = "room_finished"
     room_finished_event.room.name = "test-room"
     room_finished_event.room.sid = "RM_sid"
-    room_finished_event.room.duration = 120
+    room_finished_event.room.creation_time = 1_700_000_000
+    room_finished_event.created_at = 1_700_000_120
     
     webhook_service.handle_event_logic(room_finished_event)
     mock_logger.info.assert_any_call("Received webhook event: room_finished")
@@ -80,4 +87,58 @@ def test_handle_event_logic(mock_logger):
     mock_logger.info.assert_any_call("Received webhook event: unhandled_event_type")
     mock_logger.warning.assert_called_once_with(
         "Received an unhandled webhook event type: unhandled_event_type"
-    )
\ No newline at end of file
+    )
+
+def test_claim_event_rejects_redelivery(db_session):
+    """
+    Test that the first delivery of an event ID is claimed and redeliveries are not.
+    """
+    # Arrange
+    event = api.WebhookEvent(id="EV_dup", event="participant_joined")
+
+    # Act & Assert
+    assert webhook_service.claim_event(db_session, event) is True
+    assert webhook_service.claim_event(db_session, event) is False
+
+def test_claim_event_uses_database_across_workers(db_session):
+    """
+    Test that an event claimed by another worker is rejected even when it is not in local memory.
+    """
+    # Arrange
+    event = api.WebhookEvent(id="EV_other_worker", event="room_finished")
+    assert webhook_service.claim_event(db_session, event) is True
+    webhook_service.get_recent_event_ids().clear()  # simulate a different worker process
+
+    # Act & Assert
+    assert webhook_service.claim_event(db_session, event) is False
+
+def test_release_event_allows_reprocessing(db_session):
+    """
+    Test that releasing a claimed event lets its redelivery be claimed again.
+    """
+    # Arrange
+    event = api.WebhookEvent(id="EV_failed", event="participant_left")
+    webhook_service.claim_event(db_session, event)
+
+    # Act
+    webhook_service.release_event(db_session, event)
+
+    # Assert
+    assert webhook_service.claim_event(db_session, event) is True
+
+def test_prune_event_receipts_deletes_receipts_past_the_retention(db_session):
+    """
+    Test that receipts older than the retention are deleted and recent ones are kept.
+    """
+    # Arrange
+    now = datetime.now(timezone.utc)
+    db_session.add(WebhookEventReceipt(event_id="EV_old", received_at=now - timedelta(hours=2)))
+    db_session.add(WebhookEventReceipt(event_id="EV_new", received_at=now))
+    db_session.commit()
+
+    # Act
+    deleted = webhook_service.prune_event_receipts(db_session, retention_seconds=3600)
+
+    # Assert
+    assert deleted == 1
+    assert [receipt.event_id for receipt in db_session.query(WebhookEventReceipt)] == ["EV_new"]